@@ -1,30 +1,101 @@
+from __future__ import annotations
+
 import logging
 import asyncio
-from homeassistant import config_entries, core
-from homeassistant.const import Platform
 
-from .const import DOMAIN, ERROR_UPDATE_COORDINATOR, DATA_UPDATE_COORDINATOR
-from .coordinator import ETAErrorUpdateCoordinator, EtaDataUpdateCoordinator
-from .services import async_setup_services
+from .const import (
+    DOMAIN,
+    ERROR_UPDATE_COORDINATOR,
+    DATA_UPDATE_COORDINATOR,
+    ENDPOINT_QUARANTINE,
+    ERROR_HISTORY,
+)
+from .scheduler import get_scheduler
 from .const import (
     CHOSEN_DEVICES,
     FORCE_LEGACY_MODE,
     FORCE_SENSOR_DETECTION,
+    REQUESTS_PER_SECOND,
     WRITABLE_DICT,
     CHOSEN_WRITABLE_SENSORS,
 )
 
-PLATFORMS: list[Platform] = [
-    Platform.BINARY_SENSOR,
-    Platform.BUTTON,
-    Platform.NUMBER,
-    Platform.SENSOR,
-    Platform.SWITCH,
-    Platform.TIME,
-]
+try:
+    from homeassistant import config_entries, core
+    from homeassistant.const import CONF_HOST, CONF_PORT, Platform
+    from homeassistant.helpers.storage import Store
+
+    from .coordinator import (
+        ETAErrorUpdateCoordinator,
+        EtaDataUpdateCoordinator,
+        assign_refresh_phases,
+    )
+    from .error_history import async_load_error_history, async_remove_error_history
+    from .quarantine import (
+        async_load_endpoint_quarantine,
+        async_remove_endpoint_quarantine,
+    )
+    from .services import async_setup_services
+
+    PLATFORMS: list[Platform] = [
+        Platform.BINARY_SENSOR,
+        Platform.BUTTON,
+        Platform.NUMBER,
+        Platform.SENSOR,
+        Platform.SWITCH,
+        Platform.TIME,
+    ]
+except ModuleNotFoundError as e:
+    # Without Home Assistant only the client modules can be used, e.g. by the
+    # command line tool in __main__.py
+    if e.name is None or e.name.split(".")[0] != "homeassistant":
+        raise
 
 _LOGGER = logging.getLogger(__name__)
 
+# Concurrency limits learned by the adaptive limiter, keyed by "host:port"
+CONCURRENCY_LIMITS_STORAGE_KEY = f"{DOMAIN}.concurrency_limits"
+CONCURRENCY_LIMITS_STORAGE_VERSION = 1
+# Seconds a changed limit waits before it is written, pending writes are
+# flushed when Home Assistant stops
+CONCURRENCY_LIMITS_SAVE_DELAY = 60
+
+
+def _get_concurrency_limits_store(hass: core.HomeAssistant) -> Store:
+    return Store(
+        hass, CONCURRENCY_LIMITS_STORAGE_VERSION, CONCURRENCY_LIMITS_STORAGE_KEY
+    )
+
+
+async def _async_track_concurrency_limit(
+    hass: core.HomeAssistant, host: str, port: str
+) -> None:
+    """Restore the concurrency limit learned for a terminal and save its changes."""
+    limiter = get_scheduler(host, port).limiter
+    if limiter is None:
+        return
+    # shared by the entries of all terminals, so they don't overwrite each other
+    if CONCURRENCY_LIMITS_STORAGE_KEY not in hass.data:
+        store = _get_concurrency_limits_store(hass)
+        hass.data[CONCURRENCY_LIMITS_STORAGE_KEY] = (
+            store,
+            await store.async_load() or {},
+        )
+    store, limits = hass.data[CONCURRENCY_LIMITS_STORAGE_KEY]
+
+    key = f"{host}:{port}"
+    if (limit := limits.get(key)) is not None:
+        _LOGGER.debug("Restoring concurrency limit %s for %s", limit, key)
+        get_scheduler(host, port).set_max_concurrency(limit)
+
+    def _limits_to_save() -> dict:
+        limits[key] = limiter.limit
+        return limits
+
+    limiter.on_change = lambda: store.async_delay_save(
+        _limits_to_save, CONCURRENCY_LIMITS_SAVE_DELAY
+    )
+
 
 async def async_setup_entry(
     hass: core.HomeAssistant, entry: config_entries.ConfigEntry
@@ -45,19 +116,33 @@ async def async_setup_entry(
         await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
         await async_setup_services(hass, entry)
 
-    error_coordinator = ETAErrorUpdateCoordinator(hass, config)
+    await _async_track_concurrency_limit(hass, config[CONF_HOST], config[CONF_PORT])
+    get_scheduler(config[CONF_HOST], config[CONF_PORT]).set_requests_per_second(
+        config.get(REQUESTS_PER_SECOND)
+    )
+
+    error_history = await async_load_error_history(hass, entry.entry_id)
+    error_coordinator = ETAErrorUpdateCoordinator(hass, config, error_history)
+    quarantine = await async_load_endpoint_quarantine(hass, entry.entry_id)
     hass.data[DOMAIN][entry.entry_id] = {
         ERROR_UPDATE_COORDINATOR: error_coordinator,
+        ENDPOINT_QUARANTINE: quarantine,
+        ERROR_HISTORY: error_history,
         "config_entry_data": config,
     }
 
     coordinators = []
     chosen_devices = config.get(CHOSEN_DEVICES, [])
     for device in chosen_devices:
-        coordinator = EtaDataUpdateCoordinator(hass, config, device, entry.entry_id)
+        coordinator = EtaDataUpdateCoordinator(
+            hass, config, device, entry.entry_id, quarantine
+        )
         hass.data[DOMAIN][entry.entry_id][device] = coordinator
         coordinators.append(coordinator)
 
+    # Spread the cycles of all devices and of the error polling over the interval
+    assign_refresh_phases([*coordinators, error_coordinator], entry.entry_id)
+
     refresh_tasks = [c.async_config_entry_first_refresh() for c in coordinators]
     refresh_tasks.append(error_coordinator.async_config_entry_first_refresh())
 
@@ -122,3 +207,11 @@ async def async_unload_entry(
         hass.data[DOMAIN].pop(entry.entry_id)
 
     return unload_ok
+
+
+async def async_remove_entry(
+    hass: core.HomeAssistant, entry: config_entries.ConfigEntry
+) -> None:
+    """Remove the stored data of a removed config entry."""
+    await async_remove_endpoint_quarantine(hass, entry.entry_id)
+    await async_remove_error_history(hass, entry.entry_id)
@@ -0,0 +1,321 @@
+"""Command line tool to inspect and load test an ETA terminal.
+
+    python -m custom_components.eta_webservices discover HOST
+    python -m custom_components.eta_webservices dump HOST --output catalog.json
+    python -m custom_components.eta_webservices poll HOST URI... --interval 10
+    python -m custom_components.eta_webservices probe HOST [URI...]
+
+The tool uses EtaAPI like the integration does, but runs without Home
+Assistant; it only needs aiohttp, packaging and xmltodict. discover and dump
+keep to the request limits of the integration. poll reads the URIs in
+cycles like a coordinator. probe reads with a rising number of parallel
+requests and reports the highest concurrency at which the terminal still
+answers without errors, faster than with half of the requests and without
+a large increase of the latency.
+
+With --record, all requests and responses are saved to an archive which
+EtaReplayTransport can replay.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+import json
+import logging
+from pathlib import Path
+import sys
+import time
+
+import aiohttp
+
+from .api import EtaAPI
+from .const import FLOAT_DICT, SWITCHES_DICT, TEXT_DICT, WRITABLE_DICT
+from .limiter import LATENCY_TOLERANCE
+from .scheduler import EtaRequestScheduler, set_scheduler
+from .stats import percentile
+from .transport import EtaRecordingTransport
+
+DEFAULT_PORT = 8080
+DEFAULT_INTERVAL = 10.0
+DEFAULT_CYCLES = 6
+DEFAULT_PROBE_REQUESTS = 50
+DEFAULT_MAX_CONCURRENCY = 32
+# Endpoints read by probe when no URIs are given
+DEFAULT_PROBE_URIS = 50
+PERCENTILES = (0.5, 0.9, 0.95, 0.99)
+# Doubling the concurrency must raise the throughput at least by this factor
+MIN_THROUGHPUT_GAIN = 1.25
+
+
+class LatencyRecorder:
+    """Collect the latency of every request an EtaAPI client sends."""
+
+    def __init__(self) -> None:
+        self.latencies: list[float] = []
+
+    def __call__(self, suffix: str, latency: float) -> None:
+        self.latencies.append(latency)
+
+    def summary(self) -> dict[str, float | None]:
+        summary = {
+            f"p{round(fraction * 100)}": percentile(self.latencies, fraction)
+            for fraction in PERCENTILES
+        }
+        summary["max"] = max(self.latencies, default=None)
+        return summary
+
+
+def _format_latencies(summary: dict[str, float | None]) -> str:
+    return "  ".join(
+        f"{name} {value * 1000:.0f} ms" if value is not None else f"{name} -"
+        for name, value in summary.items()
+    )
+
+
+def _classify(eta_client: EtaAPI, metadata: dict) -> str | None:
+    """Return the key of the catalog an endpoint belongs to, like the config flow."""
+    entity_type = eta_client.classify_entity(metadata)
+    if entity_type == "sensor":
+        return TEXT_DICT if metadata.get("unit") == "" else FLOAT_DICT
+    if entity_type == "switch":
+        return SWITCHES_DICT
+    if entity_type in ("number", "time"):
+        return WRITABLE_DICT
+    return None
+
+
+def _leaf_uris(node: dict) -> list[str]:
+    """Return the URIs of the nodes without children, which hold values."""
+    if not node.get("children"):
+        return [node["uri"]] if node.get("uri") else []
+    return [uri for child in node["children"] for uri in _leaf_uris(child)]
+
+
+async def _async_read_all(uris: list[str], read: Callable[[str], Awaitable]) -> list:
+    return await asyncio.gather(*(read(uri) for uri in uris), return_exceptions=True)
+
+
+async def async_discover(
+    eta_client: EtaAPI, recorder: LatencyRecorder, args: argparse.Namespace
+) -> int:
+    api_version = await eta_client.get_api_version()
+    structures = await eta_client.get_entity_structures()
+    print(f"API version {api_version}")
+    for device, structure in structures.items():
+        uris = eta_client.get_endpoint_uris(structure)
+        print(f"{device}: {len(uris)} endpoints")
+    return 0
+
+
+async def async_dump(
+    eta_client: EtaAPI, recorder: LatencyRecorder, args: argparse.Namespace
+) -> int:
+    structures = await eta_client.get_entity_structures()
+    catalog = {}
+    for device, structure in structures.items():
+        if args.device and device not in args.device:
+            continue
+        uris = eta_client.get_endpoint_uris(structure)
+        results = await _async_read_all(
+            uris,
+            lambda uri: eta_client.async_get_entity_metadata(uri, False),
+        )
+        entities = {FLOAT_DICT: {}, SWITCHES_DICT: {}, TEXT_DICT: {}, WRITABLE_DICT: {}}
+        for uri, metadata in zip(uris, results, strict=True):
+            if isinstance(metadata, Exception):
+                print(f"Could not scan {uri}: {metadata}", file=sys.stderr)
+                continue
+            if metadata and (key := _classify(eta_client, metadata)) is not None:
+                entities[key][uri] = metadata
+        catalog[device] = entities
+
+    text = json.dumps(catalog, indent=2, ensure_ascii=False, default=str)
+    if args.output is None:
+        print(text)
+    else:
+        args.output.write_text(text + "\n")
+        print(
+            f"Wrote {sum(len(e) for d in catalog.values() for e in d.values())} "
+            f"endpoints to {args.output}"
+        )
+    return 0
+
+
+async def async_poll(
+    eta_client: EtaAPI, recorder: LatencyRecorder, args: argparse.Namespace
+) -> int:
+    loop = asyncio.get_running_loop()
+    overruns = 0
+    failed = 0
+    for cycle in range(args.cycles):
+        started_at = loop.time()
+        results = await _async_read_all(args.uris, eta_client.get_data)
+        duration = loop.time() - started_at
+        cycle_failures = sum(isinstance(result, Exception) for result in results)
+        failed += cycle_failures
+        overran = duration > args.interval
+        overruns += overran
+        print(
+            f"cycle {cycle + 1}: {duration:.2f} s, {cycle_failures} failed"
+            + (", longer than the interval" if overran else "")
+        )
+        if cycle + 1 < args.cycles:
+            await asyncio.sleep(max(0.0, started_at + args.interval - loop.time()))
+
+    print(f"{len(recorder.latencies)} requests, {failed} failed reads")
+    print(_format_latencies(recorder.summary()))
+    if overruns:
+        print(f"{overruns} of {args.cycles} cycles took longer than the interval")
+    return 1 if overruns or failed else 0
+
+
+async def async_probe(
+    eta_client: EtaAPI, recorder: LatencyRecorder, args: argparse.Namespace
+) -> int:
+    uris = args.uris
+    if not uris:
+        structures = await eta_client.get_entity_structures()
+        uris = [
+            uri for structure in structures.values() for uri in _leaf_uris(structure)
+        ][:DEFAULT_PROBE_URIS]
+    if not uris:
+        print("The terminal has no endpoints to read")
+        return 1
+
+    baseline_p95 = None
+    previous_throughput = None
+    safe_concurrency = None
+    concurrency = 1
+    while concurrency <= args.max_concurrency:
+        # requests for the same URI are shared while in flight, so every
+        # request of a step reads a different URI where possible
+        set_scheduler(
+            args.host,
+            args.port,
+            EtaRequestScheduler(max_concurrency=concurrency, requests_per_second=None),
+        )
+        recorder.latencies.clear()
+        started_at = time.perf_counter()
+        results = []
+        for offset in range(0, args.requests, len(uris)):
+            batch = uris[: args.requests - offset]
+            results.extend(await _async_read_all(batch, eta_client.get_data))
+        throughput = len(results) / (time.perf_counter() - started_at)
+        failed = sum(isinstance(result, Exception) for result in results)
+        summary = recorder.summary()
+        print(
+            f"concurrency {concurrency:>3}: {throughput:6.1f} reads/s, "
+            f"{failed} failed, {_format_latencies(summary)}"
+        )
+
+        if baseline_p95 is None:
+            baseline_p95 = summary["p95"]
+        # more parallel requests only help while the terminal answers them
+        # faster, once it queues them the latency rises instead
+        congested = (
+            summary["p95"] is None
+            or baseline_p95 is None
+            or summary["p95"] > baseline_p95 * LATENCY_TOLERANCE
+            or (
+                previous_throughput is not None
+                and throughput < previous_throughput * MIN_THROUGHPUT_GAIN
+            )
+        )
+        if failed or congested:
+            break
+        safe_concurrency = concurrency
+        previous_throughput = throughput
+        concurrency *= 2
+
+    if safe_concurrency is None:
+        print("The terminal did not answer reliably even to single requests")
+        return 1
+    print(f"Maximum safe concurrency: {safe_concurrency}")
+    return 0
+
+
+COMMANDS = {
+    "discover": async_discover,
+    "dump": async_dump,
+    "poll": async_poll,
+    "probe": async_probe,
+}
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m custom_components.eta_webservices",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--record", type=Path, help="save all requests and responses to this archive"
+    )
+    parser.add_argument("--verbose", "-v", action="store_true")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    discover = commands.add_parser("discover", help="list the devices of a terminal")
+    discover.add_argument("host")
+
+    dump = commands.add_parser("dump", help="write the catalog of endpoints as JSON")
+    dump.add_argument("host")
+    dump.add_argument("--device", action="append", help="only dump these devices")
+    dump.add_argument("--output", type=Path, help="file instead of stdout")
+
+    poll = commands.add_parser("poll", help="read URIs in cycles like a coordinator")
+    poll.add_argument("host")
+    poll.add_argument("uris", nargs="+", metavar="URI")
+    poll.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help="seconds between the starts of two cycles",
+    )
+    poll.add_argument("--cycles", type=int, default=DEFAULT_CYCLES)
+
+    probe = commands.add_parser(
+        "probe", help="find the highest concurrency the terminal handles"
+    )
+    probe.add_argument("host")
+    probe.add_argument(
+        "uris",
+        nargs="*",
+        metavar="URI",
+        help=f"defaults to the first {DEFAULT_PROBE_URIS} endpoints of the menu",
+    )
+    probe.add_argument(
+        "--requests",
+        type=int,
+        default=DEFAULT_PROBE_REQUESTS,
+        help="reads per concurrency step",
+    )
+    probe.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    return parser
+
+
+async def async_main(args: argparse.Namespace) -> int:
+    async with aiohttp.ClientSession() as session:
+        transport = session
+        if args.record is not None:
+            transport = EtaRecordingTransport(session)
+        recorder = LatencyRecorder()
+        eta_client = EtaAPI(transport, args.host, args.port, request_observer=recorder)
+        try:
+            return await COMMANDS[args.command](eta_client, recorder, args)
+        finally:
+            if args.record is not None:
+                transport.save(args.record)
+                print(f"Recorded {len(transport.exchanges)} requests to {args.record}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = argument_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+    return asyncio.run(async_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,36 @@
+import asyncio
+from collections.abc import Callable
 from datetime import datetime
+import hashlib
 import logging
 from typing import TypedDict
 
-from aiohttp import ClientSession
+from aiohttp import ClientError, ClientSession
 from packaging import version
-import xmltodict
 
-from .const import CUSTOM_UNIT_MINUTES_SINCE_MIDNIGHT
+from .circuit_breaker import EtaTerminalUnavailableError, get_circuit_breaker
+from .const import (
+    CUSTOM_UNIT_MINUTES_SINCE_MIDNIGHT,
+    IDEMPOTENT_READ_CACHE_TTL,
+    MENU_CACHE_TTL,
+    REQUEST_TIMEOUT,
+)
+from .scheduler import RequestPriority, get_scheduler
+from .stats import EtaRequestStats
+from .transport import EtaTransportResponse
+from .xml_parser import get_xml_parser
 
 _LOGGER = logging.getLogger(__name__)
 
+# Requests and recent bodies shared by all clients of a session, keyed by
+# (session, host, port, path)
+_IN_FLIGHT: dict[tuple, asyncio.Task] = {}
+_RESPONSE_CACHE: dict[tuple, tuple[float, str]] = {}
+# Parsed /user/menu and the last reported API version of a terminal, keyed by
+# (session, host, port)
+_MENU_CACHE: dict[tuple, dict] = {}
+_API_VERSIONS: dict[tuple, version.Version] = {}
+
 
 class ETAValidSwitchValues(TypedDict):
     on_value: int
@@ -43,10 +64,33 @@ class ETAError(TypedDict):
 
 
 class EtaAPI:
-    def __init__(self, session, host, port) -> None:
+    def __init__(
+        self,
+        session,
+        host,
+        port,
+        metadata_cache=None,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+        request_timeout: float = REQUEST_TIMEOUT,
+        request_observer: Callable[[str, float], None] | None = None,
+        request_stats: EtaRequestStats | None = None,
+    ) -> None:
         self._session: ClientSession = session
         self._host = host
         self._port = int(port)
+        # Priority of this client's reads in the terminal-wide scheduler,
+        # writes are always sent with RequestPriority.WRITE
+        self._priority = priority
+        self._request_timeout = request_timeout
+        # Called with the path and the latency of every request which was sent
+        self._request_observer = request_observer
+        # Counts the requests, failures and received bytes of this client
+        self._request_stats = request_stats
+        self._is_v12: bool | None = None
+        self._api_version = None
+        self._terminal_fingerprint: str | None = None
+        # Optional EtaMetadataCache, consulted by _get_varinfo before asking the terminal
+        self._metadata_cache = metadata_cache
 
         self._float_sensor_units = [
             "%",
@@ -124,35 +168,271 @@ class EtaAPI:
 
         return entity
 
-    async def get_entity_structure(self, device_name: str):
-        """Get the hierarchical structure of entities for a specific device."""
-        menu = await self.get_menu()
+    def parse_entity_structures(self, menu: dict) -> dict[str, dict]:
+        """Parse the hierarchical entity structure of every device in a menu."""
         fubs = menu.get("eta", {}).get("menu", {}).get("fub", [])
         if not isinstance(fubs, list):
             fubs = [fubs]
 
+        structures = {}
         for fub in fubs:
-            if fub.get("@name") == device_name:
-                return self._parse_menu_node(fub)
+            if isinstance(fub, dict) and fub.get("@name") is not None:
+                structures[fub["@name"]] = self._parse_menu_node(fub)
+        return structures
+
+    async def get_entity_structures(self) -> dict[str, dict]:
+        """Return the parsed structure of every device, using the menu cache.
+
+        The returned structures are shared with other callers and must not be
+        modified.
+        """
+        menu = await self.get_menu()
+        cached = _MENU_CACHE.get(self._menu_cache_key)
+        if cached is None or cached["menu"] is not menu:
+            return self.parse_entity_structures(menu)
+        if cached["structures"] is None:
+            cached["structures"] = self.parse_entity_structures(menu)
+        return cached["structures"]
+
+    async def get_entity_structure(
+        self,
+        device_name: str,
+        include_paths: list[str] | None = None,
+        exclude_paths: list[str] | None = None,
+    ):
+        """Get the hierarchical structure of entities for a specific device.
+
+        include_paths and exclude_paths contain menu paths like
+        "Kessel > Temperaturen" and restrict the returned structure to the
+        selected subtrees.
+        """
+        structure = (await self.get_entity_structures()).get(device_name)
+        if structure is None:
+            return None
+        return self.filter_entity_structure(structure, include_paths, exclude_paths)
+
+    @staticmethod
+    def _is_within_paths(path: str, paths: list[str]) -> bool:
+        return any(path == p or path.startswith(p + " > ") for p in paths)
+
+    def filter_entity_structure(
+        self,
+        node: dict,
+        include_paths: list[str] | None = None,
+        exclude_paths: list[str] | None = None,
+        parent_path: str = "",
+    ):
+        """Return a copy of a parsed menu node reduced to the selected subtrees.
+
+        An empty include list selects everything. Ancestors of included
+        subtrees are kept without their URI, so they are traversed but not
+        scanned themselves.
+        """
+        include_paths = include_paths or []
+        exclude_paths = exclude_paths or []
+        path = f"{parent_path} > {node['name']}" if parent_path else node["name"]
 
-        return None
+        if self._is_within_paths(path, exclude_paths):
+            return None
+        is_included = not include_paths or self._is_within_paths(path, include_paths)
+        if not is_included and not any(
+            p.startswith(path + " > ") for p in include_paths
+        ):
+            return None
+
+        children = []
+        for child in node.get("children", []):
+            filtered_child = self.filter_entity_structure(
+                child, include_paths, exclude_paths, path
+            )
+            if filtered_child:
+                children.append(filtered_child)
+
+        if not is_included and not children:
+            return None
+
+        return {
+            "name": node["name"],
+            "uri": node["uri"] if is_included else None,
+            "children": children,
+        }
+
+    @staticmethod
+    def get_subtree_paths(node: dict, parent_path: str = "") -> list[str]:
+        """Return the menu paths of all nodes which have children."""
+        if not node or not node.get("children"):
+            return []
+        path = f"{parent_path} > {node['name']}" if parent_path else node["name"]
+        paths = [path]
+        for child in node["children"]:
+            paths.extend(EtaAPI.get_subtree_paths(child, path))
+        return paths
+
+    @staticmethod
+    def get_endpoint_uris(node: dict) -> list[str]:
+        """Return the URIs of all nodes of a structure, in scan order."""
+        if not node:
+            return []
+        uris = [node["uri"]] if node.get("uri") else []
+        for child in node.get("children", []):
+            uris.extend(EtaAPI.get_endpoint_uris(child))
+        return uris
+
+    async def _send(
+        self, priority: RequestPriority, suffix, request
+    ) -> EtaTransportResponse:
+        """Send a request through the scheduler and the circuit breaker.
+
+        The circuit breaker is asked once the request got its slot of the
+        scheduler, so requests queued behind failing ones fail fast once the
+        circuit opens. The body is read while the request holds its slot, so
+        the returned response is already complete.
+        """
+        circuit_breaker = get_circuit_breaker(self._host, self._port)
+
+        async def timed_request():
+            # the timeout starts when the request leaves the queue and covers
+            # the body, so a slow body cannot hold the slot without a limit
+            loop = asyncio.get_running_loop()
+            started_at = loop.time()
+            response = None
+            try:
+                async with asyncio.timeout(self._request_timeout):
+                    raw_response = await request()
+                    body = await raw_response.text()
+                    response = EtaTransportResponse(raw_response.status, body)
+                    return response
+            except asyncio.CancelledError:
+                started_at = None
+                raise
+            finally:
+                if started_at is not None:
+                    latency = loop.time() - started_at
+                    if self._request_observer is not None:
+                        self._request_observer(suffix, latency)
+                    if self._request_stats is not None:
+                        self._request_stats.record_request(
+                            latency, response is not None and response.status < 500
+                        )
+
+        probe = None
+
+        def before_start():
+            nonlocal probe
+            probe = circuit_breaker.before_request()
+
+        scheduler = get_scheduler(self._host, self._port)
+        try:
+            response = await scheduler.run(
+                priority,
+                timed_request,
+                before_start=before_start,
+                is_success=lambda response: response.status < 500,
+                request_class=self._request_class(suffix),
+            )
+        except EtaTerminalUnavailableError:
+            raise
+        except (ClientError, OSError, TimeoutError):
+            circuit_breaker.record_failure()
+            raise
+        except BaseException:
+            circuit_breaker.record_aborted(probe)
+            raise
+
+        if response.status >= 500:
+            circuit_breaker.record_failure()
+        else:
+            circuit_breaker.record_success()
+        return response
+
+    @staticmethod
+    def _request_class(suffix: str) -> str:
+        """Return the endpoint type of a path, e.g. "var" for /user/var/40/10021."""
+        parts = suffix.split("/")
+        return parts[2] if len(parts) > 2 else suffix
 
     async def _get_request(self, suffix):
-        data = await self._session.get(self.build_uri(suffix))
+        data = await self._send(
+            self._priority, suffix, lambda: self._session.get(self.build_uri(suffix))
+        )
         return data
 
+    async def _get_text(self, suffix, cache_ttl: float = 0) -> str:
+        """GET the body of a path, sharing concurrent identical requests.
+
+        All callers asking for the same path while a request is in flight
+        await that request instead of sending their own. The body is shared
+        instead of the response object, because an aiohttp response can only
+        be read once. With cache_ttl, a body fetched less than cache_ttl
+        seconds ago is returned without asking the terminal.
+        """
+        key = (self._session, self._host, self._port, suffix)
+        loop = asyncio.get_running_loop()
+        if cache_ttl:
+            cached = _RESPONSE_CACHE.get(key)
+            if cached is not None and loop.time() - cached[0] < cache_ttl:
+                return cached[1]
+
+        task = _IN_FLIGHT.get(key)
+        if task is None:
+            task = loop.create_task(self._fetch_text(suffix))
+            _IN_FLIGHT[key] = task
+
+            def _remove_in_flight(finished_task):
+                if _IN_FLIGHT.get(key) is finished_task:
+                    del _IN_FLIGHT[key]
+                # all callers may have been cancelled, retrieve the exception so
+                # asyncio does not log it as never retrieved
+                if not finished_task.cancelled():
+                    finished_task.exception()
+
+            task.add_done_callback(_remove_in_flight)
+
+        # a cancelled caller must not cancel the request of the other callers
+        text = await asyncio.shield(task)
+        if cache_ttl:
+            _RESPONSE_CACHE[key] = (loop.time(), text)
+        return text
+
+    async def _parse_xml(self, text: str) -> dict:
+        return await get_xml_parser().parse(text)
+
+    async def _fetch_text(self, suffix) -> str:
+        data = await self._get_request(suffix)
+        text = await data.text()
+        if self._request_stats is not None:
+            self._request_stats.record_bytes(len(text.encode()))
+        return text
+
     async def post_request(self, suffix, data):
-        data = await self._session.post(self.build_uri(suffix), data=data)
-        return data
+        response = await self._send(
+            RequestPriority.WRITE,
+            suffix,
+            lambda: self._session.post(self.build_uri(suffix), data=data),
+        )
+        return response
 
     async def does_endpoint_exists(self):
         resp = await self._get_request("/user/menu")
         return resp.status == 200
 
     async def get_api_version(self):
-        data = await self._get_request("/user/api")
-        text = await data.text()
-        return version.parse(xmltodict.parse(text)["eta"]["api"]["@version"])
+        text = await self._get_text("/user/api", IDEMPOTENT_READ_CACHE_TTL)
+        api_version = version.parse(
+            (await self._parse_xml(text))["eta"]["api"]["@version"]
+        )
+        key = self._menu_cache_key
+        previous_version = _API_VERSIONS.get(key)
+        if previous_version is not None and previous_version != api_version:
+            # a firmware update may have changed the menu
+            _LOGGER.info(
+                "API version changed from %s to %s, dropping the cached menu",
+                previous_version,
+                api_version,
+            )
+            self.invalidate_menu_cache()
+        _API_VERSIONS[key] = api_version
+        return api_version
 
     async def is_correct_api_version(self):
         eta_version = await self.get_api_version()
@@ -175,27 +455,64 @@ class EtaAPI:
         return value, unit
 
     async def get_data(self, uri, force_number_handling=False):
-        data = await self._get_request("/user/var/" + str(uri))
-        text = await data.text()
-        data = xmltodict.parse(text)["eta"]["value"]
+        text = await self._get_text("/user/var/" + str(uri))
+        data = (await self._parse_xml(text))["eta"]["value"]
         return self._parse_data(data, force_number_handling)
 
     async def _get_data_plus_raw(self, uri):
-        data = await self._get_request("/user/var/" + str(uri))
-        text = await data.text()
-        data = xmltodict.parse(text)["eta"]["value"]
+        text = await self._get_text("/user/var/" + str(uri))
+        data = (await self._parse_xml(text))["eta"]["value"]
         value, unit = self._parse_data(data)
         return value, unit, data
 
-    async def get_menu(self):
-        data = await self._get_request("/user/menu")
-        text = await data.text()
-        return xmltodict.parse(text)
+    @property
+    def _menu_cache_key(self) -> tuple:
+        return (self._session, self._host, self._port)
+
+    async def get_menu(self, force_refresh: bool = False):
+        """Return the parsed /user/menu, fetching it at most once per MENU_CACHE_TTL.
 
-    async def async_get_entity_metadata(self, uri: str) -> dict:
-        """Get detailed metadata for a single entity URI."""
-        if await self.is_correct_api_version():
-            return await self._get_entity_metadata_v12(uri)
+        The menu is shared by all clients of the terminal and must not be
+        modified. With force_refresh the terminal is always asked.
+        """
+        key = self._menu_cache_key
+        loop = asyncio.get_running_loop()
+        cached = _MENU_CACHE.get(key)
+        if (
+            cached is not None
+            and not force_refresh
+            and loop.time() - cached["fetched_at"] < MENU_CACHE_TTL
+        ):
+            return cached["menu"]
+
+        text = await self._get_text("/user/menu")
+        menu = await self._parse_xml(text)
+        _MENU_CACHE[key] = {
+            "fetched_at": loop.time(),
+            "menu": menu,
+            "structures": None,
+        }
+        return menu
+
+    def invalidate_menu_cache(self) -> None:
+        """Forget the cached menu, so the next get_menu asks the terminal."""
+        _MENU_CACHE.pop(self._menu_cache_key, None)
+
+    async def async_get_entity_metadata(
+        self, uri: str, include_value: bool = True
+    ) -> dict:
+        """Get detailed metadata for a single entity URI.
+
+        With include_value=False the v1.2 path classifies the endpoint from
+        /user/varinfo alone and leaves "value" as None; the value is filled in
+        by the first poll cycle instead. The v1.1 path always reads the value,
+        because switch detection depends on it.
+        """
+        if self._is_v12 is None:
+            # Only ask the terminal once per client, not once per endpoint
+            self._is_v12 = await self.is_correct_api_version()
+        if self._is_v12:
+            return await self._get_entity_metadata_v12(uri, include_value)
         else:
             return await self._get_entity_metadata_v11(uri)
 
@@ -219,12 +536,17 @@ class EtaAPI:
 
         return endpoint_info
 
-    async def _get_entity_metadata_v12(self, uri: str) -> dict:
+    async def _get_entity_metadata_v12(
+        self, uri: str, include_value: bool = True
+    ) -> dict:
         """Get metadata for a single entity on API v1.2."""
         endpoint_info = await self._get_varinfo(None, uri)  # fub is not needed here
         if endpoint_info is None:
             return None
-        value, _ = await self.get_data(uri)
+        if include_value:
+            value, _ = await self.get_data(uri)
+        else:
+            value = None
         endpoint_info["value"] = value
 
         if self._is_switch(endpoint_info):
@@ -377,15 +699,54 @@ class EtaAPI:
             endpoint_type=data["type"],
         )
 
+    async def _get_cache_version(self) -> str:
+        """Return the API version used to key the metadata cache."""
+        if self._api_version is None:
+            self._api_version = await self.get_api_version()
+        return str(self._api_version)
+
+    async def get_terminal_fingerprint(self) -> str:
+        """Return a hash of the names and URIs in the menu of the terminal.
+
+        The varinfo metadata contains names and valid values in the language
+        of the terminal, so the metadata cache is only shared between
+        terminals with the same menu.
+        """
+        if self._terminal_fingerprint is None:
+            digest = hashlib.sha256()
+            for structure in (await self.get_entity_structures()).values():
+                self._hash_menu_node(digest, structure)
+            self._terminal_fingerprint = digest.hexdigest()[:16]
+        return self._terminal_fingerprint
+
+    @staticmethod
+    def _hash_menu_node(digest, node: dict) -> None:
+        digest.update(f"{node['name']}\0{node.get('uri') or ''}\n".encode())
+        for child in node.get("children", []):
+            EtaAPI._hash_menu_node(digest, child)
+
     async def _get_varinfo(self, fub, uri):
-        data = await self._get_request("/user/varinfo/" + str(uri))
-        text = await data.text()
-        parsed_xml = xmltodict.parse(text)
-        if "eta" not in parsed_xml or "varInfo" not in parsed_xml["eta"]:
-            _LOGGER.debug(f"URI {uri} does not seem to be a valid variable, skipping.")
-            return None
-        data = parsed_xml["eta"]["varInfo"]["variable"]
-        endpoint_info = self._parse_varinfo(data)
+        endpoint_info = None
+        if self._metadata_cache is not None:
+            cache_version = await self._get_cache_version()
+            terminal = await self.get_terminal_fingerprint()
+            endpoint_info = self._metadata_cache.get(cache_version, terminal, str(uri))
+
+        if endpoint_info is None:
+            text = await self._get_text("/user/varinfo/" + str(uri))
+            parsed_xml = await self._parse_xml(text)
+            if "eta" not in parsed_xml or "varInfo" not in parsed_xml["eta"]:
+                _LOGGER.debug(
+                    f"URI {uri} does not seem to be a valid variable, skipping."
+                )
+                return None
+            data = parsed_xml["eta"]["varInfo"]["variable"]
+            endpoint_info = self._parse_varinfo(data)
+            if self._metadata_cache is not None:
+                self._metadata_cache.put(
+                    cache_version, terminal, str(uri), endpoint_info
+                )
+
         endpoint_info["url"] = uri
         if fub:
             endpoint_info["friendly_name"] = f"{fub} > {endpoint_info['friendly_name']}"
@@ -396,7 +757,7 @@ class EtaAPI:
         uri = "/user/var/" + str(uri)
         data = await self.post_request(uri, payload)
         text = await data.text()
-        data = xmltodict.parse(text)["eta"]
+        data = (await self._parse_xml(text))["eta"]
         if "success" in data:
             return True
 
@@ -414,7 +775,7 @@ class EtaAPI:
         uri = "/user/var/" + str(uri)
         data = await self.post_request(uri, payload)
         text = await data.text()
-        data = xmltodict.parse(text)["eta"]
+        data = (await self._parse_xml(text))["eta"]
         if "success" in data:
             return True
         if "error" in data:
@@ -444,7 +805,7 @@ class EtaAPI:
                 fub_errors = [
                     fub_errors,
                 ]
-            errors = [
+            errors.extend(
                 ETAError(
                     msg=error["@msg"],
                     priority=error["@priority"],
@@ -459,12 +820,17 @@ class EtaAPI:
                     port=self._port,
                 )
                 for error in fub_errors
-            ]
+            )
 
         return errors
 
-    async def get_errors(self):
-        data = await self._get_request("/user/errors")
-        text = await data.text()
-        data = xmltodict.parse(text)["eta"]["errors"]["fub"]
+    async def get_errors_text(self) -> str:
+        """Return the raw /user/errors body, e.g. to skip parsing it if unchanged."""
+        return await self._get_text("/user/errors")
+
+    async def parse_errors(self, text: str) -> list[ETAError]:
+        data = (await self._parse_xml(text))["eta"]["errors"]["fub"]
         return self._parse_errors(data)
+
+    async def get_errors(self):
+        return await self.parse_errors(await self.get_errors_text())
@@ -59,6 +59,4 @@ class EtaResendErrorEventsButton(ButtonEntity):
 
     async def async_press(self) -> None:
         """Force the error update coordinator to resend all error events"""
-        # Delete the old error list to force the coordinator to resend all events
-        self.coordinator.data = []
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_resend_error_events()
@@ -0,0 +1,141 @@
+"""Circuit breaker which stops sending requests to an unreachable terminal."""
+
+from __future__ import annotations
+
+from enum import StrEnum
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Number of consecutive failed requests after which the circuit opens
+FAILURE_THRESHOLD = 5
+# Seconds to wait before the first probe request, doubled after every failed probe
+BASE_BACKOFF = 30
+MAX_BACKOFF = 15 * 60
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class EtaTerminalUnavailableError(Exception):
+    """Raised instead of sending a request while the circuit is open."""
+
+
+class EtaCircuitBreaker:
+    """Track request failures of a terminal and fail fast while it is down.
+
+    After FAILURE_THRESHOLD consecutive failures the circuit opens and all
+    requests fail immediately. Once the backoff has elapsed a single probe
+    request is let through: if it succeeds the circuit closes, otherwise it
+    opens again with twice the backoff.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        base_backoff: float = BASE_BACKOFF,
+        max_backoff: float = MAX_BACKOFF,
+        clock=time.monotonic,
+    ) -> None:
+        self._failure_threshold = failure_threshold
+        self._base_backoff = base_backoff
+        self._max_backoff = max_backoff
+        self._clock = clock
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.backoff = 0.0
+        self._opened_at = 0.0
+        # Token of the probe request in flight while the circuit is half open
+        self._probe: object | None = None
+        self.rejected_requests = 0
+
+    def before_request(self) -> object | None:
+        """Raise EtaTerminalUnavailableError if the request must not be sent.
+
+        Return a token if the request is the probe of a half open circuit,
+        which identifies it for record_aborted.
+        """
+        if self.state == CircuitState.CLOSED:
+            return None
+        if (
+            self.state == CircuitState.OPEN
+            and self._clock() - self._opened_at >= self.backoff
+        ):
+            self.state = CircuitState.HALF_OPEN
+        if self.state == CircuitState.HALF_OPEN and self._probe is None:
+            self._probe = object()
+            return self._probe
+        self.rejected_requests += 1
+        raise EtaTerminalUnavailableError(
+            f"ETA terminal is unreachable, next attempt in {self.retry_in:.0f}s"
+        )
+
+    def record_success(self) -> None:
+        if self.state != CircuitState.CLOSED:
+            _LOGGER.info("ETA terminal is reachable again, closing the circuit")
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.backoff = 0.0
+        self._probe = None
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == CircuitState.HALF_OPEN:
+            self._open(min(self.backoff * 2, self._max_backoff))
+        elif (
+            self.state == CircuitState.CLOSED
+            and self.consecutive_failures >= self._failure_threshold
+        ):
+            self._open(self._base_backoff)
+
+    def record_aborted(self, probe: object | None) -> None:
+        """Forget a request which was cancelled before it had a result.
+
+        probe is the token before_request returned for the request. Only an
+        aborted probe allows the next one, other requests do not change the
+        state.
+        """
+        if probe is not None and probe is self._probe:
+            self._probe = None
+
+    @property
+    def retry_in(self) -> float:
+        """Return the seconds until the next probe request is allowed."""
+        if self.state != CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self.backoff - (self._clock() - self._opened_at))
+
+    def as_dict(self) -> dict:
+        return {
+            "state": str(self.state),
+            "consecutive_failures": self.consecutive_failures,
+            "backoff": self.backoff,
+            "retry_in": self.retry_in,
+            "rejected_requests": self.rejected_requests,
+        }
+
+    def _open(self, backoff: float) -> None:
+        _LOGGER.warning(
+            "ETA terminal failed %d times in a row, pausing requests for %.0fs",
+            self.consecutive_failures,
+            backoff,
+        )
+        self.state = CircuitState.OPEN
+        self.backoff = backoff
+        self._opened_at = self._clock()
+        self._probe = None
+
+
+_CIRCUIT_BREAKERS: dict[tuple[str, int], EtaCircuitBreaker] = {}
+
+
+def get_circuit_breaker(host: str, port: int) -> EtaCircuitBreaker:
+    """Return the circuit breaker shared by all clients of a terminal."""
+    key = (host, int(port))
+    if key not in _CIRCUIT_BREAKERS:
+        _CIRCUIT_BREAKERS[key] = EtaCircuitBreaker()
+    return _CIRCUIT_BREAKERS[key]
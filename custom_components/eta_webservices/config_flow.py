@@ -1,7 +1,10 @@
 """Adds config flow for Blueprint."""
 
+import asyncio
 import copy
 import logging
+from aiohttp import ClientError
+from packaging import version
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
@@ -13,7 +16,10 @@ from homeassistant.helpers.entity_registry import (
     async_get,
 )
 import homeassistant.helpers.config_validation as cv
-from .api import ETAEndpoint, EtaAPI
+from .api import EtaAPI
+from .circuit_breaker import EtaTerminalUnavailableError
+from .metadata_cache import async_get_metadata_cache
+from .scheduler import RequestPriority
 from .const import (
     DOMAIN,
     FLOAT_DICT,
@@ -29,7 +35,18 @@ from .const import (
     FORCE_LEGACY_MODE,
     FORCE_SENSOR_DETECTION,
     ENABLE_DEBUG_LOGGING,
-    INVISIBLE_UNITS,
+    DISCOVERY_INCLUDE_PATHS,
+    DISCOVERY_EXCLUDE_PATHS,
+    POLL_PROFILES,
+    ERROR_EVENTS_PER_ERROR,
+    ERROR_EVENTS_AGGREGATED,
+    REQUESTS_PER_SECOND,
+    POLL_PROFILE_STATUS_SENSOR,
+    POLL_PROFILE_IDLE_STATES,
+    POLL_PROFILE_IDLE_INTERVAL,
+    POLL_PROFILE_ACTIVE_INTERVAL,
+    DEFAULT_IDLE_INTERVAL,
+    DEFAULT_ACTIVE_INTERVAL,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -47,6 +64,14 @@ class EtaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         self.data = {}
         self.options = {}
         self._old_logging_level = logging.NOTSET
+        self._device_structures = {}
+        # Terminal session of this flow, opened by the user step and reused by
+        # all later steps
+        self._eta_client: EtaAPI | None = None
+        self._api_version = None
+        # Endpoints per device and request count shown by the confirm_scan
+        # step, the scan uses the same devices after the confirmation
+        self._scan_estimate: tuple[dict[str, int], int] | None = None
 
     async def async_step_user(self, user_input=None):
         """Handle a flow initialized by the user."""
@@ -61,12 +86,11 @@ class EtaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             for entry in platform_entries:
                 if entry.data.get(CONF_HOST, "") == user_input[CONF_HOST]:
                     return self.async_abort(reason="single_instance_allowed")
-            valid = await self._test_url(user_input[CONF_HOST], user_input[CONF_PORT])
-            if valid == 1:
-                is_correct_api_version = await self._is_correct_api_version(
-                    user_input[CONF_HOST], user_input[CONF_PORT]
-                )
-                if not is_correct_api_version:
+            error = await self._async_connect(
+                user_input[CONF_HOST], user_input[CONF_PORT]
+            )
+            if error is None:
+                if self._api_version < version.parse("1.2"):
                     self._errors["base"] = "wrong_api_version"
                     return await self._show_config_form_user(user_input)
                 if user_input[FORCE_LEGACY_MODE]:
@@ -77,18 +101,14 @@ class EtaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                     _LOGGER.parent.setLevel(logging.DEBUG)
 
                 self.data = user_input
-                self.data["possible_devices"] = await self._get_possible_devices(
-                    user_input[CONF_HOST], user_input[CONF_PORT]
-                )
+                self.data["possible_devices"] = list(self._device_structures)
 
                 if not self.data["possible_devices"]:
                     self._errors["base"] = "no_devices_found"
                     return await self._show_config_form_user(user_input)
-                return await self.async_step_confirm_scan()
+                return await self.async_step_select_subtrees()
             else:
-                self._errors["base"] = (
-                    "no_eta_endpoint" if valid == 0 else "unknown_host"
-                )
+                self._errors["base"] = error
 
             return await self._show_config_form_user(user_input)
 
@@ -99,24 +119,102 @@ class EtaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
         return await self._show_config_form_user(user_input)
 
+    async def async_step_select_subtrees(self, user_input=None):
+        """Step to restrict the scan to selected parts of the menu."""
+        if user_input is not None:
+            self.options[DISCOVERY_INCLUDE_PATHS] = user_input.get(
+                DISCOVERY_INCLUDE_PATHS, []
+            )
+            self.options[DISCOVERY_EXCLUDE_PATHS] = user_input.get(
+                DISCOVERY_EXCLUDE_PATHS, []
+            )
+            return await self.async_step_confirm_scan()
+
+        subtree_options = [
+            selector.SelectOptionDict(value=path, label=path)
+            for structure in self._device_structures.values()
+            for path in EtaAPI.get_subtree_paths(structure)
+        ]
+
+        return self.async_show_form(
+            step_id="select_subtrees",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        DISCOVERY_INCLUDE_PATHS, default=[]
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=subtree_options,
+                            mode=selector.SelectSelectorMode.DROPDOWN,
+                            multiple=True,
+                        )
+                    ),
+                    vol.Optional(
+                        DISCOVERY_EXCLUDE_PATHS, default=[]
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=subtree_options,
+                            mode=selector.SelectSelectorMode.DROPDOWN,
+                            multiple=True,
+                        )
+                    ),
+                }
+            ),
+        )
+
+    async def _estimate_scan(self) -> tuple[dict[str, int], int]:
+        """Return the number of endpoints per device and the expected request count."""
+        eta_client = self._eta_client
+        metadata_cache = await async_get_metadata_cache(self.hass)
+        api_version = str(self._api_version)
+        terminal = await eta_client.get_terminal_fingerprint()
+
+        endpoint_counts = {}
+        request_count = 1  # /user/api
+        for device, structure in self._device_structures.items():
+            filtered = eta_client.filter_entity_structure(
+                structure,
+                self.options.get(DISCOVERY_INCLUDE_PATHS),
+                self.options.get(DISCOVERY_EXCLUDE_PATHS),
+            )
+            uris = eta_client.get_endpoint_uris(filtered)
+            if not uris:
+                continue
+            endpoint_counts[device] = len(uris)
+            # the menu is already cached, so only the endpoints which are not
+            # in the metadata cache need a /user/varinfo request
+            request_count += sum(
+                (api_version, terminal, uri) not in metadata_cache for uri in uris
+            )
+        return endpoint_counts, request_count
+
     async def async_step_confirm_scan(self, user_input=None):
         """Step to confirm the scan of all devices."""
         if user_input is not None:
-            self.data["devices_to_scan"] = self.data["possible_devices"].copy()
+            endpoint_counts, _ = self._scan_estimate
+            self.data["devices_to_scan"] = [
+                device
+                for device in self.data["possible_devices"]
+                if device in endpoint_counts
+            ]
             self.data["scanned_devices_data"] = {}
             return await self.async_step_scan_device()
 
-        devices = self.data.get("possible_devices", [])
+        self._scan_estimate = await self._estimate_scan()
+        endpoint_counts, request_count = self._scan_estimate
         return self.async_show_form(
             step_id="confirm_scan",
-            description_placeholders={"devices": ", ".join(devices)},
+            description_placeholders={
+                "devices": ", ".join(endpoint_counts),
+                "endpoint_count": str(sum(endpoint_counts.values())),
+                "request_count": str(request_count),
+            },
             data_schema=vol.Schema({}),
         )
 
     async def _scan_device(self, device_name: str):
         """Scan a device and get all its entities."""
-        session = async_get_clientsession(self.hass)
-        eta_client = EtaAPI(session, self.data[CONF_HOST], self.data[CONF_PORT])
+        eta_client = self._eta_client
 
         entities = {
             FLOAT_DICT: {},
@@ -125,33 +223,39 @@ class EtaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             WRITABLE_DICT: {},
         }
 
-        async def traverse_and_scan(node):
-            if not node:
-                return
-
-            if uri := node.get("uri"):
-                try:
-                    metadata = await eta_client.async_get_entity_metadata(uri)
-                    if metadata:
-                        entity_type = eta_client.classify_entity(metadata)
-                        if entity_type == "sensor":
-                            if metadata.get("unit") == "":
-                                entities[TEXT_DICT][uri] = metadata
-                            else:
-                                entities[FLOAT_DICT][uri] = metadata
-                        elif entity_type == "switch":
-                            entities[SWITCHES_DICT][uri] = metadata
-                        elif entity_type in ("number", "time"):
-                            entities[WRITABLE_DICT][uri] = metadata
-                except Exception as e:
-                    _LOGGER.warning(f"Could not scan URI {uri}: {e}")
-
-            if children := node.get("children"):
-                for child in children:
-                    await traverse_and_scan(child)
-
-        structure = await eta_client.get_entity_structure(device_name)
-        await traverse_and_scan(structure)
+        async def scan_uri(uri):
+            try:
+                return await eta_client.async_get_entity_metadata(
+                    uri, include_value=False
+                )
+            except Exception as e:
+                _LOGGER.warning(f"Could not scan URI {uri}: {e}")
+                return None
+
+        # The menu was fetched once by the user step
+        structure = eta_client.filter_entity_structure(
+            self._device_structures[device_name],
+            self.options.get(DISCOVERY_INCLUDE_PATHS),
+            self.options.get(DISCOVERY_EXCLUDE_PATHS),
+        )
+        uris = eta_client.get_endpoint_uris(structure)
+        # The terminal's scheduler adapts the number of parallel requests to
+        # the measured latency
+        results = await asyncio.gather(*(scan_uri(uri) for uri in uris))
+
+        for uri, metadata in zip(uris, results, strict=True):
+            if not metadata:
+                continue
+            entity_type = eta_client.classify_entity(metadata)
+            if entity_type == "sensor":
+                if metadata.get("unit") == "":
+                    entities[TEXT_DICT][uri] = metadata
+                else:
+                    entities[FLOAT_DICT][uri] = metadata
+            elif entity_type == "switch":
+                entities[SWITCHES_DICT][uri] = metadata
+            elif entity_type in ("number", "time"):
+                entities[WRITABLE_DICT][uri] = metadata
 
         return entities
 
@@ -159,7 +263,11 @@ class EtaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         """Step to scan a single device."""
         if not self.data.get("devices_to_scan"):
             # All devices scanned, move to device selection
-            self.data[CHOSEN_DEVICES] = self.data["possible_devices"]
+            self.data[CHOSEN_DEVICES] = [
+                device
+                for device in self.data["possible_devices"]
+                if device in self.data["scanned_devices_data"]
+            ]
             return await self.async_step_select_device()
 
         device_to_scan = self.data["devices_to_scan"][0]
@@ -235,13 +343,17 @@ class EtaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             self.options.setdefault(CHOSEN_TEXT_SENSORS, [])
             self.options.setdefault(CHOSEN_WRITABLE_SENSORS, [])
 
-            # Use a dummy API client just for classify_entity
-            session = async_get_clientsession(self.hass)
-            eta_client = EtaAPI(session, self.data[CONF_HOST], self.data[CONF_PORT])
+            eta_client = self._eta_client
 
             # Clear out previous selections for THIS DEVICE ONLY
             device_entity_keys = all_entities.keys()
-            for category_list in self.options.values():
+            for category in (
+                CHOSEN_FLOAT_SENSORS,
+                CHOSEN_SWITCHES,
+                CHOSEN_TEXT_SENSORS,
+                CHOSEN_WRITABLE_SENSORS,
+            ):
+                category_list = self.options[category]
                 for entity_key in list(category_list):
                     if entity_key in device_entity_keys:
                         category_list.remove(entity_key)
@@ -345,110 +457,35 @@ class EtaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             errors=self._errors,
         )
 
-    async def _show_config_form_endpoint(
-        self,
-        current_chosen_sensors=[],
-        current_chosen_switches=[],
-        current_chosen_text_sensors=[],
-        current_chosen_writable_sensors=[],
-    ):
-        """Show the configuration form to select which endpoints should become entities."""
-        sensors_dict: dict[str, ETAEndpoint] = self.data[FLOAT_DICT]
-        switches_dict: dict[str, ETAEndpoint] = self.data[SWITCHES_DICT]
-        text_dict: dict[str, ETAEndpoint] = self.data[TEXT_DICT]
-        writable_dict: dict[str, ETAEndpoint] = self.data[WRITABLE_DICT]
-
-        return self.async_show_form(
-            step_id="select_entities",
-            data_schema=vol.Schema(
-                {
-                    vol.Optional(CHOSEN_FLOAT_SENSORS): selector.SelectSelector(
-                        selector.SelectSelectorConfig(
-                            options=[
-                                selector.SelectOptionDict(
-                                    value=key,
-                                    label=f"{sensors_dict[key]['friendly_name']} ({sensors_dict[key]['value']} {sensors_dict[key]['unit'] if sensors_dict[key]['unit'] not in INVISIBLE_UNITS else ""})",
-                                )
-                                for key in sensors_dict
-                            ],
-                            mode=selector.SelectSelectorMode.DROPDOWN,
-                            multiple=True,
-                        )
-                    ),
-                    vol.Optional(CHOSEN_SWITCHES): selector.SelectSelector(
-                        selector.SelectSelectorConfig(
-                            options=[
-                                selector.SelectOptionDict(
-                                    value=key,
-                                    label=f"{switches_dict[key]['friendly_name']} ({switches_dict[key]['value']})",
-                                )
-                                for key in switches_dict
-                            ],
-                            mode=selector.SelectSelectorMode.DROPDOWN,
-                            multiple=True,
-                        )
-                    ),
-                    vol.Optional(CHOSEN_TEXT_SENSORS): selector.SelectSelector(
-                        selector.SelectSelectorConfig(
-                            options=[
-                                selector.SelectOptionDict(
-                                    value=key,
-                                    label=f"{text_dict[key]['friendly_name']} ({text_dict[key]['value']})",
-                                )
-                                for key in text_dict
-                            ],
-                            mode=selector.SelectSelectorMode.DROPDOWN,
-                            multiple=True,
-                        )
-                    ),
-                    vol.Optional(CHOSEN_WRITABLE_SENSORS): selector.SelectSelector(
-                        selector.SelectSelectorConfig(
-                            options=[
-                                selector.SelectOptionDict(
-                                    value=key,
-                                    label=f"{writable_dict[key]['friendly_name']} ({writable_dict[key]['value']} {writable_dict[key]['unit'] if writable_dict[key]['unit'] not in INVISIBLE_UNITS else ""})",
-                                )
-                                for key in writable_dict
-                            ],
-                            mode=selector.SelectSelectorMode.DROPDOWN,
-                            multiple=True,
-                        )
-                    ),
-                }
-            ),
-            errors=self._errors,
+    async def _async_connect(self, host, port) -> str | None:
+        """Open the terminal session of this flow.
+
+        Fetches the API version and a fresh menu in parallel, so the whole
+        flow is served by a single round-trip. Returns the key of the form
+        error if the terminal cannot be used.
+        """
+        self._eta_client = EtaAPI(
+            async_get_clientsession(self.hass),
+            host,
+            port,
+            metadata_cache=await async_get_metadata_cache(self.hass),
+            priority=RequestPriority.DISCOVERY,
         )
-
-    async def _get_possible_devices(self, host, port) -> list[str]:
-        """Get a list of possible devices (fubs) from the ETA API."""
-        session = async_get_clientsession(self.hass)
-        eta_client = EtaAPI(session, host, port)
-        try:
-            menu = await eta_client.get_menu()
-            raw_devices = menu["eta"]["menu"]["fub"]
-            if not isinstance(raw_devices, list):
-                raw_devices = [raw_devices]
-            return [device["@name"] for device in raw_devices if "@name" in device]
-        except Exception as e:
-            _LOGGER.error(f"Error getting devices from ETA API: {e}")
-            return []
-
-    async def _test_url(self, host, port):
-        """Return true if host port is valid."""
-        session = async_get_clientsession(self.hass)
-        eta_client = EtaAPI(session, host, port)
-
         try:
-            does_endpoint_exist = await eta_client.does_endpoint_exists()
-        except:
-            return -1
-        return 1 if does_endpoint_exist else 0
-
-    async def _is_correct_api_version(self, host, port):
-        session = async_get_clientsession(self.hass)
-        eta_client = EtaAPI(session, host, port)
+            # Setting up an entry rediscovers the terminal, so skip the menu cache
+            self._api_version, menu = await asyncio.gather(
+                self._eta_client.get_api_version(),
+                self._eta_client.get_menu(force_refresh=True),
+            )
+        except (ClientError, OSError, TimeoutError, EtaTerminalUnavailableError):
+            return "unknown_host"
+        except Exception as e:  # pylint: disable=broad-except
+            # The host answered, but not like an ETA terminal
+            _LOGGER.error(f"Unexpected answer from the ETA API: {e}")
+            return "no_eta_endpoint"
 
-        return await eta_client.is_correct_api_version()
+        self._device_structures = self._eta_client.parse_entity_structures(menu)
+        return None
 
 
 class EtaOptionsFlowHandler(config_entries.OptionsFlow):
@@ -468,8 +505,15 @@ class EtaOptionsFlowHandler(config_entries.OptionsFlow):
 
         if self.device_name:
             return await self.async_step_select_entities()
-        else:
-            return await self.async_step_select_device()
+        return self.async_show_menu(
+            step_id="init",
+            menu_options=[
+                "select_device",
+                "select_poll_profile_device",
+                "error_events",
+                "request_rate",
+            ],
+        )
 
     async def async_step_select_device(self, user_input=None):
         """Step to select a device to configure."""
@@ -495,6 +539,184 @@ class EtaOptionsFlowHandler(config_entries.OptionsFlow):
             ),
         )
 
+    async def async_step_select_poll_profile_device(self, user_input=None):
+        """Step to select the device whose poll profile should be edited."""
+        if user_input is not None:
+            self.device_name = user_input["device"]
+            return await self.async_step_poll_profile()
+
+        devices = self.config_entry.data.get(CHOSEN_DEVICES, [])
+        return self.async_show_form(
+            step_id="select_poll_profile_device",
+            data_schema=vol.Schema(
+                {
+                    vol.Required("device"): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=devices,
+                            mode=selector.SelectSelectorMode.LIST,
+                        )
+                    ),
+                }
+            ),
+        )
+
+    async def async_step_error_events(self, user_input=None):
+        """Step to choose which events are fired when the errors change."""
+        options = dict(self.config_entry.options)
+
+        if user_input is not None:
+            options[ERROR_EVENTS_PER_ERROR] = user_input[ERROR_EVENTS_PER_ERROR]
+            options[ERROR_EVENTS_AGGREGATED] = user_input[ERROR_EVENTS_AGGREGATED]
+            return self.async_create_entry(title="", data=options)
+
+        return self.async_show_form(
+            step_id="error_events",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        ERROR_EVENTS_PER_ERROR,
+                        default=options.get(ERROR_EVENTS_PER_ERROR, True),
+                    ): cv.boolean,
+                    vol.Required(
+                        ERROR_EVENTS_AGGREGATED,
+                        default=options.get(ERROR_EVENTS_AGGREGATED, False),
+                    ): cv.boolean,
+                }
+            ),
+        )
+
+    async def async_step_request_rate(self, user_input=None):
+        """Step to limit the number of requests per second sent to the terminal."""
+        options = dict(self.config_entry.options)
+
+        if user_input is not None:
+            # 0 removes the limit
+            options[REQUESTS_PER_SECOND] = user_input[REQUESTS_PER_SECOND] or None
+            return self.async_create_entry(title="", data=options)
+
+        return self.async_show_form(
+            step_id="request_rate",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        REQUESTS_PER_SECOND,
+                        default=options.get(REQUESTS_PER_SECOND) or 0,
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            max=50,
+                            step=0.5,
+                            unit_of_measurement="1/s",
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                }
+            ),
+        )
+
+    async def async_step_poll_profile(self, user_input=None):
+        """Step to slow down the polling of a device while it is idle."""
+        options = copy.deepcopy(dict(self.config_entry.options))
+        poll_profiles = options.setdefault(POLL_PROFILES, {})
+
+        if user_input is not None:
+            if user_input.get(POLL_PROFILE_STATUS_SENSOR):
+                poll_profiles[self.device_name] = {
+                    POLL_PROFILE_STATUS_SENSOR: user_input[POLL_PROFILE_STATUS_SENSOR],
+                    POLL_PROFILE_IDLE_STATES: user_input.get(
+                        POLL_PROFILE_IDLE_STATES, []
+                    ),
+                    POLL_PROFILE_IDLE_INTERVAL: int(
+                        user_input[POLL_PROFILE_IDLE_INTERVAL]
+                    ),
+                    POLL_PROFILE_ACTIVE_INTERVAL: int(
+                        user_input[POLL_PROFILE_ACTIVE_INTERVAL]
+                    ),
+                }
+            else:
+                # without a status sensor the device is polled as usual
+                poll_profiles.pop(self.device_name, None)
+            return self.async_create_entry(title="", data=options)
+
+        device_data = self.hass.data[DOMAIN][self.config_entry.entry_id][
+            self.device_name
+        ].data
+        text_sensors = device_data.get(TEXT_DICT, {})
+        profile = poll_profiles.get(self.device_name, {})
+        # Offer the states the terminal reports as valid for the text sensors
+        known_states = sorted(
+            {
+                str(state)
+                for entity in text_sensors.values()
+                for state in (entity.get("valid_values") or {})
+            }
+            | set(profile.get(POLL_PROFILE_IDLE_STATES, []))
+        )
+
+        status_sensor_key = vol.Optional(POLL_PROFILE_STATUS_SENSOR)
+        if profile.get(POLL_PROFILE_STATUS_SENSOR):
+            status_sensor_key = vol.Optional(
+                POLL_PROFILE_STATUS_SENSOR,
+                default=profile[POLL_PROFILE_STATUS_SENSOR],
+            )
+
+        return self.async_show_form(
+            step_id="poll_profile",
+            data_schema=vol.Schema(
+                {
+                    status_sensor_key: selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[
+                                selector.SelectOptionDict(
+                                    value=key, label=entity["friendly_name"]
+                                )
+                                for key, entity in text_sensors.items()
+                            ],
+                            mode=selector.SelectSelectorMode.DROPDOWN,
+                        )
+                    ),
+                    vol.Optional(
+                        POLL_PROFILE_IDLE_STATES,
+                        default=profile.get(POLL_PROFILE_IDLE_STATES, []),
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=known_states,
+                            mode=selector.SelectSelectorMode.DROPDOWN,
+                            multiple=True,
+                            custom_value=True,
+                        )
+                    ),
+                    vol.Required(
+                        POLL_PROFILE_IDLE_INTERVAL,
+                        default=profile.get(
+                            POLL_PROFILE_IDLE_INTERVAL, DEFAULT_IDLE_INTERVAL
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=10,
+                            max=3600,
+                            unit_of_measurement="s",
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Required(
+                        POLL_PROFILE_ACTIVE_INTERVAL,
+                        default=profile.get(
+                            POLL_PROFILE_ACTIVE_INTERVAL, DEFAULT_ACTIVE_INTERVAL
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=5,
+                            max=3600,
+                            unit_of_measurement="s",
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                }
+            ),
+            description_placeholders={"device_name": self.device_name},
+        )
+
     async def async_step_select_entities(self, user_input=None):
         """Step to select entities for a specific device."""
         if user_input is not None:
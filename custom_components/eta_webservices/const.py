@@ -19,6 +19,19 @@ ENABLE_DEBUG_LOGGING = "enable_debug_logging"
 ERROR_UPDATE_COORDINATOR = "error_update_coordinator"
 DATA_UPDATE_COORDINATOR = "data_update_coordinator"
 CHOSEN_DEVICES = "chosen_devices"
+METADATA_CACHE = "metadata_cache"
+ENDPOINT_QUARANTINE = "endpoint_quarantine"
+ERROR_HISTORY = "error_history"
+ERROR_EVENTS_PER_ERROR = "error_events_per_error"
+ERROR_EVENTS_AGGREGATED = "error_events_aggregated"
+DISCOVERY_INCLUDE_PATHS = "discovery_include_paths"
+DISCOVERY_EXCLUDE_PATHS = "discovery_exclude_paths"
+POLL_PROFILES = "poll_profiles"
+POLL_PROFILE_STATUS_SENSOR = "status_sensor"
+POLL_PROFILE_IDLE_STATES = "idle_states"
+POLL_PROFILE_IDLE_INTERVAL = "idle_interval"
+POLL_PROFILE_ACTIVE_INTERVAL = "active_interval"
+REQUESTS_PER_SECOND = "requests_per_second"
 
 CUSTOM_UNIT_MINUTES_SINCE_MIDNIGHT = "minutes_since_midnight"
 INVISIBLE_UNITS = [CUSTOM_UNIT_MINUTES_SINCE_MIDNIGHT]
@@ -26,6 +39,13 @@ INVISIBLE_UNITS = [CUSTOM_UNIT_MINUTES_SINCE_MIDNIGHT]
 # Defaults
 DEFAULT_NAME = DOMAIN
 REQUEST_TIMEOUT = 60
+# Seconds for which the body of /user/api is reused
+IDEMPOTENT_READ_CACHE_TTL = 10
+# Seconds for which the parsed /user/menu is shared by all devices and callers
+MENU_CACHE_TTL = 60 * 60
+# Poll intervals in seconds of a device with a poll profile
+DEFAULT_IDLE_INTERVAL = 5 * 60
+DEFAULT_ACTIVE_INTERVAL = 60
 
 STARTUP_MESSAGE = f"""
 -------------------------------------------------------------------
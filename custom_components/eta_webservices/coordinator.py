@@ -4,13 +4,22 @@ from __future__ import annotations
 
 import asyncio
 from asyncio import timeout
+from collections.abc import Sequence
 from datetime import timedelta
+import hashlib
 import logging
+import random
+from typing import TypeVar
 
 from homeassistant.const import CONF_HOST, CONF_PORT
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
@@ -25,21 +34,185 @@ from .const import (
     CUSTOM_UNIT_MINUTES_SINCE_MIDNIGHT,
     FORCE_LEGACY_MODE,
     DATA_UPDATE_COORDINATOR,
+    ERROR_UPDATE_COORDINATOR,
+    DISCOVERY_INCLUDE_PATHS,
+    DISCOVERY_EXCLUDE_PATHS,
+    POLL_PROFILES,
+    POLL_PROFILE_STATUS_SENSOR,
+    POLL_PROFILE_IDLE_STATES,
+    POLL_PROFILE_IDLE_INTERVAL,
+    POLL_PROFILE_ACTIVE_INTERVAL,
+    ERROR_EVENTS_PER_ERROR,
+    ERROR_EVENTS_AGGREGATED,
 )
 from .api import EtaAPI, ETAError, ETAEndpoint
+from .circuit_breaker import (
+    CircuitState,
+    EtaTerminalUnavailableError,
+    get_circuit_breaker,
+)
+from .error_history import EtaErrorHistory, error_key
+from .metadata_cache import async_get_metadata_cache
+from .quarantine import EtaEndpointQuarantine
+from .scheduler import RequestPriority
+from .stats import EtaRequestStats
 
 DATA_SCAN_INTERVAL = timedelta(minutes=1)
+# Seconds a single sensor read may take once it has left the request queue
+POLL_REQUEST_TIMEOUT = 10
 # the error endpoint doesn't have to be updated as often because we don't expect any updates most of the time
 ERROR_SCAN_INTERVAL = timedelta(minutes=2)
 
+# Random deviation from the phase, as a fraction of the update interval
+REFRESH_JITTER = 0.02
+
 _LOGGER = logging.getLogger(__name__)
 
+_DataT = TypeVar("_DataT")
+
+
+def next_refresh_delay(
+    now: float, interval: float, phase: float, jitter: float = 0.0
+) -> float:
+    """Return the delay until the next refresh slot of a coordinator.
+
+    Slots are phase * interval seconds after every multiple of the interval
+    on the clock of the event loop. The next slot is at least half an
+    interval away, so a refresh requested in between does not cause two
+    cycles in a row.
+    """
+    target = now + interval
+    slot = target - ((target - phase * interval) % interval)
+    if slot - now < interval / 2:
+        slot += interval
+    return max(0.0, slot - now + jitter)
+
+
+def assign_refresh_phases(
+    coordinators: Sequence[EtaStaggeredCoordinator], key: str
+) -> None:
+    """Spread the cycles of the coordinators of an entry evenly over the interval.
+
+    The offset of the entry is derived from its key, so the coordinators of
+    different entries on the same site do not start in the same slots.
+    """
+    digest = hashlib.sha256(key.encode()).digest()
+    offset = int.from_bytes(digest[:4], "big") / 2**32
+    for index, coordinator in enumerate(coordinators):
+        coordinator.phase = (offset + index / len(coordinators)) % 1
+
+
+class EtaStaggeredCoordinator(DataUpdateCoordinator[_DataT]):
+    """Coordinator whose cycles start at a fixed phase of its update interval.
+
+    The duration and the requests of every cycle are recorded for the
+    performance sensors. Subclasses implement _async_run_cycle.
+    """
+
+    # Fraction of the update interval, set by assign_refresh_phases
+    phase: float = 0.0
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # Requests of all EtaAPI clients of this coordinator
+        self.request_stats = EtaRequestStats()
+        self.last_cycle: dict | None = None
+        self.last_successful_refresh = None
+        self._failed_cycle_listeners: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_add_failed_cycle_listener(
+        self, update_callback: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """Listen for every failed cycle.
+
+        The base class only updates its listeners for the first of several
+        failed cycles in a row.
+        """
+        self._failed_cycle_listeners.append(update_callback)
+        return lambda: self._failed_cycle_listeners.remove(update_callback)
+
+    async def _async_update_data(self) -> _DataT:
+        """Run a cycle and record its duration and requests."""
+        requests, failed_requests, bytes_received = self.request_stats.snapshot()
+        started_at = self.hass.loop.time()
+        try:
+            data = await self._async_run_cycle()
+        except Exception:
+            self._record_cycle(started_at, requests, failed_requests, bytes_received)
+            if not self.last_update_success:
+                for update_callback in list(self._failed_cycle_listeners):
+                    update_callback()
+            raise
+        self._record_cycle(started_at, requests, failed_requests, bytes_received)
+        self.last_successful_refresh = dt_util.utcnow()
+        return data
+
+    def _record_cycle(
+        self, started_at: float, requests: int, failed_requests: int, received: int
+    ) -> None:
+        now_requests, now_failed, now_received = self.request_stats.snapshot()
+        self.last_cycle = {
+            "duration": self.hass.loop.time() - started_at,
+            "requests": now_requests - requests,
+            "failed_requests": now_failed - failed_requests,
+            "bytes_received": now_received - received,
+        }
+
+    async def _async_run_cycle(self) -> _DataT:
+        raise NotImplementedError
+
+    def performance_as_dict(self) -> dict:
+        """Return the numbers of the last cycle, latencies in seconds."""
+        cycle = self.last_cycle or {}
+        return {
+            "cycle_duration": cycle.get("duration"),
+            "requests_per_cycle": cycle.get("requests"),
+            "failed_requests": cycle.get("failed_requests"),
+            "p95_latency": self.request_stats.latency_percentile(0.95),
+            "bytes_received": cycle.get("bytes_received"),
+            "last_successful_refresh": self.last_successful_refresh,
+        }
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        interval = self.update_interval
+        if interval is None:
+            super()._schedule_refresh()
+            return
+        interval_seconds = interval.total_seconds()
+        jitter = random.uniform(-REFRESH_JITTER, REFRESH_JITTER) * interval_seconds
+        delay = next_refresh_delay(
+            self.hass.loop.time(), interval_seconds, self.phase, jitter
+        )
+        # Let the base class schedule the refresh, just with our delay
+        self.update_interval = timedelta(seconds=delay)
+        try:
+            super()._schedule_refresh()
+        finally:
+            self.update_interval = interval
+
+    def phase_as_dict(self) -> dict:
+        interval = self.update_interval
+        return {
+            "update_interval": interval.total_seconds() if interval else None,
+            "phase": self.phase,
+            "phase_seconds": (
+                self.phase * interval.total_seconds() if interval else None
+            ),
+        }
 
-class EtaDataUpdateCoordinator(DataUpdateCoordinator):
+
+class EtaDataUpdateCoordinator(EtaStaggeredCoordinator[dict]):
     """Class to manage fetching data from the ETA terminal."""
 
     def __init__(
-        self, hass: HomeAssistant, config: dict, device_name: str, entry_id: str
+        self,
+        hass: HomeAssistant,
+        config: dict,
+        device_name: str,
+        entry_id: str,
+        quarantine: EtaEndpointQuarantine | None = None,
     ) -> None:
         """Initialize."""
         self.host = config.get(CONF_HOST)
@@ -48,18 +221,318 @@ class EtaDataUpdateCoordinator(DataUpdateCoordinator):
         self.device_name = device_name
         self.entry_id = entry_id
         self.config = config
+        self.quarantine = quarantine
+        self._quarantine_task: asyncio.Task | None = None
+        # Latency of the last request per URI, reported by the poll client
+        self._request_latencies: dict[str, float] = {}
+        # Sensor keys read by the last poll cycle
+        self._polled_keys: set[str] = set()
+        # With a poll profile the status sensor is read every cycle, all
+        # other values only every idle_interval while it shows an idle state
+        self._poll_profile: dict | None = config.get(POLL_PROFILES, {}).get(device_name)
+        self._last_full_poll: float | None = None
+        self._last_status = None
+        update_interval = DATA_SCAN_INTERVAL
+        if self._poll_profile:
+            update_interval = timedelta(
+                seconds=self._poll_profile[POLL_PROFILE_ACTIVE_INTERVAL]
+            )
 
         super().__init__(
             hass,
             _LOGGER,
             name=f"{DOMAIN}_{device_name}",
-            update_interval=DATA_SCAN_INTERVAL,
+            update_interval=update_interval,
         )
 
     def _should_force_number_handling(self, unit):
         return unit == CUSTOM_UNIT_MINUTES_SINCE_MIDNIGHT
 
-    async def _async_update_data(self) -> dict:
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context=None
+    ) -> CALLBACK_TYPE:
+        """Listen for data updates, polling a newly added entity right away."""
+        remove_listener = super().async_add_listener(update_callback, context)
+        if (
+            context is not None
+            and self.data is not None
+            and context not in self._polled_keys
+        ):
+            self.hass.async_create_task(self.async_request_refresh())
+        return remove_listener
+
+    def _get_active_keys(self, chosen_keys: list[str]) -> list[str]:
+        """Return the chosen sensor keys which belong to an enabled entity.
+
+        Entities listen with their unique id as context. Before the platforms
+        have added any entity, the entity registry tells which of them will be
+        enabled.
+        """
+        contexts = set(self.async_contexts())
+        if not contexts:
+            registry = er.async_get(self.hass)
+            contexts = {
+                entity.unique_id
+                for entity in er.async_entries_for_config_entry(registry, self.entry_id)
+                if not entity.disabled
+            }
+        return [key for key in chosen_keys if key in contexts]
+
+    def _request_error_refresh(self) -> None:
+        entry_data = self.hass.data.get(DOMAIN, {}).get(self.entry_id, {})
+        error_coordinator = entry_data.get(ERROR_UPDATE_COORDINATOR)
+        if error_coordinator is not None:
+            _LOGGER.debug("Status of %s changed, updating errors", self.device_name)
+            self.hass.async_create_task(error_coordinator.async_request_refresh())
+
+    def _is_idle(self, status) -> bool:
+        """Return whether the other values can wait for the idle interval."""
+        if isinstance(status, Exception) or self._last_full_poll is None:
+            return False
+        if str(status) not in self._poll_profile[POLL_PROFILE_IDLE_STATES]:
+            return False
+        elapsed = self.hass.loop.time() - self._last_full_poll
+        return elapsed < self._poll_profile[POLL_PROFILE_IDLE_INTERVAL]
+
+    async def _async_read_status(
+        self, eta_client: EtaAPI, status_key: str, endpoint: ETAEndpoint
+    ) -> tuple[dict, bool]:
+        """Read the status sensor of the poll profile.
+
+        Return the result keyed like the endpoints, and whether the other
+        values can wait for the idle interval. A changed status refreshes the
+        errors of the terminal.
+        """
+        results = await self._async_fetch_values(eta_client, {status_key: endpoint})
+        status = results[status_key]
+        if not isinstance(status, Exception):
+            if self._last_status is not None and status != self._last_status:
+                # faults usually change the state of the boiler
+                self._request_error_refresh()
+            self._last_status = status
+        return results, self._is_idle(status)
+
+    def _observe_request(self, suffix: str, latency: float) -> None:
+        if suffix.startswith("/user/var/"):
+            self._request_latencies[suffix.removeprefix("/user/var/")] = latency
+
+    async def _async_fetch_values(
+        self, eta_client: EtaAPI, endpoints: dict[str, ETAEndpoint]
+    ) -> dict:
+        """Read the values of the given endpoints, keyed like the endpoints.
+
+        Failed reads are returned as exceptions and recorded in the quarantine,
+        unless the whole terminal is failing.
+        """
+
+        async def fetch_value(sensor_endpoint):
+            value, _ = await eta_client.get_data(
+                sensor_endpoint["url"],
+                self._should_force_number_handling(sensor_endpoint["unit"]),
+            )
+            return value
+
+        # All reads are queued at once; the terminal's scheduler decides how
+        # many of them run in parallel
+        results = await asyncio.gather(
+            *(fetch_value(endpoint) for endpoint in endpoints.values()),
+            return_exceptions=True,
+        )
+
+        if self.quarantine is not None:
+            # Once the circuit breaker opened, the failures are caused by an
+            # outage of the terminal, e.g. of the half-open probe, which is
+            # always the first endpoint in poll order
+            terminal_failing = (
+                get_circuit_breaker(self.host, self.port).state != CircuitState.CLOSED
+            )
+            for endpoint, result in zip(endpoints.values(), results, strict=True):
+                failed = isinstance(result, Exception)
+                if isinstance(result, EtaTerminalUnavailableError) or (
+                    failed and terminal_failing
+                ):
+                    # not the fault of the endpoint
+                    continue
+                uri = str(endpoint["url"])
+                self.quarantine.record(
+                    uri, self._request_latencies.pop(uri, None), not failed
+                )
+            self.quarantine.schedule_save()
+        return dict(zip(endpoints, results, strict=True))
+
+    async def _async_poll_quarantined(
+        self, eta_client: EtaAPI, endpoints: dict[str, ETAEndpoint]
+    ) -> None:
+        """Poll quarantined endpoints outside of the main cycle."""
+        results = await self._async_fetch_values(eta_client, endpoints)
+        if self.data is None:
+            return
+        values = dict(self.data.get("values", {}))
+        for sensor_key, result in results.items():
+            if isinstance(result, Exception):
+                _LOGGER.debug(
+                    "Quarantined sensor %s is still failing: %s", sensor_key, result
+                )
+                continue
+            values[sensor_key] = result
+        self.data = {**self.data, "values": values}
+        self.async_update_listeners()
+
+    def _schedule_quarantine_poll(
+        self, eta_client: EtaAPI, endpoints: dict[str, ETAEndpoint]
+    ) -> None:
+        if self._quarantine_task is not None and not self._quarantine_task.done():
+            return
+        due_uris = set(
+            self.quarantine.claim_due(str(ep["url"]) for ep in endpoints.values())
+        )
+        due = {
+            key: endpoint
+            for key, endpoint in endpoints.items()
+            if str(endpoint["url"]) in due_uris
+        }
+        if due:
+            self._quarantine_task = self.hass.async_create_background_task(
+                self._async_poll_quarantined(eta_client, due),
+                f"{DOMAIN}_{self.device_name}_quarantine_poll",
+            )
+
+    def _split_quarantined(
+        self,
+        eta_client: EtaAPI,
+        poll_endpoints: dict[str, ETAEndpoint],
+        previous_values: dict,
+    ) -> dict:
+        """Remove quarantined endpoints from the cycle and poll them in the background.
+
+        Return the last values of the removed endpoints.
+        """
+        kept_values = {}
+        if self.quarantine is None:
+            return kept_values
+        quarantined = {
+            key: endpoint
+            for key, endpoint in poll_endpoints.items()
+            if self.quarantine.is_quarantined(str(endpoint["url"]))
+        }
+        for key in quarantined:
+            del poll_endpoints[key]
+            # keep the last value until the background poll replaces it
+            if key in previous_values:
+                kept_values[key] = previous_values[key]
+        if quarantined:
+            self._schedule_quarantine_poll(eta_client, quarantined)
+        return kept_values
+
+    async def async_shutdown(self) -> None:
+        await super().async_shutdown()
+        if self._quarantine_task is not None:
+            self._quarantine_task.cancel()
+
+    async def _async_discover_entities(self, config_entry) -> dict:
+        """Scan the menu of the device and store the entities in the config entry."""
+        eta_client = EtaAPI(
+            self.session,
+            self.host,
+            self.port,
+            metadata_cache=await async_get_metadata_cache(self.hass),
+            priority=RequestPriority.DISCOVERY,
+            request_stats=self.request_stats,
+        )
+        entity_structure = await eta_client.get_entity_structure(
+            self.device_name,
+            config_entry.options.get(DISCOVERY_INCLUDE_PATHS),
+            config_entry.options.get(DISCOVERY_EXCLUDE_PATHS),
+        )
+
+        leaf_nodes = []
+
+        def collect_leaf_nodes(node, path=""):
+            name = node.get("name")
+            uri = node.get("uri")
+            current_path = f"{path}_{name}" if path else f"_{name}"
+
+            if uri and not node.get("children"):
+                leaf_nodes.append({"uri": uri, "path": current_path})
+
+            for child in node.get("children", []):
+                collect_leaf_nodes(child, current_path)
+
+        if entity_structure:
+            collect_leaf_nodes(entity_structure)
+
+        # The terminal's scheduler adapts the number of parallel
+        # requests to the measured latency
+        async def fetch_metadata(leaf_node):
+            uri = leaf_node["uri"]
+            # Values are read by the poll cycle, so
+            # discovery only needs the varinfo request
+            metadata = await eta_client.async_get_entity_metadata(
+                uri, include_value=False
+            )
+            return leaf_node, metadata
+
+        metadata_tasks = [fetch_metadata(node) for node in leaf_nodes]
+
+        float_dict = {}
+        switches_dict = {}
+        text_dict = {}
+        writable_dict = {}
+
+        if metadata_tasks:
+            results = await asyncio.gather(*metadata_tasks, return_exceptions=True)
+
+            for result in results:
+                if isinstance(result, Exception):
+                    _LOGGER.warning("A metadata fetch task failed: %s", result)
+                    continue
+
+                leaf_node, metadata = result
+                if not metadata:
+                    _LOGGER.warning(
+                        "Failed to get metadata for node %s", leaf_node["uri"]
+                    )
+                    continue
+
+                current_path = leaf_node["path"]
+                entity_type = eta_client.classify_entity(metadata)
+                unique_key = f"eta_{self.host.replace('.', '_')}_{current_path.lower().replace(' ', '_')}"
+                metadata["friendly_name"] = " > ".join(current_path.split("_")[2:])
+
+                if entity_type == "sensor":
+                    if metadata.get("unit") == "":
+                        text_dict[unique_key] = metadata
+                    else:
+                        float_dict[unique_key] = metadata
+                elif entity_type == "switch":
+                    switches_dict[unique_key] = metadata
+                elif entity_type == "number":
+                    writable_dict[unique_key] = metadata
+                elif entity_type == "time":
+                    writable_dict[unique_key] = metadata
+
+        discovered_data = {
+            FLOAT_DICT: float_dict,
+            SWITCHES_DICT: switches_dict,
+            TEXT_DICT: text_dict,
+            WRITABLE_DICT: writable_dict,
+            "values": {},
+        }
+
+        # Persist the discovered data for next restart
+        _LOGGER.info(
+            "Discovered %d entities. Caching for future restarts.",
+            len(leaf_nodes),
+        )
+        new_entry_data = {**config_entry.data}
+        if "scanned_devices_data" not in new_entry_data:
+            new_entry_data["scanned_devices_data"] = {}
+        new_entry_data["scanned_devices_data"][self.device_name] = discovered_data
+        self.hass.config_entries.async_update_entry(config_entry, data=new_entry_data)
+        return discovered_data
+
+    async def _async_run_cycle(self) -> dict:
         """Update data via library, using cached entities if available."""
 
         data = self.data if self.data is not None else {}
@@ -81,105 +554,18 @@ class EtaDataUpdateCoordinator(DataUpdateCoordinator):
                     "No cached entities found. Discovering entities for device %s. This may take a moment.",
                     self.device_name,
                 )
-                eta_client = EtaAPI(self.session, self.host, self.port)
-                entity_structure = await eta_client.get_entity_structure(
-                    self.device_name
-                )
-
-                leaf_nodes = []
-
-                def collect_leaf_nodes(node, path=""):
-                    name = node.get("name")
-                    uri = node.get("uri")
-                    current_path = f"{path}_{name}" if path else f"_{name}"
-
-                    if uri and not node.get("children"):
-                        leaf_nodes.append({"uri": uri, "path": current_path})
-
-                    for child in node.get("children", []):
-                        collect_leaf_nodes(child, current_path)
-
-                if entity_structure:
-                    collect_leaf_nodes(entity_structure)
-
-                semaphore = asyncio.Semaphore(5)  # Limit concurrency to 5
-
-                async def fetch_metadata(leaf_node):
-                    async with semaphore:
-                        uri = leaf_node["uri"]
-                        metadata = await eta_client.async_get_entity_metadata(uri)
-                        return leaf_node, metadata
-
-                metadata_tasks = [fetch_metadata(node) for node in leaf_nodes]
-
-                float_dict = {}
-                switches_dict = {}
-                text_dict = {}
-                writable_dict = {}
-
-                if metadata_tasks:
-                    results = await asyncio.gather(
-                        *metadata_tasks, return_exceptions=True
-                    )
-
-                    for result in results:
-                        if isinstance(result, Exception):
-                            _LOGGER.warning("A metadata fetch task failed: %s", result)
-                            continue
-
-                        leaf_node, metadata = result
-                        if not metadata:
-                            _LOGGER.warning(
-                                "Failed to get metadata for node %s", leaf_node["uri"]
-                            )
-                            continue
-
-                        current_path = leaf_node["path"]
-                        entity_type = eta_client.classify_entity(metadata)
-                        unique_key = f"eta_{self.host.replace('.', '_')}_{current_path.lower().replace(' ', '_')}"
-                        metadata["friendly_name"] = " > ".join(
-                            current_path.split("_")[2:]
-                        )
-
-                        if entity_type == "sensor":
-                            if metadata.get("unit") == "":
-                                text_dict[unique_key] = metadata
-                            else:
-                                float_dict[unique_key] = metadata
-                        elif entity_type == "switch":
-                            switches_dict[unique_key] = metadata
-                        elif entity_type == "number":
-                            writable_dict[unique_key] = metadata
-                        elif entity_type == "time":
-                            writable_dict[unique_key] = metadata
-
-                discovered_data = {
-                    FLOAT_DICT: float_dict,
-                    SWITCHES_DICT: switches_dict,
-                    TEXT_DICT: text_dict,
-                    WRITABLE_DICT: writable_dict,
-                    "values": {},
-                }
-
-                # Persist the discovered data for next restart
-                _LOGGER.info(
-                    "Discovered %d entities. Caching for future restarts.",
-                    len(leaf_nodes),
-                )
-                new_entry_data = {**config_entry.data}
-                if "scanned_devices_data" not in new_entry_data:
-                    new_entry_data["scanned_devices_data"] = {}
-                new_entry_data["scanned_devices_data"][
-                    self.device_name
-                ] = discovered_data
-                self.hass.config_entries.async_update_entry(
-                    config_entry, data=new_entry_data
-                )
-
-                data = discovered_data
+                data = await self._async_discover_entities(config_entry)
 
         # Update the values for all chosen sensors
-        eta_client = EtaAPI(self.session, self.host, self.port)
+        eta_client = EtaAPI(
+            self.session,
+            self.host,
+            self.port,
+            priority=RequestPriority.POLL,
+            request_timeout=POLL_REQUEST_TIMEOUT,
+            request_observer=self._observe_request,
+            request_stats=self.request_stats,
+        )
         config_entry = self.hass.config_entries.async_get_entry(self.entry_id)
         options = config_entry.options
 
@@ -200,38 +586,78 @@ class EtaDataUpdateCoordinator(DataUpdateCoordinator):
             ),
         ]
 
-        updated_values = {}
-        for sensor_key in chosen_sensors_keys:
-            if sensor_key in all_sensors:
-                sensor_endpoint = all_sensors[sensor_key]
-                try:
-                    async with timeout(10):
-                        value, _ = await eta_client.get_data(
-                            sensor_endpoint["url"],
-                            self._should_force_number_handling(sensor_endpoint["unit"]),
-                        )
-                        updated_values[sensor_key] = value
-                except Exception as e:
-                    _LOGGER.error(
-                        "Error updating sensor %s for device %s: %s",
-                        sensor_key,
-                        self.device_name,
-                        e,
-                    )
+        active_keys = self._get_active_keys(chosen_sensors_keys)
+        self._polled_keys = set(active_keys)
+        poll_endpoints = {
+            key: all_sensors[key] for key in active_keys if key in all_sensors
+        }
+        previous_values = data.get("values", {})
+        updated_values = self._split_quarantined(
+            eta_client, poll_endpoints, previous_values
+        )
+
+        status_results = {}
+        status_key = (
+            self._poll_profile[POLL_PROFILE_STATUS_SENSOR]
+            if self._poll_profile
+            else None
+        )
+        if status_key in all_sensors:
+            # always read the status first, even if its entity is disabled
+            poll_endpoints.pop(status_key, None)
+            status_results, idle = await self._async_read_status(
+                eta_client, status_key, all_sensors[status_key]
+            )
+            if idle:
+                updated_values[status_key] = status_results[status_key]
+                for key in poll_endpoints:
+                    if key in previous_values:
+                        updated_values[key] = previous_values[key]
+                return {**data, "values": updated_values}
+
+        results = await self._async_fetch_values(eta_client, poll_endpoints)
+        results.update(status_results)
+        self._last_full_poll = self.hass.loop.time()
+
+        for sensor_key, result in results.items():
+            if isinstance(result, EtaTerminalUnavailableError):
+                # Fail the whole cycle once instead of logging every sensor
+                raise UpdateFailed(str(result)) from result
+            if isinstance(result, Exception):
+                _LOGGER.error(
+                    "Error updating sensor %s for device %s: %s",
+                    sensor_key,
+                    self.device_name,
+                    result,
+                )
+                continue
+            updated_values[sensor_key] = result
 
         # Return a new data object with updated values
         return {**data, "values": updated_values}
 
 
-class ETAErrorUpdateCoordinator(DataUpdateCoordinator[list[ETAError]]):
+class ETAErrorUpdateCoordinator(EtaStaggeredCoordinator[list[ETAError]]):
     """Class to manage fetching error data from the ETA terminal."""
 
-    def __init__(self, hass: HomeAssistant, config: dict) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config: dict,
+        history: EtaErrorHistory | None = None,
+    ) -> None:
         """Initialize."""
 
         self.host = config.get(CONF_HOST)
         self.port = config.get(CONF_PORT)
         self.session = async_get_clientsession(hass)
+        self.history = history
+        self.per_error_events = config.get(ERROR_EVENTS_PER_ERROR, True)
+        self.aggregated_events = config.get(ERROR_EVENTS_AGGREGATED, False)
+        # Active error with the most recent time, kept up to date on every change
+        self.latest_error: ETAError | None = None
+        # Hash of the last parsed /user/errors body
+        self._errors_digest: str | None = None
 
         super().__init__(
             hass,
@@ -241,28 +667,96 @@ class ETAErrorUpdateCoordinator(DataUpdateCoordinator[list[ETAError]]):
         )
 
     def _handle_error_events(self, new_errors):
-        old_errors = self.data
-        if old_errors is None:
-            old_errors = []
-
-        for error in old_errors:
-            if error not in new_errors:
-                self.hass.bus.async_fire(
-                    "eta_webservices_error_cleared", event_data=error
-                )
+        old_errors = {error_key(error): error for error in self.data or []}
+        new_keys = {error_key(error) for error in new_errors}
+        detected = []
+        cleared = []
+
+        for key, error in old_errors.items():
+            if key not in new_keys:
+                cleared.append(error)
+                if self.per_error_events:
+                    self.hass.bus.async_fire(
+                        "eta_webservices_error_cleared", event_data=error
+                    )
 
         for error in new_errors:
-            if error not in old_errors:
-                self.hass.bus.async_fire(
-                    "eta_webservices_error_detected", event_data=error
-                )
+            if error_key(error) not in old_errors:
+                detected.append(error)
+                if self.per_error_events:
+                    self.hass.bus.async_fire(
+                        "eta_webservices_error_detected", event_data=error
+                    )
 
-    async def _async_update_data(self) -> list[ETAError]:
+        if self.aggregated_events and (detected or cleared):
+            # one event per change set, so automations only run once
+            self.hass.bus.async_fire(
+                "eta_webservices_errors_changed",
+                event_data={
+                    "added": detected,
+                    "cleared": cleared,
+                    "active": len(new_errors),
+                    "host": self.host,
+                    "port": self.port,
+                },
+            )
+
+        return detected, cleared
+
+    def _update_latest_error(self, errors, detected, cleared) -> None:
+        latest = self.latest_error
+        if latest is not None and error_key(latest) in {
+            error_key(error) for error in cleared
+        }:
+            # only look at all active errors if the latest one is gone
+            latest = None
+            candidates = errors
+        else:
+            candidates = detected
+
+        for error in candidates:
+            if latest is None or error["time"] >= latest["time"]:
+                latest = error
+        self.latest_error = latest
+
+    async def async_resend_error_events(self) -> None:
+        """Fire the events of every active error again, as if it was new."""
+        # Forget the old errors and the body hash, so the next update
+        # parses the errors and treats all of them as new
+        self.data = []
+        self._errors_digest = None
+        await self.async_refresh()
+
+    async def _async_run_cycle(self) -> list[ETAError]:
         """Update data via library."""
-        errors = []
-        eta_client = EtaAPI(self.session, self.host, self.port)
+        eta_client = EtaAPI(
+            self.session,
+            self.host,
+            self.port,
+            priority=RequestPriority.POLL,
+            request_stats=self.request_stats,
+        )
 
-        async with timeout(10):
-            errors = await eta_client.get_errors()
-            self._handle_error_events(errors)
-            return errors
+        try:
+            async with timeout(10):
+                text = await eta_client.get_errors_text()
+                digest = hashlib.sha256(text.encode()).hexdigest()
+                if digest == self._errors_digest and self.data is not None:
+                    # nothing changed since the last update
+                    return self.data
+                errors = await eta_client.parse_errors(text)
+        except EtaTerminalUnavailableError as err:
+            raise UpdateFailed(str(err)) from err
+        first_update = self.data is None
+        detected, cleared = self._handle_error_events(errors)
+        if self.history is not None:
+            for error in cleared:
+                self.history.clear(error)
+            for error in detected:
+                self.history.add(error)
+            if first_update:
+                # errors restored from storage which cleared during a restart
+                self.history.clear_missing(errors)
+        self._update_latest_error(errors, detected, cleared)
+        self._errors_digest = digest
+        return errors
@@ -10,22 +10,52 @@ from homeassistant.const import CONF_HOST, CONF_PORT
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN
+from .const import DOMAIN, ENDPOINT_QUARANTINE
 from .api import EtaAPI
+from .coordinator import EtaStaggeredCoordinator
+from .circuit_breaker import EtaTerminalUnavailableError, get_circuit_breaker
+from .scheduler import get_scheduler
 
 
 async def async_get_config_entry_diagnostics(
     hass: HomeAssistant, entry: ConfigEntry
 ) -> dict[str, Any]:
     """Return diagnostics for a config entry."""
-    config = hass.data[DOMAIN][entry.entry_id]
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    config = {
+        key: value
+        for key, value in entry_data["config_entry_data"].items()
+        if key != "unsub_options_update_listener"
+    }
+    quarantine = entry_data[ENDPOINT_QUARANTINE]
 
     host = config.get(CONF_HOST)
     port = config.get(CONF_PORT)
     session = async_get_clientsession(hass)
 
     eta_client = EtaAPI(session, host, port)
-    user_menu = await eta_client.get_menu()
-    api_version = await eta_client.get_api_version()
-
-    return {"config": config, "api_version": str(api_version), "menu": user_menu}
+    try:
+        user_menu = await eta_client.get_menu()
+        api_version = await eta_client.get_api_version()
+    except EtaTerminalUnavailableError:
+        # still provide the breaker state, which explains the missing data
+        user_menu = None
+        api_version = None
+
+    return {
+        "config": config,
+        "api_version": str(api_version),
+        "menu": user_menu,
+        "scheduler": get_scheduler(host, port).as_dict(),
+        "circuit_breaker": get_circuit_breaker(host, port).as_dict(),
+        "coordinators": {
+            coordinator.name: {
+                **coordinator.phase_as_dict(),
+                "performance": coordinator.performance_as_dict(),
+            }
+            for coordinator in entry_data.values()
+            if isinstance(coordinator, EtaStaggeredCoordinator)
+        },
+        "quarantined_endpoints": quarantine.quarantined_uris,
+        "endpoint_stats": quarantine.as_dict(),
+    }
@@ -7,7 +7,10 @@ from homeassistant.const import CONF_HOST, CONF_PORT
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.entity import Entity, generate_entity_id
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.update_coordinator import (
+    CoordinatorEntity,
+    DataUpdateCoordinator,
+)
 
 from .api import ETAEndpoint, EtaAPI
 from .coordinator import ETAErrorUpdateCoordinator, EtaDataUpdateCoordinator
@@ -16,6 +19,7 @@ from .utils import create_device_info
 _LOGGER = logging.getLogger(__name__)
 
 _EntityT = TypeVar("_EntityT")
+_CoordinatorT = TypeVar("_CoordinatorT", bound=DataUpdateCoordinator)
 
 
 class EtaEntity(Entity):
@@ -53,7 +57,9 @@ class EtaCoordinatorEntity(CoordinatorEntity, EtaEntity):
         EtaEntity.__init__(
             self, config, hass, unique_id, endpoint_info, entity_id_format
         )
-        CoordinatorEntity.__init__(self, coordinator)
+        # The coordinator only polls the endpoints of entities listening with
+        # their unique id as context, so disabled entities cost no requests
+        CoordinatorEntity.__init__(self, coordinator, context=unique_id)
         self._attr_device_info = device_info
 
     @property
@@ -69,14 +75,17 @@ class EtaCoordinatorEntity(CoordinatorEntity, EtaEntity):
             self.async_write_ha_state()
 
 
-class EtaErrorEntity(CoordinatorEntity[ETAErrorUpdateCoordinator]):
+class EtaTerminalEntity(CoordinatorEntity[_CoordinatorT]):
+    """Base class for entities of a terminal or a device instead of an endpoint."""
+
     def __init__(
         self,
-        coordinator: ETAErrorUpdateCoordinator,
+        coordinator: _CoordinatorT,
         config: dict,
         hass: HomeAssistant,
         entity_id_format: str,
         unique_id_suffix: str,
+        device_name: str | None = None,
     ) -> None:
         super().__init__(coordinator)
 
@@ -91,8 +100,13 @@ class EtaErrorEntity(CoordinatorEntity[ETAErrorUpdateCoordinator]):
             entity_id_format, self._attr_unique_id, hass=hass
         )
 
-        self._attr_device_info = create_device_info(host, port)
+        if device_name:
+            self._attr_device_info = create_device_info(host, port, device_name)
+        else:
+            self._attr_device_info = create_device_info(host, port)
+
 
+class EtaErrorEntity(EtaTerminalEntity[ETAErrorUpdateCoordinator]):
     @abstractmethod
     def handle_data_updates(self, data) -> None:
         raise NotImplementedError
@@ -0,0 +1,208 @@
+"""Bounded history of the errors reported by an ETA terminal."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from datetime import datetime
+import itertools
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .api import ETAError
+from .const import DOMAIN, ERROR_HISTORY
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.{ERROR_HISTORY}"
+SAVE_DELAY = 60
+# Number of error occurrences kept per config entry
+MAX_ENTRIES = 1000
+
+
+def error_key(error: ETAError) -> tuple:
+    """Return a hashable key which identifies an error of the terminal."""
+    return (
+        error["fub"],
+        error["msg"],
+        error["priority"],
+        str(error["time"]),
+        error["text"],
+    )
+
+
+def _timestamp(value) -> float:
+    # the terminal omits the time of some errors, see EtaAPI._parse_errors
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.now().timestamp()
+
+
+class EtaErrorHistory:
+    """Ring buffer of error occurrences with sorted indexes.
+
+    Every occurrence is indexed by its time, overall as well as per fub and
+    per priority. The indexes are lists of (timestamp, sequence number) kept
+    sorted with bisect, so a query for a time range only looks at the
+    occurrences within that range.
+    """
+
+    def __init__(self, store: Store | None = None, max_entries=MAX_ENTRIES) -> None:
+        self.store = store
+        self._max_entries = max_entries
+        self._sequence = itertools.count()
+        self._entries: dict[int, dict] = {}
+        # sequence numbers in insertion order, the oldest one is evicted first
+        self._order: deque[int] = deque()
+        self._by_time: list[tuple[float, int]] = []
+        self._by_fub: dict[str, list[tuple[float, int]]] = {}
+        self._by_priority: dict[str, list[tuple[float, int]]] = {}
+        # sequence number of the occurrence of every active error
+        self._active: dict[tuple, int] = {}
+
+    def add(self, error: ETAError) -> None:
+        """Record a newly detected error."""
+        key = error_key(error)
+        if key in self._active:
+            # still active since before a restart
+            return
+        entry = {
+            "key": list(key),
+            "fub": error["fub"],
+            "msg": error["msg"],
+            "priority": error["priority"],
+            "text": error["text"],
+            "time": _timestamp(error["time"]),
+            "detected": datetime.now().timestamp(),
+            "cleared": None,
+        }
+        self._active[key] = self._insert(entry)
+        while len(self._order) > self._max_entries:
+            self._evict(self._order[0])
+        self._schedule_save()
+
+    def clear(self, error: ETAError) -> None:
+        """Record that an error is no longer reported."""
+        sequence = self._active.pop(error_key(error), None)
+        if sequence in self._entries:
+            self._entries[sequence]["cleared"] = datetime.now().timestamp()
+            self._schedule_save()
+
+    def clear_missing(self, errors: list[ETAError]) -> None:
+        """Record that the active errors which are not reported any more are cleared.
+
+        Active errors restored from storage may have been cleared while Home
+        Assistant was not running, so no update reported them as cleared.
+        """
+        reported = {error_key(error) for error in errors}
+        missing = [key for key in self._active if key not in reported]
+        if not missing:
+            return
+        cleared_at = datetime.now().timestamp()
+        for key in missing:
+            sequence = self._active.pop(key)
+            if sequence in self._entries:
+                self._entries[sequence]["cleared"] = cleared_at
+        self._schedule_save()
+
+    def query(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        fub: str | None = None,
+        priority: str | None = None,
+    ) -> list[dict]:
+        """Return the occurrences within a time range, oldest first."""
+        if fub is not None:
+            index = self._by_fub.get(fub, [])
+        elif priority is not None:
+            index = self._by_priority.get(priority, [])
+        else:
+            index = self._by_time
+        low = bisect_left(index, (start.timestamp(),)) if start else 0
+        high = (
+            bisect_right(index, (end.timestamp(), float("inf"))) if end else len(index)
+        )
+
+        result = []
+        for _, sequence in index[low:high]:
+            entry = self._entries[sequence]
+            if priority is not None and entry["priority"] != priority:
+                continue
+            result.append(
+                {
+                    "fub": entry["fub"],
+                    "msg": entry["msg"],
+                    "priority": entry["priority"],
+                    "text": entry["text"],
+                    "time": datetime.fromtimestamp(entry["time"]).isoformat(),
+                    "detected": datetime.fromtimestamp(entry["detected"]).isoformat(),
+                    "cleared": (
+                        datetime.fromtimestamp(entry["cleared"]).isoformat()
+                        if entry["cleared"] is not None
+                        else None
+                    ),
+                }
+            )
+        return result
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def as_dict(self) -> dict:
+        return {"entries": [self._entries[sequence] for sequence in self._order]}
+
+    def load_dict(self, data: dict | None) -> None:
+        for entry in (data or {}).get("entries", []):
+            sequence = self._insert(dict(entry))
+            if entry["cleared"] is None:
+                self._active[tuple(entry["key"])] = sequence
+
+    def _insert(self, entry: dict) -> int:
+        sequence = next(self._sequence)
+        self._entries[sequence] = entry
+        self._order.append(sequence)
+        item = (entry["time"], sequence)
+        insort(self._by_time, item)
+        insort(self._by_fub.setdefault(entry["fub"], []), item)
+        insort(self._by_priority.setdefault(entry["priority"], []), item)
+        return sequence
+
+    def _evict(self, sequence: int) -> None:
+        self._order.popleft()
+        entry = self._entries.pop(sequence)
+        item = (entry["time"], sequence)
+        for index in (
+            self._by_time,
+            self._by_fub[entry["fub"]],
+            self._by_priority[entry["priority"]],
+        ):
+            del index[bisect_left(index, item)]
+        key = tuple(entry["key"])
+        if self._active.get(key) == sequence:
+            del self._active[key]
+
+    def _schedule_save(self) -> None:
+        if self.store is not None:
+            self.store.async_delay_save(self.as_dict, SAVE_DELAY)
+
+
+async def async_load_error_history(
+    hass: HomeAssistant, entry_id: str
+) -> EtaErrorHistory:
+    """Create the error history of a config entry with the entries from storage."""
+    history = EtaErrorHistory(_get_store(hass, entry_id))
+    history.load_dict(await history.store.async_load())
+    return history
+
+
+async def async_remove_error_history(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the stored history of a removed config entry."""
+    await _get_store(hass, entry_id).async_remove()
+
+
+def _get_store(hass: HomeAssistant, entry_id: str) -> Store:
+    return Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry_id}")
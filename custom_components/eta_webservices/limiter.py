@@ -0,0 +1,96 @@
+"""Adaptive concurrency limit based on the measured latency of a terminal."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 5
+MIN_LIMIT = 1
+MAX_LIMIT = 20
+# Latency above this multiple of the baseline counts as congestion
+LATENCY_TOLERANCE = 2.0
+# Weight of a new sample in the smoothed latency
+SMOOTHING = 0.2
+# Rate at which the baseline follows latencies above it, so that a terminal
+# which got permanently slower does not count as congested forever
+BASELINE_DRIFT = 0.01
+
+
+class AdaptiveConcurrencyLimiter:
+    """Additive-increase/multiplicative-decrease (AIMD) concurrency limit.
+
+    The limit grows by one per window of successful requests while the
+    smoothed latency stays close to the lowest latency seen so far, and is
+    halved when requests fail or the latency rises. After a decrease the
+    next decrease is only allowed once a full window of requests completed,
+    so a burst of slow requests counts as a single congestion signal.
+
+    The latencies are tracked per request class, e.g. "menu", "varinfo" and
+    "var", so a large menu request is not compared with small value reads.
+    """
+
+    def __init__(
+        self,
+        limit: float = DEFAULT_LIMIT,
+        min_limit: int = MIN_LIMIT,
+        max_limit: int = MAX_LIMIT,
+    ) -> None:
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self.limit = float(limit)
+        # Smoothed and baseline latency per request class
+        self.smoothed_latency: dict[str, float] = {}
+        self.baseline_latency: dict[str, float] = {}
+        self._samples_until_decrease = 0
+        # Called when record changed the concurrency, e.g. to persist it
+        self.on_change: Callable[[], None] | None = None
+
+    def restore(self, limit: float) -> None:
+        """Continue with a limit learned earlier."""
+        self.limit = float(min(max(limit, self._min_limit), self._max_limit))
+
+    @property
+    def concurrency(self) -> int:
+        return max(self._min_limit, int(self.limit))
+
+    def record(self, latency: float, success: bool, request_class: str = "") -> int:
+        """Record a finished request and return the new concurrency limit."""
+        previous_concurrency = self.concurrency
+        self._samples_until_decrease -= 1
+
+        if success:
+            smoothed = self.smoothed_latency.get(request_class, latency)
+            smoothed += SMOOTHING * (latency - smoothed)
+            self.smoothed_latency[request_class] = smoothed
+            baseline = self.baseline_latency.get(request_class, latency)
+            if latency < baseline:
+                baseline = latency
+            else:
+                baseline += BASELINE_DRIFT * (latency - baseline)
+            self.baseline_latency[request_class] = baseline
+
+        congested = not success or (
+            self.smoothed_latency[request_class]
+            > self.baseline_latency[request_class] * LATENCY_TOLERANCE
+        )
+        if congested:
+            if self._samples_until_decrease <= 0:
+                self.limit = max(self._min_limit, self.limit / 2)
+                self._samples_until_decrease = self.concurrency
+                _LOGGER.debug("Reduced concurrency limit to %.1f", self.limit)
+        else:
+            self.limit = min(self._max_limit, self.limit + 1 / self.limit)
+
+        if self.on_change is not None and self.concurrency != previous_concurrency:
+            self.on_change()
+        return self.concurrency
+
+    def as_dict(self) -> dict:
+        return {
+            "limit": self.limit,
+            "smoothed_latency": self.smoothed_latency,
+            "baseline_latency": self.baseline_latency,
+        }
@@ -0,0 +1,122 @@
+"""Persistent cache of /user/varinfo metadata, shared by all config entries."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import copy
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, METADATA_CACHE
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.{METADATA_CACHE}"
+STORAGE_VERSION = 1
+# Delay in seconds before a changed cache is written to disk, so that a
+# discovery run results in a single write
+SAVE_DELAY = 30
+# Upper bound for the number of cached endpoints over all terminals
+MAX_ENTRIES = 20000
+
+
+class EtaMetadataCache:
+    """LRU cache of parsed varinfo metadata keyed by API version, terminal and URI.
+
+    The terminal is the fingerprint of its menu (EtaAPI.get_terminal_fingerprint).
+    The names and valid values depend on the language and the installation of
+    a terminal, so the metadata is shared between config entries, devices and
+    rediscoveries of terminals with the same menu only.
+    """
+
+    def __init__(self, store: Store | None = None, max_entries=MAX_ENTRIES) -> None:
+        self._store = store
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str, str], dict] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, api_version: str, terminal: str, uri: str) -> dict | None:
+        """Return a copy of the cached metadata, or None on a miss."""
+        key = (api_version, terminal, uri)
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        # Callers modify the returned endpoint, so never hand out the cached one
+        return copy.deepcopy(self._entries[key])
+
+    def __contains__(self, key: tuple[str, str, str]) -> bool:
+        """Check for an (api_version, terminal, uri) entry without touching the LRU order."""
+        return key in self._entries
+
+    def put(
+        self, api_version: str, terminal: str, uri: str, endpoint_info: dict
+    ) -> None:
+        """Store the metadata of an endpoint, evicting the oldest entries."""
+        key = (api_version, terminal, uri)
+        self._entries[key] = copy.deepcopy(endpoint_info)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        self._schedule_save()
+
+    def purge(self, api_version: str | None = None) -> int:
+        """Remove all entries, or only the ones of a single API version."""
+        if api_version is None:
+            removed = len(self._entries)
+            self._entries.clear()
+        else:
+            keys = [key for key in self._entries if key[0] == api_version]
+            for key in keys:
+                del self._entries[key]
+            removed = len(keys)
+        _LOGGER.info("Purged %d entries from the metadata cache", removed)
+        self._schedule_save()
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def as_dict(self) -> dict:
+        """Return the cache content in LRU order for storage."""
+        return {
+            "entries": [
+                [api_version, terminal, uri, endpoint_info]
+                for (api_version, terminal, uri), endpoint_info in self._entries.items()
+            ]
+        }
+
+    def load_dict(self, data: dict | None) -> None:
+        """Restore the cache content from storage."""
+        self._entries.clear()
+        if not data:
+            return
+        for entry in data.get("entries", []):
+            # entries stored before the terminal was part of the key may hold
+            # the names of another terminal, so they are dropped
+            if len(entry) != 4:
+                continue
+            api_version, terminal, uri, endpoint_info = entry
+            self._entries[(api_version, terminal, uri)] = endpoint_info
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _schedule_save(self) -> None:
+        if self._store is not None:
+            self._store.async_delay_save(self.as_dict, SAVE_DELAY)
+
+
+async def async_get_metadata_cache(hass: HomeAssistant) -> EtaMetadataCache:
+    """Return the shared metadata cache, loading it from storage on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if METADATA_CACHE not in domain_data:
+        store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        metadata_cache = EtaMetadataCache(store)
+        metadata_cache.load_dict(await store.async_load())
+        # another caller may have loaded the cache while we were waiting
+        domain_data.setdefault(METADATA_CACHE, metadata_cache)
+    return domain_data[METADATA_CACHE]
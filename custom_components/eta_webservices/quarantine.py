@@ -0,0 +1,182 @@
+"""Quarantine for endpoints which are consistently slow or failing."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+import logging
+import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, ENDPOINT_QUARANTINE
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.{ENDPOINT_QUARANTINE}"
+SAVE_DELAY = 60
+# Smoothed latency in seconds above which an endpoint counts as slow
+SLOW_LATENCY = 3.0
+# Number of samples before an endpoint can be quarantined for being slow
+MIN_SAMPLES = 3
+# Number of failed polls in a row after which an endpoint is quarantined
+FAILURE_THRESHOLD = 3
+# Number of fast, successful polls in a row after which it is released
+RECOVERY_SAMPLES = 3
+# Seconds between two polls of a quarantined endpoint
+QUARANTINE_INTERVAL = 10 * 60
+# Weight of a new sample in the smoothed latency
+SMOOTHING = 0.3
+
+
+class EndpointStats:
+    """Latency and failure statistics of a single endpoint."""
+
+    def __init__(self) -> None:
+        self.samples = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.avg_latency: float | None = None
+        self.quarantined = False
+        self.recovery_streak = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "samples": self.samples,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "avg_latency": self.avg_latency,
+            "quarantined": self.quarantined,
+            "recovery_streak": self.recovery_streak,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> EndpointStats:
+        stats = cls()
+        for key, value in data.items():
+            if hasattr(stats, key):
+                setattr(stats, key, value)
+        return stats
+
+
+class EtaEndpointQuarantine:
+    """Track per-URI poll statistics and move bad endpoints out of the main cycle.
+
+    An endpoint is quarantined after FAILURE_THRESHOLD failed polls in a row,
+    or when its smoothed latency exceeds SLOW_LATENCY. Quarantined endpoints
+    are polled every QUARANTINE_INTERVAL seconds in the background and are
+    released after RECOVERY_SAMPLES fast, successful polls in a row.
+    """
+
+    def __init__(
+        self,
+        store: Store | None = None,
+        quarantine_interval: float = QUARANTINE_INTERVAL,
+        clock=time.monotonic,
+    ) -> None:
+        self.store = store
+        self._quarantine_interval = quarantine_interval
+        self._clock = clock
+        self._stats: dict[str, EndpointStats] = {}
+        # Monotonic time of the next poll of each quarantined endpoint
+        self._next_poll: dict[str, float] = {}
+
+    def record(self, uri: str, latency: float | None, success: bool) -> None:
+        """Record the outcome of a poll of an endpoint.
+
+        The statistics are not saved, call schedule_save once the outcomes of
+        a poll cycle are recorded.
+        """
+        stats = self._stats.setdefault(uri, EndpointStats())
+        stats.samples += 1
+        if success:
+            stats.consecutive_failures = 0
+            if latency is not None:
+                if stats.avg_latency is None:
+                    stats.avg_latency = latency
+                else:
+                    stats.avg_latency += SMOOTHING * (latency - stats.avg_latency)
+        else:
+            stats.failures += 1
+            stats.consecutive_failures += 1
+
+        if stats.quarantined:
+            healthy = success and (latency is None or latency < SLOW_LATENCY)
+            stats.recovery_streak = stats.recovery_streak + 1 if healthy else 0
+            if stats.recovery_streak >= RECOVERY_SAMPLES:
+                _LOGGER.info("Endpoint %s recovered, releasing it from quarantine", uri)
+                stats.quarantined = False
+                stats.recovery_streak = 0
+                # forget the slow history, otherwise it is quarantined again
+                stats.avg_latency = latency
+                self._next_poll.pop(uri, None)
+        elif stats.consecutive_failures >= FAILURE_THRESHOLD or (
+            stats.samples >= MIN_SAMPLES
+            and stats.avg_latency is not None
+            and stats.avg_latency > SLOW_LATENCY
+        ):
+            _LOGGER.warning(
+                "Endpoint %s is too slow or failing (%d failures in a row, "
+                "%.1fs average latency), polling it every %.0fs from now on",
+                uri,
+                stats.consecutive_failures,
+                stats.avg_latency or 0.0,
+                self._quarantine_interval,
+            )
+            stats.quarantined = True
+            stats.recovery_streak = 0
+            self._next_poll[uri] = self._clock() + self._quarantine_interval
+
+    def is_quarantined(self, uri: str) -> bool:
+        stats = self._stats.get(uri)
+        return stats is not None and stats.quarantined
+
+    def claim_due(self, uris: Iterable[str]) -> list[str]:
+        """Return the quarantined URIs which are due and schedule their next poll."""
+        now = self._clock()
+        due = []
+        for uri in uris:
+            if not self.is_quarantined(uri):
+                continue
+            if self._next_poll.get(uri, now) <= now:
+                self._next_poll[uri] = now + self._quarantine_interval
+                due.append(uri)
+        return due
+
+    @property
+    def quarantined_uris(self) -> list[str]:
+        return [uri for uri, stats in self._stats.items() if stats.quarantined]
+
+    def as_dict(self) -> dict:
+        return {uri: stats.as_dict() for uri, stats in self._stats.items()}
+
+    def load_dict(self, data: dict | None) -> None:
+        self._stats = {
+            uri: EndpointStats.from_dict(stats) for uri, stats in (data or {}).items()
+        }
+        # quarantined endpoints restored from storage are polled once right away
+        self._next_poll.clear()
+
+    def schedule_save(self) -> None:
+        """Write the statistics to storage after SAVE_DELAY seconds."""
+        if self.store is not None:
+            self.store.async_delay_save(self.as_dict, SAVE_DELAY)
+
+
+async def async_load_endpoint_quarantine(
+    hass: HomeAssistant, entry_id: str
+) -> EtaEndpointQuarantine:
+    """Create the quarantine of a config entry with the statistics from storage."""
+    quarantine = EtaEndpointQuarantine(_get_store(hass, entry_id))
+    quarantine.load_dict(await quarantine.store.async_load())
+    return quarantine
+
+
+async def async_remove_endpoint_quarantine(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the stored statistics of a removed config entry."""
+    await _get_store(hass, entry_id).async_remove()
+
+
+def _get_store(hass: HomeAssistant, entry_id: str) -> Store:
+    return Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry_id}")
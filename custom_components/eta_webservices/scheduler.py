@@ -0,0 +1,217 @@
+"""Terminal-wide scheduling of the requests sent to an ETA terminal."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from enum import IntEnum
+import heapq
+import itertools
+import logging
+from typing import TypeVar
+
+from .limiter import AdaptiveConcurrencyLimiter
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# The web server of the ETA terminal is slow, so keep the defaults conservative
+DEFAULT_MAX_CONCURRENCY = 5
+# No fixed rate by default: the limiter paces the requests by their latency,
+# a fixed rate would cap large poll cycles below the terminal's capacity. A
+# rate can be set in the options of a config entry.
+DEFAULT_REQUESTS_PER_SECOND = None
+
+
+class RequestPriority(IntEnum):
+    """Priority classes of terminal requests, lower values are served first."""
+
+    WRITE = 0
+    INTERACTIVE = 1
+    POLL = 2
+    DISCOVERY = 3
+
+
+class _PriorityStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    def add(self, wait_time: float) -> None:
+        self.requests += 1
+        self.total_wait += wait_time
+        self.max_wait = max(self.max_wait, wait_time)
+        self.last_wait = wait_time
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "avg_wait": self.total_wait / self.requests if self.requests else 0.0,
+            "max_wait": self.max_wait,
+            "last_wait": self.last_wait,
+        }
+
+
+class EtaRequestScheduler:
+    """Limit the concurrency and request rate towards a single terminal.
+
+    Requests wait in a priority queue until a slot is free, so user writes
+    overtake queued polling and discovery requests. Requests of the same
+    priority are served in FIFO order. With a limiter, the concurrency limit
+    follows the latency measured for the finished requests. The starts of
+    requests are only spaced out if requests_per_second is given.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        requests_per_second: float | None = DEFAULT_REQUESTS_PER_SECOND,
+        limiter: AdaptiveConcurrencyLimiter | None = None,
+    ) -> None:
+        self.limiter = limiter
+        if limiter is not None:
+            max_concurrency = limiter.concurrency
+        self.max_concurrency = max_concurrency
+        self._interval = 1 / requests_per_second if requests_per_second else 0.0
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._queued = 0
+        self._sequence = itertools.count()
+        self._next_start = 0.0
+        self._stats = {priority: _PriorityStats() for priority in RequestPriority}
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of requests waiting for a slot."""
+        return self._queued
+
+    @property
+    def active_requests(self) -> int:
+        return self._active
+
+    async def run(
+        self,
+        priority: RequestPriority,
+        request: Callable[[], Awaitable[_T]],
+        before_start: Callable[[], None] | None = None,
+        is_success: Callable[[_T], bool] | None = None,
+        request_class: str = "",
+    ) -> _T:
+        """Run a request as soon as the limits and its priority allow it.
+
+        before_start is called once the request got its slot. If it raises,
+        the request is not sent and does not count for the limiter.
+        is_success tells the limiter whether a result counts as a success,
+        e.g. not for an overloaded terminal answering with an error status.
+        The limiter compares the latency with earlier requests of the same
+        request_class only.
+        """
+        loop = asyncio.get_running_loop()
+        queued_at = loop.time()
+        await self._acquire(priority)
+        started_at = None
+        success = False
+        try:
+            await self._throttle()
+            if before_start is not None:
+                before_start()
+            started_at = loop.time()
+            self._stats[priority].add(started_at - queued_at)
+            result = await request()
+            success = is_success is None or is_success(result)
+            return result
+        except asyncio.CancelledError:
+            # a cancelled request says nothing about the terminal
+            started_at = None
+            raise
+        finally:
+            if self.limiter is not None and started_at is not None:
+                self.limiter.record(loop.time() - started_at, success, request_class)
+                self.max_concurrency = self.limiter.concurrency
+            self._release()
+
+    def set_max_concurrency(self, max_concurrency: int) -> None:
+        """Change the concurrency limit, waking up waiters if it was raised."""
+        if self.limiter is not None:
+            self.limiter.restore(max_concurrency)
+            max_concurrency = self.limiter.concurrency
+        self.max_concurrency = max(1, max_concurrency)
+        self._grant_waiters()
+
+    def set_requests_per_second(self, requests_per_second: float | None) -> None:
+        """Change the rate limit, None or 0 sends requests as soon as a slot is free."""
+        self._interval = 1 / requests_per_second if requests_per_second else 0.0
+
+    def as_dict(self) -> dict:
+        """Return the current state and statistics for diagnostics."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "requests_per_second": 1 / self._interval if self._interval else None,
+            "active_requests": self._active,
+            "queue_depth": self.queue_depth,
+            "limiter": self.limiter.as_dict() if self.limiter else None,
+            "priorities": {
+                priority.name.lower(): stats.as_dict()
+                for priority, stats in self._stats.items()
+            },
+        }
+
+    async def _acquire(self, priority: RequestPriority) -> None:
+        if self._active < self.max_concurrency and not self._queued:
+            self._active += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+        self._queued += 1
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over right before the cancellation
+                self._release()
+            else:
+                # Cancelled while queued, the entry is skipped by _grant_waiters
+                self._queued -= 1
+            raise
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._grant_waiters()
+
+    def _grant_waiters(self) -> None:
+        while self._waiters and self._active < self.max_concurrency:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                self._queued -= 1
+                self._active += 1
+                waiter.set_result(None)
+
+    async def _throttle(self) -> None:
+        """Space out request starts according to the requests-per-second limit."""
+        if not self._interval:
+            return
+        now = asyncio.get_running_loop().time()
+        start = max(now, self._next_start)
+        self._next_start = start + self._interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+_SCHEDULERS: dict[tuple[str, int], EtaRequestScheduler] = {}
+
+
+def get_scheduler(host: str, port: int) -> EtaRequestScheduler:
+    """Return the scheduler shared by all clients of a terminal."""
+    key = (host, int(port))
+    if key not in _SCHEDULERS:
+        _SCHEDULERS[key] = EtaRequestScheduler(limiter=AdaptiveConcurrencyLimiter())
+    return _SCHEDULERS[key]
+
+
+def set_scheduler(host: str, port: int, scheduler: EtaRequestScheduler) -> None:
+    """Replace the scheduler of a terminal, e.g. with other limits for a load test."""
+    _SCHEDULERS[(host, int(port))] = scheduler
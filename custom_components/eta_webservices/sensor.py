@@ -18,8 +18,8 @@ from datetime import timedelta
 _LOGGER = logging.getLogger(__name__)
 from .api import ETAEndpoint, ETAError
 from .coordinator import ETAErrorUpdateCoordinator
-from .entity import EtaCoordinatorEntity, EtaErrorEntity
-from .coordinator import EtaDataUpdateCoordinator
+from .entity import EtaCoordinatorEntity, EtaErrorEntity, EtaTerminalEntity
+from .coordinator import EtaDataUpdateCoordinator, EtaStaggeredCoordinator
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -30,7 +30,7 @@ from homeassistant.components.sensor import (
 
 from homeassistant.core import HomeAssistant, callback
 from homeassistant import config_entries
-from homeassistant.const import EntityCategory
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
 from .const import (
     DOMAIN,
     CHOSEN_FLOAT_SENSORS,
@@ -100,6 +100,11 @@ async def async_setup_entry(
                         )
                     )
 
+            sensors.extend(
+                EtaPerformanceSensor(config, hass, coordinator, key, device_name)
+                for key in PERFORMANCE_SENSORS
+            )
+
     # Error sensors
     error_coordinator = hass.data[DOMAIN][entry_id][ERROR_UPDATE_COORDINATOR]
     sensors.extend(
@@ -108,9 +113,28 @@ async def async_setup_entry(
             EtaLatestErrorSensor(config, hass, error_coordinator),
         ]
     )
+    sensors.extend(
+        EtaPerformanceSensor(config, hass, error_coordinator, key)
+        for key in PERFORMANCE_SENSORS
+    )
     async_add_entities(sensors, update_before_add=True)
 
 
+# Performance of a coordinator: key -> device class, native and suggested unit
+PERFORMANCE_SENSORS = {
+    "cycle_duration": (SensorDeviceClass.DURATION, UnitOfTime.SECONDS, None),
+    "requests_per_cycle": (None, None, None),
+    "failed_requests": (None, None, None),
+    "p95_latency": (
+        SensorDeviceClass.DURATION,
+        UnitOfTime.SECONDS,
+        UnitOfTime.MILLISECONDS,
+    ),
+    "bytes_received": (SensorDeviceClass.DATA_SIZE, UnitOfInformation.BYTES, None),
+    "last_successful_refresh": (SensorDeviceClass.TIMESTAMP, None, None),
+}
+
+
 def _determine_device_class(unit):
     unit_dict_eta = {
         "°C": SensorDeviceClass.TEMPERATURE,
@@ -259,5 +283,66 @@ class EtaLatestErrorSensor(SensorEntity, EtaErrorEntity):
             self._attr_native_value = "-"
             return
 
-        sorted_errors = sorted(data, key=lambda d: d["time"])
-        self._attr_native_value = sorted_errors[-1]["msg"]
+        self._attr_native_value = self.coordinator.latest_error["msg"]
+
+
+class EtaPerformanceSensor(SensorEntity, EtaTerminalEntity[EtaStaggeredCoordinator]):
+    """Representation of a sensor showing how long and how much a coordinator polls.
+
+    The values come from the counters of the coordinator, so they don't cost
+    any requests.
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        hass: HomeAssistant,
+        coordinator: EtaStaggeredCoordinator,
+        key: str,
+        device_name: str | None = None,
+    ) -> None:
+        device_suffix = (
+            f"_{device_name.lower().replace(' ', '_')}" if device_name else ""
+        )
+        super().__init__(
+            coordinator,
+            config,
+            hass,
+            ENTITY_ID_FORMAT,
+            f"{device_suffix}_{key}",
+            device_name,
+        )
+
+        self._key = key
+        device_class, unit, suggested_unit = PERFORMANCE_SENSORS[key]
+        self._attr_device_class = device_class
+        self._attr_native_unit_of_measurement = unit
+        self._attr_suggested_unit_of_measurement = suggested_unit
+        if device_class != SensorDeviceClass.TIMESTAMP:
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_entity_registry_enabled_default = False
+        self._attr_has_entity_name = True
+        self._attr_translation_key = key
+
+        self._attr_native_value = coordinator.performance_as_dict()[key]
+
+    @property
+    def available(self) -> bool:
+        """Stay available when cycles fail, the numbers matter most then."""
+        return self.coordinator.last_cycle is not None or super().available
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_failed_cycle_listener(
+                self._handle_coordinator_update
+            )
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Update attributes when the coordinator updates."""
+        self._attr_native_value = self.coordinator.performance_as_dict()[self._key]
+        super()._handle_coordinator_update()
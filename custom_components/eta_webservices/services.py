@@ -1,16 +1,23 @@
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PORT
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .const import (
     DOMAIN,
+    ERROR_HISTORY,
 )
 
 from .api import EtaAPI
+from .metadata_cache import async_get_metadata_cache
 
 WRITE_ENDPOINT_SCHEMA = vol.Schema(
     {
@@ -21,10 +28,25 @@ WRITE_ENDPOINT_SCHEMA = vol.Schema(
     },
 )
 
+PURGE_METADATA_CACHE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("api_version"): cv.string,
+    },
+)
+
+GET_ERROR_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional("start"): cv.datetime,
+        vol.Optional("end"): cv.datetime,
+        vol.Optional("fub"): cv.string,
+        vol.Optional("priority"): cv.string,
+    },
+)
+
 
 async def async_setup_services(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
     session = async_get_clientsession(hass)
-    config = hass.data[DOMAIN][config_entry.entry_id]
+    config = config_entry.data
 
     async def handle_write(call: ServiceCall):
         """Handle the service call."""
@@ -37,6 +59,41 @@ async def async_setup_services(hass: HomeAssistant, config_entry: ConfigEntry) -
         if not success:
             raise HomeAssistantError("Could not write value, see log for details")
 
+    async def handle_purge_metadata_cache(call: ServiceCall):
+        """Remove cached endpoint metadata, e.g. after a firmware update."""
+        metadata_cache = await async_get_metadata_cache(hass)
+        metadata_cache.purge(call.data.get("api_version", None))
+
+    async def handle_get_error_history(call: ServiceCall) -> ServiceResponse:
+        """Return the recorded errors of all ETA terminals within a time range."""
+        errors = []
+        for entry_data in hass.data[DOMAIN].values():
+            if not isinstance(entry_data, dict) or ERROR_HISTORY not in entry_data:
+                continue
+            errors.extend(
+                entry_data[ERROR_HISTORY].query(
+                    call.data.get("start", None),
+                    call.data.get("end", None),
+                    call.data.get("fub", None),
+                    call.data.get("priority", None),
+                )
+            )
+        errors.sort(key=lambda error: error["time"])
+        return {"errors": errors}
+
     hass.services.async_register(
         DOMAIN, "write_value", handle_write, schema=WRITE_ENDPOINT_SCHEMA
     )
+    hass.services.async_register(
+        DOMAIN,
+        "purge_metadata_cache",
+        handle_purge_metadata_cache,
+        schema=PURGE_METADATA_CACHE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "get_error_history",
+        handle_get_error_history,
+        schema=GET_ERROR_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,54 @@
+"""Statistics of request latencies, without dependencies on Home Assistant."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Sequence
+import math
+
+
+def percentile(values: Sequence[float], fraction: float) -> float | None:
+    """Return the nearest-rank percentile of the values, None if there are none.
+
+    fraction is between 0 and 1, so percentile(latencies, 0.95) is the p95.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+# Number of recent request latencies the percentiles are computed from
+LATENCY_WINDOW = 200
+
+
+class EtaRequestStats:
+    """Counters of the requests sent by EtaAPI clients.
+
+    The counters only grow, callers take the difference of two snapshots to
+    get the numbers of a cycle. The latencies of the last requests are kept
+    for the percentiles.
+    """
+
+    def __init__(self, latency_window: int = LATENCY_WINDOW) -> None:
+        self.requests = 0
+        self.failed_requests = 0
+        self.bytes_received = 0
+        self.latencies: deque[float] = deque(maxlen=latency_window)
+
+    def record_request(self, latency: float, success: bool) -> None:
+        self.requests += 1
+        if not success:
+            self.failed_requests += 1
+        self.latencies.append(latency)
+
+    def record_bytes(self, count: int) -> None:
+        self.bytes_received += count
+
+    def snapshot(self) -> tuple[int, int, int]:
+        """Return the number of requests, failed requests and received bytes."""
+        return self.requests, self.failed_requests, self.bytes_received
+
+    def latency_percentile(self, fraction: float) -> float | None:
+        return percentile(self.latencies, fraction)
@@ -86,6 +86,8 @@ class EtaTime(EtaCoordinatorEntity, TimeEntity):
             ENTITY_ID_FORMAT,
             device_info,
         )
+        # TimeEntity has no default, the state is unknown until the first update
+        self._attr_native_value = None
 
     @callback
     def _handle_coordinator_update(self) -> None:
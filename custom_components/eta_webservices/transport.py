@@ -0,0 +1,168 @@
+"""Transports which record the traffic of a terminal and replay it offline.
+
+EtaAPI sends its requests through an aiohttp session, of which it only uses
+get, post, the status and the body of the responses. Both transports offer
+the same interface, so they can be passed to EtaAPI in place of a session:
+
+    transport = EtaRecordingTransport(session)
+    eta_client = EtaAPI(transport, host, port)
+    ...
+    transport.save("boiler.json.gz")
+
+    eta_client = EtaAPI(EtaReplayTransport.load("boiler.json.gz"), host, port)
+
+The archive is a gzipped JSON document. Every body is stored once, however
+often it was received, so recording many poll cycles stays small.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timezone
+import gzip
+import json
+from pathlib import Path
+
+from aiohttp import ClientConnectionError, ClientError
+
+ARCHIVE_VERSION = 1
+
+
+class EtaTransportResponse:
+    """Response with a body which was already read."""
+
+    def __init__(self, status: int, body: str) -> None:
+        self.status = status
+        self._body = body
+
+    async def text(self) -> str:
+        return self._body
+
+
+class EtaReplayMissError(ClientConnectionError):
+    """Raised when the archive holds no response for a request."""
+
+
+def _request_path(url: str) -> str:
+    # http://host:port/user/var//40/... -> /user/var//40/...
+    return "/" + url.split("/", 3)[3]
+
+
+class EtaRecordingTransport:
+    """Send requests through a session and record them with their latency."""
+
+    def __init__(self, session) -> None:
+        self._session = session
+        self._started_at: float | None = None
+        self.exchanges: list[dict] = []
+
+    async def get(self, url: str) -> EtaTransportResponse:
+        return await self._record("GET", url, lambda: self._session.get(url))
+
+    async def post(self, url: str, data=None) -> EtaTransportResponse:
+        return await self._record(
+            "POST", url, lambda: self._session.post(url, data=data), data
+        )
+
+    async def _record(self, method: str, url: str, request, data=None):
+        loop = asyncio.get_running_loop()
+        if self._started_at is None:
+            self._started_at = loop.time()
+        exchange = {
+            "method": method,
+            "path": _request_path(url),
+            "offset": loop.time() - self._started_at,
+        }
+        if data is not None:
+            exchange["data"] = data
+        started_at = loop.time()
+        try:
+            # the body is read here, so the latency covers the whole response
+            async with await request() as response:
+                status = response.status
+                body = await response.text()
+        except (ClientError, OSError, TimeoutError) as e:
+            exchange["latency"] = loop.time() - started_at
+            exchange["error"] = str(e) or type(e).__name__
+            self.exchanges.append(exchange)
+            raise
+        exchange["latency"] = loop.time() - started_at
+        exchange["status"] = status
+        exchange["body"] = body
+        self.exchanges.append(exchange)
+        return EtaTransportResponse(status, body)
+
+    def as_dict(self) -> dict:
+        bodies: dict[str, int] = {}
+        exchanges = []
+        for exchange in self.exchanges:
+            exchange = dict(exchange)
+            if "body" in exchange:
+                exchange["body"] = bodies.setdefault(exchange["body"], len(bodies))
+            exchanges.append(exchange)
+        return {
+            "version": ARCHIVE_VERSION,
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "bodies": list(bodies),
+            "exchanges": exchanges,
+        }
+
+    def save(self, path: str | Path) -> None:
+        """Write the recorded exchanges to a gzipped archive."""
+        with gzip.open(path, "wt", encoding="utf-8") as archive:
+            json.dump(self.as_dict(), archive, separators=(",", ":"))
+
+
+class EtaReplayTransport:
+    """Answer requests from a recording, with the recorded latency.
+
+    The responses to a path are replayed in the recorded order, the last one
+    is repeated once they are used up. latency_scale multiplies the recorded
+    latencies, 0 answers immediately.
+    """
+
+    def __init__(self, archive: dict, latency_scale: float = 1.0) -> None:
+        if archive.get("version") != ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported archive version {archive.get('version')}")
+        self._latency_scale = latency_scale
+        self._responses: dict[tuple[str, str], list[dict]] = defaultdict(list)
+        for exchange in archive["exchanges"]:
+            exchange = dict(exchange)
+            if "body" in exchange:
+                exchange["body"] = archive["bodies"][exchange["body"]]
+            self._responses[(exchange["method"], exchange["path"])].append(exchange)
+        self._positions: dict[tuple[str, str], int] = defaultdict(int)
+        self.requests = 0
+
+    @classmethod
+    def load(cls, path: str | Path, latency_scale: float = 1.0) -> EtaReplayTransport:
+        with gzip.open(path, "rt", encoding="utf-8") as archive:
+            return cls(json.load(archive), latency_scale)
+
+    @property
+    def paths(self) -> list[str]:
+        """Return the recorded GET paths, in the order of their first request."""
+        return [path for method, path in self._responses if method == "GET"]
+
+    async def get(self, url: str) -> EtaTransportResponse:
+        return await self._replay("GET", url)
+
+    async def post(self, url: str, data=None) -> EtaTransportResponse:
+        return await self._replay("POST", url)
+
+    async def _replay(self, method: str, url: str) -> EtaTransportResponse:
+        self.requests += 1
+        key = (method, _request_path(url))
+        responses = self._responses.get(key)
+        if not responses:
+            raise EtaReplayMissError(f"No recorded response for {method} {key[1]}")
+        position = self._positions[key]
+        exchange = responses[min(position, len(responses) - 1)]
+        self._positions[key] = position + 1
+
+        if self._latency_scale:
+            await asyncio.sleep(exchange["latency"] * self._latency_scale)
+        if "error" in exchange:
+            raise ClientConnectionError(exchange["error"])
+        return EtaTransportResponse(exchange["status"], exchange["body"])
@@ -0,0 +1,73 @@
+"""Parsing of terminal responses without stalling the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import xmltodict
+
+# Responses with at least this many characters are parsed in the executor
+EXECUTOR_THRESHOLD = 16 * 1024
+# Seconds of parsing on the event loop after which the parser yields to it
+YIELD_BUDGET = 0.01
+
+
+class EtaXmlParser:
+    """Parse XML responses while keeping the event loop responsive.
+
+    Large responses like the menu of a big installation are parsed in the
+    default executor. Small responses are parsed on the loop, because the
+    hand-off to a thread costs more than the parse itself, but once
+    yield_budget seconds of parsing have accumulated the parser yields to the
+    loop. A burst of varinfo responses during discovery is therefore split
+    into short slices instead of blocking the loop until it is done.
+    """
+
+    def __init__(
+        self,
+        executor_threshold: int = EXECUTOR_THRESHOLD,
+        yield_budget: float = YIELD_BUDGET,
+        clock=time.perf_counter,
+    ) -> None:
+        self._executor_threshold = executor_threshold
+        self._yield_budget = yield_budget
+        self._clock = clock
+        self._time_since_yield = 0.0
+        self.executor_parses = 0
+        self.loop_parses = 0
+        self.max_loop_parse_time = 0.0
+
+    async def parse(self, text: str) -> dict:
+        if len(text) >= self._executor_threshold:
+            self.executor_parses += 1
+            return await asyncio.get_running_loop().run_in_executor(
+                None, xmltodict.parse, text
+            )
+
+        started_at = self._clock()
+        result = xmltodict.parse(text)
+        parse_time = self._clock() - started_at
+        self.loop_parses += 1
+        self.max_loop_parse_time = max(self.max_loop_parse_time, parse_time)
+
+        self._time_since_yield += parse_time
+        if self._time_since_yield >= self._yield_budget:
+            self._time_since_yield = 0.0
+            await asyncio.sleep(0)
+        return result
+
+    def as_dict(self) -> dict:
+        return {
+            "executor_parses": self.executor_parses,
+            "loop_parses": self.loop_parses,
+            "max_loop_parse_time": self.max_loop_parse_time,
+        }
+
+
+_PARSER = EtaXmlParser()
+
+
+def get_xml_parser() -> EtaXmlParser:
+    """Return the parser shared by all clients."""
+    return _PARSER
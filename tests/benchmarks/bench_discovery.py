@@ -0,0 +1,180 @@
+"""Benchmark of the discovery of the entities of a terminal.
+
+    python -m tests.benchmarks.bench_discovery [--sizes 1000 5000] [--record]
+
+Discovers all devices of a simulated terminal, which runs in a separate
+thread, along both discovery paths:
+
+- config_flow: EtaFlowHandler connects and runs _scan_device for every device
+- coordinator: the first update of an EtaDataUpdateCoordinator per device
+  without stored entities
+
+Both paths run once with an empty metadata cache (cold) and once more with
+the cache filled by the first run (warm). For each run the script reports
+the total time, the requests per endpoint type, the URIs which were fetched
+more than once and the peak memory. The config flow needs Python 3.12, like
+the integration itself.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+import sys
+import time
+import tracemalloc
+
+from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.core import HomeAssistant
+
+from custom_components.eta_webservices import api
+from custom_components.eta_webservices.config_flow import EtaFlowHandler
+from custom_components.eta_webservices.coordinator import EtaDataUpdateCoordinator
+
+from ..simulator import FUB_NAMES, EtaTerminalSimulator
+from .harness import (
+    SimulatorThread,
+    add_config_entry,
+    argument_parser,
+    async_create_hass,
+    register_unthrottled_terminal,
+    report,
+)
+
+DEFAULT_SIZES = [1000, 5000]
+DEFAULT_LATENCY = 0.005
+FUBS = 5
+REQUEST_TYPES = ["api", "menu", "varinfo", "var"]
+
+
+async def async_discover_with_config_flow(
+    hass: HomeAssistant, terminal: EtaTerminalSimulator
+) -> int:
+    flow = EtaFlowHandler()
+    flow.hass = hass
+    error = await flow._async_connect(terminal.host, terminal.port)
+    if error is not None:
+        raise RuntimeError(f"Could not connect to the simulator: {error}")
+    entities = 0
+    for device in flow._device_structures:
+        scanned = await flow._scan_device(device)
+        entities += sum(len(entities) for entities in scanned.values())
+    return entities
+
+
+async def async_discover_with_coordinators(
+    hass: HomeAssistant, terminal: EtaTerminalSimulator
+) -> int:
+    # the config flow skips the menu cache, the coordinators share it
+    api._MENU_CACHE.clear()
+    # a new entry without stored entities, so every coordinator discovers
+    entry = add_config_entry(hass, {"scanned_devices_data": {}})
+    config = {CONF_HOST: terminal.host, CONF_PORT: terminal.port}
+    coordinators = [
+        EtaDataUpdateCoordinator(hass, config, device, entry.entry_id)
+        for device in FUB_NAMES[:FUBS]
+    ]
+    try:
+        results = await asyncio.gather(
+            *(coordinator._async_update_data() for coordinator in coordinators)
+        )
+    finally:
+        for coordinator in coordinators:
+            await coordinator.async_shutdown()
+    return sum(
+        len(entities)
+        for data in results
+        for key, entities in data.items()
+        if key != "values"
+    )
+
+
+PATHS = {
+    "config_flow": async_discover_with_config_flow,
+    "coordinator": async_discover_with_coordinators,
+}
+
+
+def _request_stats(requests: Counter) -> dict[str, float]:
+    by_type = Counter()
+    duplicates = 0
+    for path, count in requests.items():
+        request_type = path.split("/")[2]
+        by_type[request_type if request_type in REQUEST_TYPES else "other"] += count
+        if request_type in ("var", "varinfo"):
+            duplicates += count - 1
+    stats = {
+        f"requests_{request_type}": by_type[request_type]
+        for request_type in REQUEST_TYPES
+    }
+    stats["requests_other"] = by_type["other"]
+    stats["duplicate_uris"] = duplicates
+    return stats
+
+
+async def async_benchmark_path(
+    path: str, size: int, latency: float, memory: bool
+) -> dict[str, dict[str, float]]:
+    """Run a cold and a warm discovery on a new terminal and a new instance."""
+    hass = await async_create_hass()
+    terminal = EtaTerminalSimulator(
+        fubs=FUBS, endpoints_per_fub=max(1, size // FUBS), latency=latency
+    )
+    results = {}
+    try:
+        with SimulatorThread(terminal):
+            register_unthrottled_terminal(terminal.host, terminal.port, adaptive=True)
+            for cache in ("cold", "warm"):
+                terminal.requests.clear()
+                if memory:
+                    tracemalloc.start()
+                started_at = time.perf_counter()
+                try:
+                    entities = await PATHS[path](hass, terminal)
+                    total_time = time.perf_counter() - started_at
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+                result = {"total_time": total_time, "entities": entities}
+                if memory:
+                    result["peak_bytes"] = peak
+                result.update(_request_stats(terminal.requests))
+                results[f"{path}[{size},{cache}]"] = result
+    finally:
+        await hass.async_stop(force=True)
+    return results
+
+
+async def async_run_benchmarks(
+    sizes: list[int], latency: float, paths: list[str] | None = None
+) -> dict[str, dict[str, float]]:
+    results = {}
+    for size in sizes:
+        for path in paths or PATHS:
+            timed = await async_benchmark_path(path, size, latency, memory=False)
+            # tracing every allocation slows the discovery down, so the
+            # memory is measured in a separate run
+            traced = await async_benchmark_path(path, size, latency, memory=True)
+            for name, result in timed.items():
+                result["peak_bytes"] = traced[name]["peak_bytes"]
+                results[name] = result
+    return results
+
+
+def main() -> int:
+    parser = argument_parser(__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=DEFAULT_LATENCY,
+        help="seconds the terminal takes to answer a request",
+    )
+    parser.add_argument("--paths", nargs="+", choices=list(PATHS))
+    args = parser.parse_args()
+    results = asyncio.run(async_run_benchmarks(args.sizes, args.latency, args.paths))
+    return report("discovery", results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""Benchmark of the entity layer for large numbers of entities.
+
+    python -m tests.benchmarks.bench_entities [--sizes 1000 5000 10000]
+
+Uses a synthetic catalog of N discovered endpoints, so no terminal is
+involved, and measures:
+
+- setup[platform]: async_setup_entry of the sensor, switch, number and time
+  platform, which creates the entities with generate_entity_id and checks
+  every endpoint against the CHOSEN_* lists of the options
+- fan_out: one coordinator update, which reaches every entity through
+  _handle_coordinator_update and writes its state with async_write_ha_state
+
+For each run the script reports the time, the time per entity and the peak
+memory. The timings are the best of several runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+import gc
+import logging
+import sys
+import time
+import tracemalloc
+
+from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity_platform import EntityPlatform
+
+from custom_components.eta_webservices import number, sensor, switch
+from custom_components.eta_webservices import time as time_platform
+from custom_components.eta_webservices.const import (
+    CHOSEN_DEVICES,
+    CHOSEN_FLOAT_SENSORS,
+    CHOSEN_SWITCHES,
+    CHOSEN_TEXT_SENSORS,
+    CHOSEN_WRITABLE_SENSORS,
+    CUSTOM_UNIT_MINUTES_SINCE_MIDNIGHT,
+    DOMAIN,
+    ERROR_UPDATE_COORDINATOR,
+    FLOAT_DICT,
+    SWITCHES_DICT,
+    TEXT_DICT,
+    WRITABLE_DICT,
+)
+from custom_components.eta_webservices.coordinator import (
+    ETAErrorUpdateCoordinator,
+    EtaDataUpdateCoordinator,
+)
+
+from ..simulator import FUB_NAMES, EtaTerminalSimulator
+from .catalog import entity_catalog
+from .harness import (
+    REPEAT,
+    _gc_disabled,
+    add_config_entry,
+    argument_parser,
+    async_create_hass,
+    report,
+)
+
+DEFAULT_SIZES = [1000, 5000, 10000]
+HOST = "192.0.2.1"
+PORT = 8080
+FUBS = 5
+DEVICE = FUB_NAMES[0]
+PLATFORMS = {
+    "sensor": sensor,
+    "switch": switch,
+    "number": number,
+    "time": time_platform,
+}
+
+
+def _catalog(size: int) -> dict:
+    # the simulator only renders the endpoints, it is never started
+    terminal = EtaTerminalSimulator(fubs=FUBS, endpoints_per_fub=max(1, size // FUBS))
+    return entity_catalog(terminal, HOST)
+
+
+def _values(catalog: dict, cycle: int) -> dict:
+    """Return new values for every entity of the catalog."""
+    values = {}
+    for key in catalog[FLOAT_DICT]:
+        values[key] = float(cycle % 100)
+    for key in catalog[TEXT_DICT]:
+        values[key] = f"Text {cycle}"
+    for key, endpoint in catalog[SWITCHES_DICT].items():
+        valid_values = endpoint["valid_values"]
+        values[key] = valid_values["on_value" if cycle % 2 else "off_value"]
+    for key, endpoint in catalog[WRITABLE_DICT].items():
+        if endpoint["unit"] == CUSTOM_UNIT_MINUTES_SINCE_MIDNIGHT:
+            values[key] = cycle % 1440
+        else:
+            values[key] = float(cycle % 10)
+    return values
+
+
+async def _async_best_of(
+    func: Callable[[], Awaitable[object]], repeat: int
+) -> tuple[float, int]:
+    """Return the fastest of repeat runs and the peak memory of one more run."""
+    gc.collect()
+    elapsed = float("inf")
+    for _ in range(repeat):
+        with _gc_disabled():
+            started_at = time.perf_counter()
+            await func()
+            elapsed = min(elapsed, time.perf_counter() - started_at)
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, max(0, peak - before)
+
+
+async def async_benchmark_size(
+    hass: HomeAssistant, size: int, repeat: int
+) -> dict[str, dict[str, float]]:
+    catalog = _catalog(size)
+    config = {CONF_HOST: HOST, CONF_PORT: PORT, CHOSEN_DEVICES: [DEVICE]}
+    # the options store the chosen entities as lists, like the options flow
+    options = {
+        CHOSEN_FLOAT_SENSORS: list(catalog[FLOAT_DICT]),
+        CHOSEN_TEXT_SENSORS: list(catalog[TEXT_DICT]),
+        CHOSEN_SWITCHES: list(catalog[SWITCHES_DICT]),
+        CHOSEN_WRITABLE_SENSORS: list(catalog[WRITABLE_DICT]),
+    }
+    entry = add_config_entry(hass, {**config, "scanned_devices_data": {}}, options)
+    coordinator = EtaDataUpdateCoordinator(hass, config, DEVICE, entry.entry_id)
+    coordinator.data = catalog
+    error_coordinator = ETAErrorUpdateCoordinator(hass, config)
+    error_coordinator.data = []
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+        DEVICE: coordinator,
+        ERROR_UPDATE_COORDINATOR: error_coordinator,
+    }
+
+    results = {}
+    entities = {}
+    for name, platform in PLATFORMS.items():
+        created = []
+
+        def add_entities(new_entities, update_before_add=False):
+            created[:] = new_entities
+
+        async def setup_entry():
+            await platform.async_setup_entry(hass, entry, add_entities)
+
+        setup_time, peak = await _async_best_of(setup_entry, repeat)
+        entities[name] = list(created)
+        results[f"setup[{name},{size}]"] = {
+            "entities": len(created),
+            "total_time": setup_time,
+            "time_per_entity": setup_time / max(1, len(created)),
+            "peak_bytes": peak,
+        }
+
+    # The entities are added like Home Assistant does it. Discovered entities
+    # are disabled by default, so they are enabled in the registry first.
+    registry = er.async_get(hass)
+    platforms = []
+    for name, platform_entities in entities.items():
+        for entity in platform_entities:
+            registry.async_get_or_create(
+                name,
+                DOMAIN,
+                entity.unique_id,
+                suggested_object_id=entity.entity_id.split(".", 1)[1],
+            )
+        entity_platform = EntityPlatform(
+            hass=hass,
+            logger=logging.getLogger(__name__),
+            domain=name,
+            platform_name=DOMAIN,
+            platform=None,
+            scan_interval=timedelta(minutes=1),
+            entity_namespace=None,
+        )
+        await entity_platform.async_add_entities(platform_entities)
+        platforms.append(entity_platform)
+
+    cycle = 0
+
+    async def update():
+        nonlocal cycle
+        cycle += 1
+        coordinator.data = {**catalog, "values": _values(catalog, cycle)}
+        coordinator.async_update_listeners()
+
+    try:
+        fan_out_time, peak = await _async_best_of(update, repeat)
+    finally:
+        for entity_platform in platforms:
+            await entity_platform.async_reset()
+        await coordinator.async_shutdown()
+        await error_coordinator.async_shutdown()
+
+    listening = sum(len(platform_entities) for platform_entities in entities.values())
+    results[f"fan_out[{size}]"] = {
+        "entities": listening,
+        "total_time": fan_out_time,
+        "time_per_entity": fan_out_time / max(1, listening),
+        "peak_bytes": peak,
+    }
+    return results
+
+
+async def async_run_benchmarks(
+    sizes: list[int], repeat: int = REPEAT
+) -> dict[str, dict[str, float]]:
+    results = {}
+    for size in sizes:
+        # a new instance per size, so the states of a smaller run don't
+        # change the entity ids of a larger one
+        hass = await async_create_hass()
+        try:
+            results.update(await async_benchmark_size(hass, size, repeat))
+        finally:
+            await hass.async_stop(force=True)
+    return results
+
+
+def main() -> int:
+    parser = argument_parser(__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    args = parser.parse_args()
+    results = asyncio.run(async_run_benchmarks(args.sizes))
+    return report("entities", results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
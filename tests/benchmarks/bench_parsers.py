@@ -0,0 +1,109 @@
+"""Micro-benchmarks of the response parsers of EtaAPI.
+
+    python -m tests.benchmarks.bench_parsers [--save-baseline] [--threshold 0.25]
+
+Reports the calls per second and the peak allocations of every parser, and
+exits with 1 if a result is worse than the baseline by more than the
+threshold.
+"""
+
+from __future__ import annotations
+
+import itertools
+import sys
+
+import xmltodict
+
+from custom_components.eta_webservices.api import EtaAPI
+
+from .corpus import ResponseCorpus
+from .harness import (
+    REPEAT,
+    StaticSession,
+    argument_parser,
+    register_unthrottled_terminal,
+    measure,
+    measure_async,
+    report,
+)
+
+# Every benchmark of a full request path gets its own port, so it has its own
+# scheduler and circuit breaker on its own event loop
+_PORTS = itertools.count(20000)
+
+
+def _client(corpus: ResponseCorpus) -> EtaAPI:
+    port = next(_PORTS)
+    register_unthrottled_terminal("benchmark", port)
+    return EtaAPI(StaticSession(corpus.responses()), "benchmark", port)
+
+
+def run_benchmarks(
+    min_time: float = 0.05, repeat: int = REPEAT
+) -> dict[str, dict[str, float]]:
+    corpus = ResponseCorpus()
+    eta_client = _client(corpus)
+    results = {}
+
+    def timed(func):
+        return measure(func, min_time, repeat)
+
+    def timed_async(func):
+        return measure_async(func, min_time, repeat)
+
+    for kind, (uri, value_xml, varinfo_xml) in corpus.endpoints.items():
+        value = xmltodict.parse(value_xml)["eta"]["value"]
+        variable = xmltodict.parse(varinfo_xml)["eta"]["varInfo"]["variable"]
+        metadata = eta_client._parse_varinfo(variable)
+        metadata["value"] = eta_client._parse_data(value)[0]
+
+        results[f"_parse_data[{kind}]"] = timed(
+            lambda value=value: eta_client._parse_data(value)
+        )
+        results[f"_parse_unit[{kind}]"] = timed(
+            lambda variable=variable: eta_client._parse_unit(variable)
+        )
+        results[f"_parse_varinfo[{kind}]"] = timed(
+            lambda variable=variable: eta_client._parse_varinfo(variable)
+        )
+        results[f"classify_entity[{kind}]"] = timed(
+            lambda metadata=metadata: eta_client.classify_entity(metadata)
+        )
+
+        client = _client(corpus)
+        results[f"get_data[{kind}]"] = timed_async(
+            lambda uri=uri, client=client: client.get_data(uri)
+        )
+        client = _client(corpus)
+        results[f"_get_varinfo[{kind}]"] = timed_async(
+            lambda uri=uri, client=client: client._get_varinfo("Kessel", uri)
+        )
+
+    for size, menu_xml in (("small", corpus.small_menu), ("large", corpus.large_menu)):
+        fubs = xmltodict.parse(menu_xml)["eta"]["menu"]["fub"]
+        fubs = fubs if isinstance(fubs, list) else [fubs]
+        results[f"_parse_menu_node[{size}]"] = timed(
+            lambda fubs=fubs: [eta_client._parse_menu_node(fub) for fub in fubs]
+        )
+
+    errors = xmltodict.parse(corpus.errors)["eta"]["errors"]["fub"]
+    results["_parse_errors"] = timed(lambda: eta_client._parse_errors(errors))
+    results["get_errors"] = timed_async(_client(corpus).get_errors)
+
+    return results
+
+
+def main() -> int:
+    parser = argument_parser(__doc__)
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.05,
+        help="seconds of every timed run of a benchmark",
+    )
+    args = parser.parse_args()
+    return report("parsers", run_benchmarks(args.min_time), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
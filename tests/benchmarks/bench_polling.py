@@ -0,0 +1,232 @@
+"""End-to-end benchmark of a poll cycle of EtaDataUpdateCoordinator.
+
+    python -m tests.benchmarks.bench_polling [--sizes 100 1000 5000] [--latency 0.005]
+
+Every strategy polls N chosen endpoints of a simulated terminal, which runs
+in a separate thread:
+
+- sequential: one request after the other
+- parallel: individual requests, --concurrency of them at the same time
+- bulk: all values of a cycle with one /user/vars request
+
+For each strategy and size the script reports the wall time of a cycle, the
+number of requests, the time the event loop of the integration was busy
+and the peak memory of the cycle. The first cycle of every run is not
+measured, so the bulk strategy can set up its variable set.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.core import HomeAssistant
+
+from custom_components.eta_webservices.api import EtaAPI, ETAEndpoint
+from custom_components.eta_webservices.coordinator import EtaDataUpdateCoordinator
+
+from ..simulator import FUB_NAMES, EtaTerminalSimulator
+from .catalog import entity_catalog
+from .harness import (
+    SimulatorThread,
+    add_config_entry,
+    argument_parser,
+    async_create_hass,
+    register_unthrottled_terminal,
+    report,
+)
+
+DEFAULT_SIZES = [100, 1000, 5000]
+DEFAULT_LATENCY = 0.005
+DEFAULT_CONCURRENCY = 8
+FUBS = 5
+DEVICE = FUB_NAMES[0]
+
+
+class BulkReadCoordinator(EtaDataUpdateCoordinator):
+    """Read all values of a cycle with a single /user/vars request.
+
+    The variable set of the terminal is rebuilt whenever the polled
+    endpoints change.
+    """
+
+    VARIABLE_SET = "home_assistant"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._variable_set_uris: frozenset[str] | None = None
+
+    async def _async_create_variable_set(
+        self, eta_client: EtaAPI, uris: frozenset[str]
+    ) -> None:
+        base = f"/user/vars/{self.VARIABLE_SET}"
+        async with self.session.delete(eta_client.build_uri(base)):
+            pass
+        async with self.session.put(eta_client.build_uri(base)):
+            pass
+
+        async def add_variable(uri):
+            async with self.session.put(eta_client.build_uri(base + uri)):
+                pass
+
+        await asyncio.gather(*(add_variable(uri) for uri in uris))
+        self._variable_set_uris = uris
+
+    async def _async_fetch_values(
+        self, eta_client: EtaAPI, endpoints: dict[str, ETAEndpoint]
+    ) -> dict:
+        uris = frozenset(str(endpoint["url"]) for endpoint in endpoints.values())
+        if uris != self._variable_set_uris:
+            await self._async_create_variable_set(eta_client, uris)
+
+        text = await eta_client._get_text(f"/user/vars/{self.VARIABLE_SET}")
+        variables = (await eta_client._parse_xml(text))["eta"]["vars"]["variable"]
+        if isinstance(variables, dict):
+            variables = [variables]
+        by_uri = {
+            variable["@uri"].removeprefix("/user/var"): variable
+            for variable in variables
+        }
+
+        results = {}
+        for key, endpoint in endpoints.items():
+            variable = by_uri.get(str(endpoint["url"]))
+            if variable is None:
+                results[key] = KeyError(endpoint["url"])
+                continue
+            results[key] = eta_client._parse_data(
+                variable, self._should_force_number_handling(endpoint["unit"])
+            )[0]
+        return results
+
+
+STRATEGIES = {
+    "sequential": (EtaDataUpdateCoordinator, 1),
+    "parallel": (EtaDataUpdateCoordinator, None),
+    "bulk": (BulkReadCoordinator, 1),
+}
+
+
+async def _async_run_cycle(coordinator: EtaDataUpdateCoordinator) -> None:
+    coordinator.data = await coordinator._async_update_data()
+
+
+async def async_benchmark_strategy(
+    hass: HomeAssistant,
+    terminal: EtaTerminalSimulator,
+    strategy: str,
+    concurrency: int,
+) -> dict[str, float]:
+    coordinator_class, strategy_concurrency = STRATEGIES[strategy]
+    register_unthrottled_terminal(
+        terminal.host, terminal.port, strategy_concurrency or concurrency
+    )
+    catalog = entity_catalog(terminal, terminal.host)
+    entry = add_config_entry(hass, {"scanned_devices_data": {DEVICE: catalog}})
+    config = {CONF_HOST: terminal.host, CONF_PORT: terminal.port}
+    coordinator = coordinator_class(hass, config, DEVICE, entry.entry_id)
+    # every entity listens with its key, which makes it part of the poll cycle
+    for entities in catalog.values():
+        for key in entities:
+            coordinator.async_add_listener(lambda: None, key)
+
+    try:
+        await _async_run_cycle(coordinator)
+
+        requests_before = sum(terminal.requests.values())
+        busy_before = time.thread_time()
+        started_at = time.perf_counter()
+        await _async_run_cycle(coordinator)
+        wall_time = time.perf_counter() - started_at
+        loop_busy_time = time.thread_time() - busy_before
+        requests = sum(terminal.requests.values()) - requests_before
+
+        tracemalloc.start()
+        try:
+            await _async_run_cycle(coordinator)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    finally:
+        # the listeners scheduled a refresh, which must not outlive the terminal
+        await coordinator.async_shutdown()
+
+    values = coordinator.data["values"]
+    if len(values) != len(terminal.endpoints):
+        raise RuntimeError(
+            f"{strategy} read {len(values)} of {len(terminal.endpoints)} values"
+        )
+    return {
+        "wall_time": wall_time,
+        "requests": requests,
+        "loop_busy_time": loop_busy_time,
+        "peak_bytes": peak,
+    }
+
+
+async def async_run_benchmarks(
+    sizes: list[int],
+    latency: float,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    terminal_concurrency: int | None = None,
+    strategies: list[str] | None = None,
+) -> dict[str, dict[str, float]]:
+    hass = await async_create_hass()
+    results = {}
+    try:
+        for size in sizes:
+            for strategy in strategies or STRATEGIES:
+                terminal = EtaTerminalSimulator(
+                    fubs=FUBS,
+                    endpoints_per_fub=max(1, size // FUBS),
+                    latency=latency,
+                    max_concurrency=terminal_concurrency,
+                )
+                with SimulatorThread(terminal):
+                    results[f"{strategy}[{size}]"] = await async_benchmark_strategy(
+                        hass, terminal, strategy, concurrency
+                    )
+    finally:
+        await hass.async_stop(force=True)
+    return results
+
+
+def main() -> int:
+    parser = argument_parser(__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=DEFAULT_LATENCY,
+        help="seconds the terminal takes to answer a request",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="parallel requests of the parallel strategy",
+    )
+    parser.add_argument(
+        "--terminal-concurrency",
+        type=int,
+        help="requests the terminal works on at the same time",
+    )
+    parser.add_argument("--strategies", nargs="+", choices=list(STRATEGIES))
+    args = parser.parse_args()
+    results = asyncio.run(
+        async_run_benchmarks(
+            args.sizes,
+            args.latency,
+            args.concurrency,
+            args.terminal_concurrency,
+            args.strategies,
+        )
+    )
+    return report("polling", results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
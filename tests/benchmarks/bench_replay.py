@@ -0,0 +1,156 @@
+"""Benchmark of discovery and polling against a recorded terminal.
+
+    python -m tests.benchmarks.bench_replay [ARCHIVE] [--latency-scale 1.0]
+
+Replays an archive of EtaRecordingTransport, for example one recorded from
+a real boiler, and runs the discovery of all endpoints of its menu and
+poll cycles of all recorded values with the real menus and responses,
+of which the fastest is reported. The requests are answered with the recorded latency, multiplied
+by --latency-scale. Without an archive, a simulated terminal is recorded
+first.
+
+For each phase the script reports the wall time, the CPU time of the
+integration and the number of requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+from custom_components.eta_webservices.api import EtaAPI
+from custom_components.eta_webservices.transport import (
+    EtaRecordingTransport,
+    EtaReplayTransport,
+)
+
+from ..simulator import EtaTerminalSimulator
+from .harness import (
+    SimulatorThread,
+    argument_parser,
+    register_unthrottled_terminal,
+    report,
+)
+
+DEFAULT_CYCLES = 3
+DEFAULT_LATENCY_SCALE = 1.0
+# Terminal which is recorded when no archive is given
+SIMULATED_FUBS = 5
+SIMULATED_ENDPOINTS_PER_FUB = 200
+SIMULATED_LATENCY = 0.005
+# The replayed terminal is independent of the recorded address
+REPLAY_HOST = "192.0.2.1"
+REPLAY_PORT = 8080
+
+
+async def async_discover(eta_client: EtaAPI) -> list[str]:
+    """Read the metadata of every endpoint of the menu, return the URIs."""
+    await eta_client.get_api_version()
+    structures = await eta_client.get_entity_structures()
+    uris = [
+        uri
+        for structure in structures.values()
+        for uri in eta_client.get_endpoint_uris(structure)
+    ]
+    await asyncio.gather(
+        *(eta_client.async_get_entity_metadata(uri, False) for uri in uris),
+        return_exceptions=True,
+    )
+    return uris
+
+
+async def async_poll(eta_client: EtaAPI, uris: list[str]) -> None:
+    await asyncio.gather(
+        *(eta_client.get_data(uri) for uri in uris), return_exceptions=True
+    )
+
+
+async def async_record_simulator(
+    path: Path,
+    cycles: int,
+    endpoints_per_fub: int = SIMULATED_ENDPOINTS_PER_FUB,
+) -> None:
+    """Record the discovery and the poll cycles of a simulated terminal."""
+    terminal = EtaTerminalSimulator(
+        fubs=SIMULATED_FUBS,
+        endpoints_per_fub=endpoints_per_fub,
+        latency=SIMULATED_LATENCY,
+    )
+    with SimulatorThread(terminal):
+        register_unthrottled_terminal(terminal.host, terminal.port, adaptive=True)
+        async with aiohttp.ClientSession() as session:
+            recorder = EtaRecordingTransport(session)
+            eta_client = EtaAPI(recorder, terminal.host, terminal.port)
+            uris = await async_discover(eta_client)
+            for _ in range(cycles):
+                await async_poll(eta_client, uris)
+    recorder.save(path)
+
+
+async def _async_measure(transport: EtaReplayTransport, phase) -> dict[str, float]:
+    requests_before = transport.requests
+    cpu_before = time.process_time()
+    started_at = time.perf_counter()
+    await phase
+    return {
+        "wall_time": time.perf_counter() - started_at,
+        "cpu_time": time.process_time() - cpu_before,
+        "requests": transport.requests - requests_before,
+    }
+
+
+async def async_run_benchmarks(
+    archive: Path, latency_scale: float, cycles: int = DEFAULT_CYCLES
+) -> dict[str, dict[str, float]]:
+    transport = EtaReplayTransport.load(archive, latency_scale)
+    register_unthrottled_terminal(REPLAY_HOST, REPLAY_PORT, adaptive=True)
+    eta_client = EtaAPI(transport, REPLAY_HOST, REPLAY_PORT)
+
+    results = {"discovery": await _async_measure(transport, async_discover(eta_client))}
+    # poll what was polled when the archive was recorded
+    polled = [
+        path.removeprefix("/user/var/")
+        for path in transport.paths
+        if path.startswith("/user/var/")
+    ]
+    cycles = [
+        await _async_measure(transport, async_poll(eta_client, polled))
+        for _ in range(cycles)
+    ]
+    # the fastest cycle counts, like the best of several timed runs
+    results["poll"] = min(cycles, key=lambda cycle: cycle["wall_time"])
+    return results
+
+
+def main() -> int:
+    parser = argument_parser(__doc__)
+    parser.add_argument("archive", type=Path, nargs="?")
+    parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=DEFAULT_LATENCY_SCALE,
+        help="factor for the recorded latencies, 0 answers immediately",
+    )
+    parser.add_argument("--cycles", type=int, default=DEFAULT_CYCLES)
+    args = parser.parse_args()
+
+    if args.archive is None:
+        archive = Path(tempfile.mkdtemp()) / "simulator.json.gz"
+        asyncio.run(async_record_simulator(archive, args.cycles))
+        name = "replay"
+    else:
+        archive = args.archive
+        name = "replay_" + archive.name.split(".")[0]
+    results = asyncio.run(
+        async_run_benchmarks(archive, args.latency_scale, args.cycles)
+    )
+    return report(name, results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""Synthetic catalog of discovered entities for the benchmarks."""
+
+from __future__ import annotations
+
+import xmltodict
+
+from custom_components.eta_webservices.api import EtaAPI
+from custom_components.eta_webservices.const import (
+    FLOAT_DICT,
+    SWITCHES_DICT,
+    TEXT_DICT,
+    WRITABLE_DICT,
+)
+
+from ..simulator import EtaTerminalSimulator
+
+
+def entity_catalog(terminal: EtaTerminalSimulator, host: str) -> dict:
+    """Return the discovered entities of all endpoints of a simulated terminal.
+
+    The result has the shape discovery stores in the config entry, so it can
+    be used as the scanned data of a device without running the discovery.
+    """
+    # parsing never connects, so the terminal doesn't have to be started
+    eta_client = EtaAPI(None, host, terminal.port or 0)
+    catalog = {FLOAT_DICT: {}, SWITCHES_DICT: {}, TEXT_DICT: {}, WRITABLE_DICT: {}}
+    for uri, endpoint in terminal.endpoints.items():
+        variable = xmltodict.parse(endpoint.varinfo_xml())["varInfo"]["variable"]
+        metadata = eta_client._parse_varinfo(variable)
+        metadata["url"] = uri
+        metadata["value"] = None
+        entity_type = eta_client.classify_entity(metadata)
+        key = f"eta_{host.replace('.', '_')}_{uri.strip('/').replace('/', '_')}"
+        if entity_type == "sensor":
+            if metadata["unit"] == "":
+                catalog[TEXT_DICT][key] = metadata
+            else:
+                catalog[FLOAT_DICT][key] = metadata
+        elif entity_type == "switch":
+            eta_client._parse_switch_values(metadata)
+            catalog[SWITCHES_DICT][key] = metadata
+        elif entity_type in ("number", "time"):
+            catalog[WRITABLE_DICT][key] = metadata
+    catalog["values"] = {}
+    return catalog
@@ -0,0 +1,62 @@
+"""Corpus of terminal responses for the benchmarks.
+
+The responses are rendered by the simulated terminal with a fixed seed, so
+every run parses exactly the same documents. The large menu has the size of
+a big installation with several heating circuits.
+"""
+
+from __future__ import annotations
+
+from ..simulator import ENDPOINT_KINDS, EtaTerminalSimulator, eta_document
+
+# Size of the large menu: 7 fubs with 1000 endpoints each
+LARGE_MENU_FUBS = 7
+LARGE_MENU_ENDPOINTS_PER_FUB = 1000
+# Number of active errors in the error response
+ERROR_COUNT = 40
+
+
+class ResponseCorpus:
+    """Responses of a small and a large terminal, keyed by request path."""
+
+    def __init__(self) -> None:
+        small = EtaTerminalSimulator(fubs=1, endpoints_per_fub=50, seed=1)
+        large = EtaTerminalSimulator(
+            fubs=LARGE_MENU_FUBS,
+            endpoints_per_fub=LARGE_MENU_ENDPOINTS_PER_FUB,
+            seed=2,
+        )
+        for index in range(ERROR_COUNT):
+            small.add_error(
+                ["Kessel", "Puffer", "Lager", "Solar"][index % 4],
+                f"Fehler {index}",
+                "Error" if index % 3 else "Warning",
+                f"2024-01-{1 + index % 28:02d} {index % 24:02d}:15:00",
+                "Bitte den Kundendienst kontaktieren.",
+            )
+
+        self.small_menu = eta_document(small.menu_xml)
+        self.large_menu = eta_document(large.menu_xml)
+        self.errors = eta_document(small.errors_xml())
+        self.api = eta_document('<api version="1.2" uri="/user/api"/>')
+        # uri, /user/var and /user/varinfo response of an endpoint of every kind
+        self.endpoints = {}
+        for kind in ENDPOINT_KINDS:
+            endpoint = small.endpoints[small.uris_of_kind(kind)[0]]
+            self.endpoints[kind] = (
+                endpoint.uri,
+                eta_document(endpoint.value_xml()),
+                eta_document(endpoint.varinfo_xml()),
+            )
+
+    def responses(self) -> dict[str, str]:
+        """Return the bodies of all GET requests, keyed by path."""
+        responses = {
+            "/user/api": self.api,
+            "/user/menu": self.large_menu,
+            "/user/errors": self.errors,
+        }
+        for uri, value, varinfo in self.endpoints.values():
+            responses["/user/var/" + uri.lstrip("/")] = value
+            responses["/user/varinfo/" + uri.lstrip("/")] = varinfo
+        return responses
@@ -0,0 +1,414 @@
+"""Shared helpers of the benchmark scripts.
+
+Every benchmark produces a flat dict of named results. Results are printed
+as a table, can be saved as the baseline of the benchmark and are compared
+with that baseline, so a script fails if a result got worse by more than a
+threshold. By default only metrics which do not depend on the machine, like
+requests and memory, are saved and compared. Timings differ too much between
+machines to be checked against a baseline in the repository, so they are only
+compared with --compare-timings, e.g. against a baseline outside of it:
+
+    python -m tests.benchmarks.bench_parsers --save-baseline
+    python -m tests.benchmarks.bench_parsers --threshold 0.3
+    python -m tests.benchmarks.bench_parsers --compare-timings --baseline ~/parsers.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import gc
+import inspect
+import json
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from homeassistant.config_entries import ConfigEntries, ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity, entity_registry as er
+
+from custom_components.eta_webservices import scheduler
+from custom_components.eta_webservices.const import DOMAIN
+from custom_components.eta_webservices.limiter import AdaptiveConcurrencyLimiter
+
+from ..simulator import EtaTerminalSimulator
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+HISTORY_DIR = Path(__file__).parent / "history"
+# Relative change of a result which is reported as a regression. Timings on
+# a busy machine easily vary by a third, so only larger changes fail a run.
+DEFAULT_THRESHOLD = 0.5
+# Memory changes are relative to at least this many bytes, so baselines of
+# a few or zero bytes do not fail on the allocations of another Python version
+MEMORY_FLOOR = 4096
+# Number of timed runs of a benchmark, the fastest one counts like in timeit
+REPEAT = 5
+
+# Metrics for which a higher value is better, all others should go down
+HIGHER_IS_BETTER = {"ops_per_sec"}
+# Metrics which only describe a run and are never compared
+INFORMATIONAL = {"calls", "entities"}
+# Timings depend on the machine, they are only saved and compared with
+# --compare-timings
+TIMINGS = {
+    "cpu_time",
+    "loop_busy_time",
+    "ops_per_sec",
+    "time_per_entity",
+    "total_time",
+    "wall_time",
+}
+
+
+class StaticResponse:
+    """Response with a fixed body, cheaper than a mocked one."""
+
+    def __init__(self, body: str, status: int = 200) -> None:
+        self.status = status
+        self._body = body
+
+    async def text(self) -> str:
+        return self._body
+
+
+class StaticSession:
+    """Session answering GETs from a suffix -> body mapping."""
+
+    def __init__(self, responses: dict[str, str]) -> None:
+        self._responses = responses
+        self.requests = 0
+
+    async def get(self, url: str) -> StaticResponse:
+        self.requests += 1
+        # EtaAPI appends menu URIs with a leading slash, e.g. /user/var//40/...
+        path = "/" + url.split("/", 3)[3].replace("//", "/")
+        return StaticResponse(self._responses[path])
+
+
+def register_unthrottled_terminal(
+    host: str, port: int, max_concurrency: int = 1000, adaptive: bool = False
+) -> None:
+    """Let the requests to a terminal skip the rate limit of the scheduler.
+
+    The benchmarks measure the cost of the integration, not the pacing which
+    protects a real terminal. With adaptive, the concurrency follows the
+    latency like in production instead of being fixed.
+    """
+    scheduler.set_scheduler(
+        host,
+        port,
+        scheduler.EtaRequestScheduler(
+            max_concurrency=max_concurrency,
+            requests_per_second=None,
+            limiter=AdaptiveConcurrencyLimiter() if adaptive else None,
+        ),
+    )
+
+
+class SimulatorThread:
+    """Run a simulated terminal on the event loop of a separate thread.
+
+    The time the loop of the benchmark spends on a cycle then only contains
+    the work of the integration, not the work of the terminal.
+    """
+
+    def __init__(self, simulator: EtaTerminalSimulator) -> None:
+        self.simulator = simulator
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    def __enter__(self) -> EtaTerminalSimulator:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.simulator.start(), self._loop).result()
+        return self.simulator
+
+    def __exit__(self, *exc_info) -> None:
+        asyncio.run_coroutine_threadsafe(self.simulator.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+async def async_create_hass() -> HomeAssistant:
+    """Return a Home Assistant instance with the registries the integration uses."""
+    hass = HomeAssistant(tempfile.mkdtemp())
+    entity.async_setup(hass)
+    await er.async_load(hass)
+    hass.config_entries = ConfigEntries(hass, {})
+    return hass
+
+
+def add_config_entry(
+    hass: HomeAssistant, data: dict, options: dict | None = None
+) -> ConfigEntry:
+    """Add a config entry of the integration without setting it up."""
+    kwargs = {}
+    if "discovery_keys" in inspect.signature(ConfigEntry).parameters:
+        # required since Home Assistant 2024.10
+        kwargs["discovery_keys"] = {}
+    entry = ConfigEntry(
+        version=5,
+        minor_version=1,
+        domain=DOMAIN,
+        title="ETA benchmark",
+        data=data,
+        source="user",
+        options=options or {},
+        unique_id=None,
+        **kwargs,
+    )
+    hass.config_entries._entries[entry.entry_id] = entry
+    return entry
+
+
+def measure(
+    func: Callable[[], object], min_time: float = 0.05, repeat: int = REPEAT
+) -> dict[str, float]:
+    """Return the throughput and the allocations of a function."""
+    calls = _calibrate(func, min_time)
+    gc.collect()
+    elapsed = float("inf")
+    for _ in range(repeat):
+        with _gc_disabled():
+            started_at = time.perf_counter()
+            for _ in range(calls):
+                func()
+            elapsed = min(elapsed, time.perf_counter() - started_at)
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "calls": calls,
+        "ops_per_sec": calls / elapsed,
+        "peak_bytes_per_op": max(0, peak - before),
+    }
+
+
+def measure_async(
+    func: Callable[[], Awaitable[object]],
+    min_time: float = 0.05,
+    repeat: int = REPEAT,
+) -> dict[str, float]:
+    """Like measure, for a coroutine function. All calls share one event loop."""
+    loop = asyncio.new_event_loop()
+
+    def run_calls(calls: int) -> None:
+        async def run():
+            for _ in range(calls):
+                await func()
+
+        loop.run_until_complete(run())
+
+    try:
+        run_calls(1)
+        calls = _calibrate(lambda: run_calls(1), min_time)
+        gc.collect()
+        elapsed = float("inf")
+        for _ in range(repeat):
+            with _gc_disabled():
+                started_at = time.perf_counter()
+                run_calls(calls)
+                elapsed = min(elapsed, time.perf_counter() - started_at)
+
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            run_calls(1)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    finally:
+        loop.close()
+
+    return {
+        "calls": calls,
+        "ops_per_sec": calls / elapsed,
+        "peak_bytes_per_op": max(0, peak - before),
+    }
+
+
+@contextmanager
+def _gc_disabled():
+    # like timeit, a collection triggered by garbage of an earlier run says
+    # nothing about the function which is measured
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+
+
+def _calibrate(func: Callable[[], object], min_time: float) -> int:
+    """Return the number of calls which take about min_time seconds."""
+    calls = 1
+    while True:
+        started_at = time.perf_counter()
+        for _ in range(calls):
+            func()
+        elapsed = time.perf_counter() - started_at
+        if elapsed >= min_time / 10:
+            return max(1, int(calls * min_time / elapsed))
+        calls *= 2
+
+
+def find_regressions(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+    compare_timings: bool = False,
+) -> list[str]:
+    """Return a description of every result that got worse than the threshold."""
+    regressions = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            expected = baseline.get(name, {}).get(metric)
+            if not _is_compared(metric, compare_timings) or expected is None:
+                continue
+            if "bytes" in metric:
+                change = (value - expected) / max(expected, MEMORY_FLOOR)
+            elif expected:
+                change = (value - expected) / expected
+            else:
+                # counts like duplicate requests are often zero, every
+                # increase of them is a regression
+                change = float("inf") if value > 0 else 0.0
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > threshold:
+                regressions.append(
+                    f"{name} {metric}: {value:.6g} (baseline {expected:.6g}, "
+                    f"{change:+.0%} worse)"
+                )
+    return regressions
+
+
+def _is_compared(metric: str, compare_timings: bool) -> bool:
+    return metric not in INFORMATIONAL and (compare_timings or metric not in TIMINGS)
+
+
+def print_results(results: dict[str, dict[str, float]]) -> None:
+    metrics = sorted({metric for values in results.values() for metric in values})
+    width = max(len(name) for name in results)
+    print(f"{'benchmark':<{width}}  " + "  ".join(f"{m:>18}" for m in metrics))
+    for name, values in results.items():
+        cells = [
+            f"{values[m]:>18.6g}" if m in values else f"{'-':>18}" for m in metrics
+        ]
+        print(f"{name:<{width}}  " + "  ".join(cells))
+
+
+def argument_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store the results as the new baseline instead of comparing them",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help="baseline file to compare with or save to, instead of the one "
+        "in tests/benchmarks/baselines",
+    )
+    parser.add_argument(
+        "--compare-timings",
+        action="store_true",
+        help="also save and compare the timings, which depend on the machine",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="relative change of a result that counts as a regression",
+    )
+    parser.add_argument(
+        "--output", type=Path, help="also write the results to this JSON file"
+    )
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="append the results and the current commit to the history",
+    )
+    return parser
+
+
+def _current_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def record(name: str, results: dict[str, dict[str, float]]) -> Path:
+    """Append the results to the history of a benchmark, one JSON line per run."""
+    HISTORY_DIR.mkdir(exist_ok=True)
+    path = HISTORY_DIR / f"{name}.jsonl"
+    line = {
+        "commit": _current_commit(),
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "results": results,
+    }
+    with path.open("a") as history:
+        history.write(json.dumps(line, sort_keys=True) + "\n")
+    return path
+
+
+def report(
+    name: str, results: dict[str, dict[str, float]], args: argparse.Namespace
+) -> int:
+    """Print the results, compare or save the baseline and return the exit code."""
+    print_results(results)
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+    if args.record:
+        print(f"Recorded results in {record(name, results)}")
+
+    baseline_path = args.baseline or BASELINE_DIR / f"{name}.json"
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline = {
+            benchmark: {
+                metric: value
+                for metric, value in metrics.items()
+                if _is_compared(metric, args.compare_timings)
+            }
+            for benchmark, metrics in results.items()
+        }
+        baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Saved baseline to {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}, run with --save-baseline first")
+        return 0
+
+    regressions = find_regressions(
+        results,
+        json.loads(baseline_path.read_text()),
+        args.threshold,
+        args.compare_timings,
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
@@ -0,0 +1,405 @@
+"""Simulated ETA terminal for tests and benchmarks.
+
+The simulator serves the parts of the ETA RESTful webservices API which are
+used by EtaAPI, with synthetic menus of any size. Latency, the number of
+requests the terminal works on at the same time and failures can be
+configured, so polling and discovery can be measured without a real boiler.
+
+    async with EtaTerminalSimulator(fubs=4, endpoints_per_fub=500) as terminal:
+        eta_client = EtaAPI(session, terminal.host, terminal.port)
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+import random
+from xml.sax.saxutils import quoteattr
+
+from aiohttp import web
+
+XML_HEADER = '<?xml version="1.0" encoding="utf-8"?>\n'
+ETA_OPEN = '<eta version="1.0" xmlns="http://www.eta.co.at/rest/v1">'
+ETA_CLOSE = "</eta>"
+
+FUB_NAMES = ["Kessel", "Puffer", "Lager", "Solar", "HK1", "HK2", "Warmwasser"]
+# Number of endpoints below every group object of the menu
+GROUP_SIZE = 10
+
+# Kinds of endpoints, in the order in which they are assigned to the menu
+FLOAT_SENSOR = "float"
+TEXT_SENSOR = "text"
+SWITCH = "switch"
+WRITABLE_SENSOR = "writable"
+TIME = "time"
+ENDPOINT_KINDS = [FLOAT_SENSOR, TEXT_SENSOR, SWITCH, WRITABLE_SENSOR, TIME]
+
+
+def eta_document(body: str) -> str:
+    """Wrap an element in the root element of every terminal response."""
+    return XML_HEADER + ETA_OPEN + body + ETA_CLOSE
+
+
+STATES = {"Aus": 2000, "Bereit": 2001, "Heizen": 2002}
+SWITCH_STATES = {"Aus": 1802, "Ein": 1803}
+
+
+class SimulatedEndpoint:
+    """A single variable of the simulated terminal."""
+
+    def __init__(self, uri: str, name: str, fub: str, kind: str, seed: int) -> None:
+        self.uri = uri
+        self.name = name
+        self.fub = fub
+        self.kind = kind
+        self.raw_value = self._initial_value(seed)
+
+    def _initial_value(self, seed: int) -> int:
+        if self.kind == FLOAT_SENSOR:
+            return 150 + seed % 600
+        if self.kind == TEXT_SENSOR:
+            return list(STATES.values())[seed % len(STATES)]
+        if self.kind == SWITCH:
+            return list(SWITCH_STATES.values())[seed % len(SWITCH_STATES)]
+        if self.kind == WRITABLE_SENSOR:
+            return 400 + seed % 300
+        return (seed * 15) % (24 * 60)
+
+    @property
+    def attributes(self) -> dict[str, str]:
+        if self.kind == FLOAT_SENSOR:
+            return {"unit": "kW", "decPlaces": "1", "scaleFactor": "10"}
+        if self.kind == WRITABLE_SENSOR:
+            return {"unit": "°C", "decPlaces": "1", "scaleFactor": "10"}
+        return {"unit": "", "decPlaces": "0", "scaleFactor": "1"}
+
+    @property
+    def str_value(self) -> str:
+        if self.kind in (FLOAT_SENSOR, WRITABLE_SENSOR):
+            return f"{self.raw_value / 10:.1f}".replace(".", ",")
+        if self.kind in (TEXT_SENSOR, SWITCH):
+            states = STATES if self.kind == TEXT_SENSOR else SWITCH_STATES
+            for state, value in states.items():
+                if value == self.raw_value:
+                    return state
+        if self.kind == TIME:
+            return f"{self.raw_value // 60:02d}:{self.raw_value % 60:02d}"
+        return str(self.raw_value)
+
+    def value_xml(self, tag: str = "value") -> str:
+        attributes = "".join(
+            f" {key}={quoteattr(value)}" for key, value in self.attributes.items()
+        )
+        return (
+            f"<{tag} uri={quoteattr('/user/var' + self.uri)}"
+            f" strValue={quoteattr(self.str_value)}{attributes}"
+            f' advTextOffset="0">{self.raw_value}</{tag}>'
+        )
+
+    def varinfo_xml(self) -> str:
+        attributes = "".join(
+            f" {key}={quoteattr(value)}" for key, value in self.attributes.items()
+        )
+        writable = self.kind in (SWITCH, WRITABLE_SENSOR, TIME)
+        if self.kind in (TEXT_SENSOR, SWITCH):
+            states = STATES if self.kind == TEXT_SENSOR else SWITCH_STATES
+            valid_values = "".join(
+                f"<value strValue={quoteattr(state)}>{value}</value>"
+                for state, value in states.items()
+            )
+            valid_values = f"<validValues>{valid_values}</validValues>"
+        elif self.kind == WRITABLE_SENSOR:
+            valid_values = (
+                '<validValues><min strValue="20,0" unit="°C">200</min>'
+                '<max strValue="90,0" unit="°C">900</max></validValues>'
+            )
+        elif self.kind == TIME:
+            valid_values = (
+                '<validValues><min strValue="00:00" unit="">0</min>'
+                '<max strValue="23:59" unit="">1439</max></validValues>'
+            )
+        else:
+            valid_values = ""
+        return (
+            f"<varInfo uri={quoteattr('/user/varinfo' + self.uri)}>"
+            f"<variable uri={quoteattr(self.uri)} name={quoteattr(self.name)}"
+            f" fullName={quoteattr(self.fub + ' > ' + self.name)}{attributes}"
+            f' advTextOffset="0" isWritable="{int(writable)}">'
+            f"<type>{'TEXT' if self.kind == TEXT_SENSOR else 'DEFAULT'}</type>"
+            f"{valid_values}</variable></varInfo>"
+        )
+
+
+class EtaTerminalSimulator:
+    """aiohttp server which behaves like an ETA terminal.
+
+    fubs * endpoints_per_fub endpoints are generated, grouped below group
+    objects of GROUP_SIZE endpoints each, and cycle through all endpoint
+    kinds. Every request waits latency seconds (plus up to latency_jitter
+    seconds) while it holds one of max_concurrency slots, so requests beyond
+    the limit queue up like on the real terminal. A request fails with a 500
+    response with a probability of failure_rate, and requests for the URIs
+    in failing_uris always fail. With api_version "1.1" the terminal has no
+    /user/varinfo endpoint.
+    """
+
+    def __init__(
+        self,
+        fubs: int = 4,
+        endpoints_per_fub: int = 250,
+        api_version: str = "1.2",
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        max_concurrency: int | None = None,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.api_version = api_version
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.failure_rate = failure_rate
+        self.failing_uris: set[str] = set()
+        self.errors: list[dict] = []
+        self.endpoints: dict[str, SimulatedEndpoint] = {}
+        self.requests: Counter[str] = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.host = "127.0.0.1"
+        self.port: int | None = None
+
+        self._random = random.Random(seed)
+        self._slots = (
+            asyncio.Semaphore(max_concurrency) if max_concurrency is not None else None
+        )
+        self._varsets: dict[str, list[str]] = {}
+        self._runner: web.AppRunner | None = None
+        self.menu_xml = self._build_menu(fubs, endpoints_per_fub)
+
+    def _build_menu(self, fubs: int, endpoints_per_fub: int) -> str:
+        menu = []
+        for fub_index in range(fubs):
+            fub_name = (
+                FUB_NAMES[fub_index]
+                if fub_index < len(FUB_NAMES)
+                else f"Fub {fub_index + 1}"
+            )
+            fub_uri = f"/{40 + fub_index}/10021"
+            menu.append(f"<fub uri={quoteattr(fub_uri)} name={quoteattr(fub_name)}>")
+            for group_start in range(0, endpoints_per_fub, GROUP_SIZE):
+                group = self._add_endpoint(fub_uri, fub_name, group_start)
+                menu.append(
+                    f"<object uri={quoteattr(group.uri)} name={quoteattr(group.name)}>"
+                )
+                last = min(group_start + GROUP_SIZE, endpoints_per_fub)
+                for index in range(group_start + 1, last):
+                    endpoint = self._add_endpoint(fub_uri, fub_name, index)
+                    menu.append(
+                        f"<object uri={quoteattr(endpoint.uri)}"
+                        f" name={quoteattr(endpoint.name)}/>"
+                    )
+                menu.append("</object>")
+            menu.append("</fub>")
+        return f'<menu uri="/user/menu">{"".join(menu)}</menu>'
+
+    def _add_endpoint(self, fub_uri: str, fub_name: str, index: int):
+        kind = ENDPOINT_KINDS[index % len(ENDPOINT_KINDS)]
+        endpoint = SimulatedEndpoint(
+            f"{fub_uri}/0/0/{12000 + index}",
+            f"{kind.capitalize()} {index}",
+            fub_name,
+            kind,
+            self._random.randrange(10000),
+        )
+        self.endpoints[endpoint.uri] = endpoint
+        return endpoint
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def uris_of_kind(self, kind: str) -> list[str]:
+        return [
+            uri for uri, endpoint in self.endpoints.items() if endpoint.kind == kind
+        ]
+
+    def add_error(
+        self,
+        fub: str,
+        msg: str,
+        priority: str = "Error",
+        time: str = "2024-01-01 12:00:00",
+        text: str = "",
+    ) -> None:
+        self.errors.append(
+            {"fub": fub, "msg": msg, "priority": priority, "time": time, "text": text}
+        )
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/user/api", self._handle_api)
+        app.router.add_get("/user/menu", self._handle_menu)
+        app.router.add_get("/user/errors", self._handle_errors)
+        app.router.add_get("/user/var/{uri:.+}", self._handle_var)
+        app.router.add_post("/user/var/{uri:.+}", self._handle_write)
+        app.router.add_get("/user/varinfo/{uri:.+}", self._handle_varinfo)
+        app.router.add_get("/user/vars", self._handle_varsets)
+        app.router.add_get("/user/vars/{name}", self._handle_get_varset)
+        app.router.add_put("/user/vars/{name}", self._handle_put_varset)
+        app.router.add_delete("/user/vars/{name}", self._handle_delete_varset)
+        app.router.add_put("/user/vars/{name}/{uri:.+}", self._handle_put_var)
+        app.middlewares.append(self._terminal_middleware)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> EtaTerminalSimulator:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    @web.middleware
+    async def _terminal_middleware(self, request: web.Request, handler):
+        self.requests[request.path] += 1
+        if self._slots is not None:
+            await self._slots.acquire()
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            delay = self.latency + self._random.random() * self.latency_jitter
+            if delay:
+                await asyncio.sleep(delay)
+            if (
+                self._random.random() < self.failure_rate
+                or self._request_uri(request) in self.failing_uris
+            ):
+                return web.Response(status=500, text="simulated failure")
+            return await handler(request)
+        finally:
+            self.in_flight -= 1
+            if self._slots is not None:
+                self._slots.release()
+
+    @staticmethod
+    def _xml_response(body: str, status: int = 200) -> web.Response:
+        return web.Response(
+            status=status,
+            text=eta_document(body),
+            content_type="application/xml",
+        )
+
+    def _error_response(self, message: str, status: int = 404) -> web.Response:
+        return self._xml_response(f"<error>{message}</error>", status)
+
+    @staticmethod
+    def _request_uri(request: web.Request) -> str | None:
+        # EtaAPI appends menu URIs with a leading slash, e.g. /user/var//40/...
+        uri = request.match_info.get("uri")
+        return "/" + uri.lstrip("/") if uri is not None else None
+
+    def _get_endpoint(self, request: web.Request) -> SimulatedEndpoint | None:
+        return self.endpoints.get(self._request_uri(request))
+
+    async def _handle_api(self, request: web.Request) -> web.Response:
+        return self._xml_response(
+            f'<api version="{self.api_version}" uri="/user/api"/>'
+        )
+
+    async def _handle_menu(self, request: web.Request) -> web.Response:
+        return self._xml_response(self.menu_xml)
+
+    async def _handle_errors(self, request: web.Request) -> web.Response:
+        return self._xml_response(self.errors_xml())
+
+    def errors_xml(self) -> str:
+        fubs: dict[str, list[str]] = {}
+        for error in self.errors:
+            fubs.setdefault(error["fub"], []).append(
+                f"<error msg={quoteattr(error['msg'])}"
+                f" priority={quoteattr(error['priority'])}"
+                f" time={quoteattr(error['time'])}>{error['text']}</error>"
+            )
+        body = "".join(
+            f"<fub uri=\"/40/10021\" name={quoteattr(fub)}>{''.join(errors)}</fub>"
+            for fub, errors in fubs.items()
+        )
+        return f'<errors uri="/user/errors">{body}</errors>'
+
+    async def _handle_var(self, request: web.Request) -> web.Response:
+        endpoint = self._get_endpoint(request)
+        if endpoint is None:
+            return self._error_response("Invalid URI")
+        return self._xml_response(endpoint.value_xml())
+
+    async def _handle_write(self, request: web.Request) -> web.Response:
+        endpoint = self._get_endpoint(request)
+        if endpoint is None:
+            return self._error_response("Invalid URI")
+        data = await request.post()
+        try:
+            endpoint.raw_value = int(data["value"])
+        except (KeyError, ValueError):
+            return self._error_response("Invalid value", 400)
+        return self._xml_response(
+            f"<success uri={quoteattr('/user/var' + endpoint.uri)}/>"
+        )
+
+    async def _handle_varinfo(self, request: web.Request) -> web.Response:
+        if self.api_version == "1.1":
+            # /user/varinfo was added in API v1.2
+            return web.Response(status=404, text="Not Found")
+        endpoint = self._get_endpoint(request)
+        if endpoint is None:
+            return self._error_response("Invalid URI")
+        return self._xml_response(endpoint.varinfo_xml())
+
+    async def _handle_varsets(self, request: web.Request) -> web.Response:
+        varsets = "".join(
+            f"<variableset uri={quoteattr('/user/vars/' + name)}/>"
+            for name in self._varsets
+        )
+        return self._xml_response(f'<vars uri="/user/vars">{varsets}</vars>')
+
+    async def _handle_get_varset(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        if name not in self._varsets:
+            return self._error_response("Invalid variable set")
+        variables = "".join(
+            self.endpoints[uri].value_xml("variable") for uri in self._varsets[name]
+        )
+        return self._xml_response(
+            f"<vars uri={quoteattr('/user/vars/' + name)}>{variables}</vars>"
+        )
+
+    async def _handle_put_varset(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        self._varsets.setdefault(name, [])
+        return self._xml_response(
+            f"<success uri={quoteattr('/user/vars/' + name)}/>", 201
+        )
+
+    async def _handle_delete_varset(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        if self._varsets.pop(name, None) is None:
+            return self._error_response("Invalid variable set")
+        return self._xml_response(f"<success uri={quoteattr('/user/vars/' + name)}/>")
+
+    async def _handle_put_var(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        endpoint = self._get_endpoint(request)
+        if name not in self._varsets or endpoint is None:
+            return self._error_response("Invalid variable set or URI")
+        if endpoint.uri not in self._varsets[name]:
+            self._varsets[name].append(endpoint.uri)
+        return self._xml_response(
+            f"<success uri={quoteattr('/user/vars/' + name + endpoint.uri)}/>", 201
+        )
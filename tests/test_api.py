@@ -1,6 +1,9 @@
 import asyncio
+import gc
 from unittest.mock import MagicMock
+from custom_components.eta_webservices import api
 from custom_components.eta_webservices.api import EtaAPI
+from custom_components.eta_webservices.scheduler import get_scheduler
 
 
 import pytest
@@ -91,6 +94,7 @@ async def test_get_data():
     xml_string = '<eta><value uri="/user/var/123/456/789" strValue="25.5 °C" unit="°C" decPlaces="1" scaleFactor="10" advTextOffset="0">255</value></eta>'
     mock_session = MagicMock()
     mock_response = MagicMock()
+    mock_response.status = 200
     mock_response.text = AsyncMock(return_value=xml_string)
     mock_session.get = AsyncMock(return_value=mock_response)
 
@@ -112,6 +116,7 @@ async def test_does_endpoint_exists_success():
     mock_session = MagicMock()
     mock_response = MagicMock()
     mock_response.status = 200
+    mock_response.text = AsyncMock(return_value="")
     mock_session.get = AsyncMock(return_value=mock_response)
 
     api = EtaAPI(mock_session, "testhost", "8080")
@@ -131,6 +136,7 @@ async def test_does_endpoint_exists_fail():
     mock_session = MagicMock()
     mock_response = MagicMock()
     mock_response.status = 404
+    mock_response.text = AsyncMock(return_value="")
     mock_session.get = AsyncMock(return_value=mock_response)
 
     api = EtaAPI(mock_session, "testhost", "8080")
@@ -157,6 +163,7 @@ async def test_get_api_version(xml_string, expected_version):
     # Given
     mock_session = MagicMock()
     mock_response = MagicMock()
+    mock_response.status = 200
     mock_response.text = AsyncMock(return_value=xml_string)
     mock_session.get = AsyncMock(return_value=mock_response)
 
@@ -346,3 +353,370 @@ def test_classify_entity(endpoint_info, expected_type):
     """Test the classify_entity method."""
     api = EtaAPI(MagicMock(), "host", "8080")
     assert api.classify_entity(endpoint_info) == expected_type
+
+
+VARINFO_XML = (
+    '<eta><varInfo uri="/user/varinfo/40/10021/0/11109/0">'
+    '<variable uri="40/10021/0/11109/0" name="Leistung" '
+    'fullName="Kessel > Leistung" unit="kW" '
+    'decPlaces="0" scaleFactor="10" advTextOffset="0" isWritable="0">'
+    "<type>DEFAULT</type></variable></varInfo></eta>"
+)
+
+
+def _mock_session_for(responses):
+    """Return a mock session answering GETs from a suffix -> body mapping."""
+
+    async def get(url):
+        for suffix, body in responses.items():
+            if url.endswith(suffix):
+                response = MagicMock()
+                response.status = 200
+                response.text = AsyncMock(return_value=body)
+                return response
+        raise AssertionError(f"Unexpected request {url}")
+
+    session = MagicMock()
+    session.get = AsyncMock(side_effect=get)
+    return session
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "include_value, expected_value, expected_requests",
+    [
+        (True, 25.0, ["/user/api", "/user/varinfo/", "/user/var/"]),
+        (False, None, ["/user/api", "/user/varinfo/"]),
+    ],
+)
+async def test_get_entity_metadata_v12_include_value(
+    include_value, expected_value, expected_requests
+):
+    """Discovery without values needs only the varinfo request per endpoint."""
+    # Given
+    uri = "40/10021/0/11109/0"
+    session = _mock_session_for(
+        {
+            "/user/api": '<eta><api version="1.2" /></eta>',
+            f"/user/varinfo/{uri}": VARINFO_XML,
+            f"/user/var/{uri}": (
+                '<eta><value uri="/user/var/40/10021/0/11109/0" strValue="25" '
+                'unit="kW" decPlaces="0" scaleFactor="10" advTextOffset="0">250'
+                "</value></eta>"
+            ),
+        }
+    )
+    api = EtaAPI(session, "testhost", "8080")
+
+    # When
+    metadata = await api.async_get_entity_metadata(uri, include_value=include_value)
+    await api.async_get_entity_metadata(uri, include_value=include_value)
+
+    # Then
+    assert metadata["value"] == expected_value
+    assert api.classify_entity(metadata) == "sensor"
+    requested = [call.args[0] for call in session.get.call_args_list]
+    # The API version is only queried once per client
+    assert sum(url.endswith("/user/api") for url in requested) == 1
+    assert len(requested) == 1 + 2 * (len(expected_requests) - 1)
+
+
+MENU_STRUCTURE = {
+    "name": "Kessel",
+    "uri": "/120/10101",
+    "children": [
+        {
+            "name": "Temperaturen",
+            "uri": "/120/10101/0/11109",
+            "children": [
+                {"name": "Kessel", "uri": "/120/10101/0/11109/0", "children": []},
+                {"name": "Abgas", "uri": "/120/10101/0/11110/0", "children": []},
+            ],
+        },
+        {
+            "name": "Zähler",
+            "uri": "/120/10101/0/11111",
+            "children": [
+                {"name": "Verbrauch", "uri": "/120/10101/0/11111/0", "children": []},
+            ],
+        },
+    ],
+}
+
+
+@pytest.mark.parametrize(
+    "include_paths, exclude_paths, expected_uris",
+    [
+        (
+            None,
+            None,
+            [
+                "/120/10101",
+                "/120/10101/0/11109",
+                "/120/10101/0/11109/0",
+                "/120/10101/0/11110/0",
+                "/120/10101/0/11111",
+                "/120/10101/0/11111/0",
+            ],
+        ),
+        (
+            ["Kessel > Temperaturen"],
+            None,
+            ["/120/10101/0/11109", "/120/10101/0/11109/0", "/120/10101/0/11110/0"],
+        ),
+        (
+            None,
+            ["Kessel > Temperaturen"],
+            ["/120/10101", "/120/10101/0/11111", "/120/10101/0/11111/0"],
+        ),
+        (
+            ["Kessel"],
+            ["Kessel > Temperaturen > Abgas", "Kessel > Zähler"],
+            ["/120/10101", "/120/10101/0/11109", "/120/10101/0/11109/0"],
+        ),
+        (["Puffer"], None, []),
+    ],
+)
+def test_filter_entity_structure(include_paths, exclude_paths, expected_uris):
+    """Test restricting a menu structure to selected subtrees."""
+    api = EtaAPI(MagicMock(), "host", "8080")
+
+    filtered = api.filter_entity_structure(MENU_STRUCTURE, include_paths, exclude_paths)
+
+    assert api.get_endpoint_uris(filtered) == expected_uris
+
+
+def test_get_subtree_paths():
+    """Test listing the selectable subtrees of a menu structure."""
+    assert EtaAPI.get_subtree_paths(MENU_STRUCTURE) == [
+        "Kessel",
+        "Kessel > Temperaturen",
+        "Kessel > Zähler",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_gets_are_coalesced():
+    """Concurrent reads of the same path share a single request."""
+    # Given
+    uri = "120/10101/0/11109/0"
+    release = asyncio.Event()
+    mock_response = MagicMock()
+    mock_response.status = 200
+    mock_response.text = AsyncMock(
+        return_value=(
+            '<eta><value uri="/user/var/120/10101/0/11109/0" strValue="25" '
+            'unit="kW" decPlaces="0" scaleFactor="10" advTextOffset="0">250</value></eta>'
+        )
+    )
+
+    async def get(url):
+        await release.wait()
+        return mock_response
+
+    mock_session = MagicMock()
+    mock_session.get = AsyncMock(side_effect=get)
+    api = EtaAPI(mock_session, "coalescehost", "8080")
+
+    # When
+    tasks = [asyncio.create_task(api.get_data(uri)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    tasks[0].cancel()
+    release.set()
+    results = await asyncio.gather(*tasks[1:])
+
+    # Then
+    assert results == [(25.0, "kW"), (25.0, "kW")]
+    mock_session.get.assert_called_once_with(f"http://coalescehost:8080/user/var/{uri}")
+
+
+@pytest.mark.asyncio
+async def test_failure_of_a_request_without_waiters_is_retrieved():
+    """A request whose only caller was cancelled does not log an unretrieved error."""
+    # Given
+    release = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    unhandled = []
+    previous_handler = loop.get_exception_handler()
+    loop.set_exception_handler(lambda _, context: unhandled.append(context))
+
+    async def get(url):
+        await release.wait()
+        raise ValueError("broken response")
+
+    mock_session = MagicMock()
+    mock_session.get = AsyncMock(side_effect=get)
+    api = EtaAPI(mock_session, "orphanhost", "8080")
+
+    # When
+    try:
+        caller = asyncio.create_task(api.get_menu())
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        release.set()
+        await asyncio.sleep(0.01)
+        del caller
+        gc.collect()
+    finally:
+        loop.set_exception_handler(previous_handler)
+
+    # Then
+    mock_session.get.assert_called_once()
+    assert unhandled == []
+
+
+@pytest.mark.asyncio
+async def test_menu_is_reused_within_ttl():
+    """Sequential menu reads within the TTL are served from the short-lived cache."""
+    # Given
+    mock_response = MagicMock()
+    mock_response.status = 200
+    mock_response.text = AsyncMock(
+        return_value='<eta><menu><fub name="Kessel" uri="/120/10101"/></menu></eta>'
+    )
+    mock_session = MagicMock()
+    mock_session.get = AsyncMock(return_value=mock_response)
+
+    # When
+    first = await EtaAPI(mock_session, "ttlhost", "8080").get_menu()
+    second = await EtaAPI(mock_session, "ttlhost", "8080").get_menu()
+
+    # Then
+    assert first == second
+    mock_session.get.assert_called_once_with("http://ttlhost:8080/user/menu")
+
+
+def _menu_session(*menus):
+    responses = []
+    for menu in menus:
+        response = MagicMock()
+        response.status = 200
+        response.text = AsyncMock(return_value=menu)
+        responses.append(response)
+    session = MagicMock()
+    session.get = AsyncMock(side_effect=responses)
+    return session
+
+
+@pytest.mark.asyncio
+async def test_entity_structures_share_one_menu_fetch():
+    """The parsed menu is shared by the structures of all devices."""
+    # Given
+    menu = (
+        '<eta><menu><fub name="Kessel" uri="/120/10101"/>'
+        '<fub name="Lager" uri="/120/10201"/></menu></eta>'
+    )
+    session = _menu_session(menu)
+
+    # When
+    kessel = await EtaAPI(session, "menuhost", "8080").get_entity_structure("Kessel")
+    lager = await EtaAPI(session, "menuhost", "8080").get_entity_structure("Lager")
+
+    # Then
+    assert kessel["uri"] == "/120/10101"
+    assert lager["uri"] == "/120/10201"
+    session.get.assert_called_once_with("http://menuhost:8080/user/menu")
+
+
+@pytest.mark.asyncio
+async def test_menu_cache_invalidation():
+    """An explicit invalidation or force_refresh fetches the menu again."""
+    # Given
+    menu = '<eta><menu><fub name="Kessel" uri="/120/10101"/></menu></eta>'
+    session = _menu_session(menu, menu, menu)
+    eta_client = EtaAPI(session, "invalidatehost", "8080")
+    await eta_client.get_menu()
+
+    # When
+    eta_client.invalidate_menu_cache()
+    await eta_client.get_menu()
+    await eta_client.get_menu(force_refresh=True)
+
+    # Then
+    assert session.get.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_menu_cache_dropped_on_api_version_change():
+    """A changed API version invalidates the cached menu."""
+    # Given
+    old_menu = '<eta><menu><fub name="Kessel" uri="/120/10101"/></menu></eta>'
+    new_menu = '<eta><menu><fub name="Puffer" uri="/120/10301"/></menu></eta>'
+    responses = {
+        "/user/menu": [old_menu, new_menu],
+        "/user/api": ['<eta><api version="1.2"/></eta>'],
+    }
+
+    async def get(uri):
+        suffix = uri.split("8080", 1)[1]
+        response = MagicMock()
+        response.status = 200
+        response.text = AsyncMock(return_value=responses[suffix].pop(0))
+        return response
+
+    session = MagicMock()
+    session.get = AsyncMock(side_effect=get)
+    eta_client = EtaAPI(session, "versionhost", "8080")
+    await eta_client.get_api_version()
+    await eta_client.get_menu()
+
+    # When
+    api._RESPONSE_CACHE.clear()
+    responses["/user/api"].append('<eta><api version="1.3"/></eta>')
+    await eta_client.get_api_version()
+    structures = await eta_client.get_entity_structures()
+
+    # Then
+    assert list(structures) == ["Puffer"]
+
+
+@pytest.mark.asyncio
+async def test_get_errors_of_all_fubs():
+    """Errors of every fub are returned, not only those of the last one."""
+    # Given
+    errors_xml = (
+        "<eta><errors>"
+        '<fub uri="/112/10021" name="Kessel">'
+        '<error msg="Flue gas sensor" priority="Error" time="2024-01-01 10:00:00">'
+        "Check the sensor</error></fub>"
+        '<fub uri="/112/10101" name="HK1">'
+        '<error msg="Flow sensor" priority="Warning" time="2024-01-01 11:00:00">'
+        "Check the wiring</error></fub>"
+        "</errors></eta>"
+    )
+    eta_client = EtaAPI(
+        _mock_session_for({"/user/errors": errors_xml}), "errorhost", "8080"
+    )
+
+    # When
+    errors = await eta_client.get_errors()
+
+    # Then
+    assert [(error["fub"], error["msg"]) for error in errors] == [
+        ("Kessel", "Flue gas sensor"),
+        ("HK1", "Flow sensor"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_slow_body_is_covered_by_the_request_timeout():
+    """Test that the body is read within the timeout and the scheduler slot."""
+    # Given
+    mock_response = MagicMock()
+    mock_response.status = 200
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    mock_response.text = AsyncMock(side_effect=hang)
+    mock_session = MagicMock()
+    mock_session.get = AsyncMock(return_value=mock_response)
+    eta_client = EtaAPI(mock_session, "slowbodyhost", "8080", request_timeout=0.05)
+    scheduler = get_scheduler("slowbodyhost", 8080)
+
+    # When
+    with pytest.raises(TimeoutError):
+        await eta_client.get_data("/40/10021/0/0/12000")
+
+    # Then
+    assert scheduler.active_requests == 0
@@ -0,0 +1,128 @@
+import sys
+
+import pytest
+
+from .benchmarks.bench_entities import async_run_benchmarks as run_entities
+from .benchmarks.bench_parsers import run_benchmarks
+from .benchmarks.bench_polling import async_run_benchmarks
+from .benchmarks.bench_replay import async_record_simulator
+from .benchmarks.bench_replay import async_run_benchmarks as run_replay
+from .benchmarks.harness import find_regressions
+
+
+def test_find_regressions_compares_only_machine_independent_metrics():
+    """Test that only requests and memory beyond the threshold are regressions."""
+    # Given
+    baseline = {
+        "parse": {"calls": 100, "ops_per_sec": 1000.0, "peak_bytes_per_op": 100},
+        "poll": {"requests": 10, "wall_time": 0.1},
+        "scan": {"duplicate_uris": 0, "requests_var": 0},
+    }
+    results = {
+        "parse": {"calls": 10, "ops_per_sec": 100.0, "peak_bytes_per_op": 120},
+        "poll": {"requests": 20, "wall_time": 1.0},
+        "scan": {"duplicate_uris": 3, "requests_var": 0},
+        "new": {"requests": 1},
+    }
+
+    # When
+    regressions = find_regressions(results, baseline, threshold=0.25)
+
+    # Then
+    assert len(regressions) == 2
+    assert regressions[0].startswith("poll requests")
+    assert regressions[1].startswith("scan duplicate_uris")
+
+
+def test_find_regressions_compares_timings_on_request():
+    """Test that timings are compared in their direction with compare_timings."""
+    # Given
+    baseline = {
+        "parse": {"ops_per_sec": 1000.0, "peak_bytes_per_op": 0},
+        "poll": {"wall_time": 0.1, "peak_bytes": 10_000},
+    }
+    results = {
+        "parse": {"ops_per_sec": 700.0, "peak_bytes_per_op": 72},
+        "poll": {"wall_time": 0.08, "peak_bytes": 20_000},
+    }
+
+    # When
+    regressions = find_regressions(
+        results, baseline, threshold=0.25, compare_timings=True
+    )
+
+    # Then
+    # a few bytes more than a baseline of zero are below the memory floor
+    assert len(regressions) == 2
+    assert regressions[0].startswith("parse ops_per_sec")
+    assert regressions[1].startswith("poll peak_bytes")
+
+
+def test_parser_benchmarks_run_on_the_corpus():
+    """Test that every parser benchmark runs and measures something."""
+    # When
+    results = run_benchmarks(min_time=0.001, repeat=1)
+
+    # Then
+    assert "_parse_menu_node[large]" in results
+    assert "get_data[float]" in results
+    assert all(result["ops_per_sec"] > 0 for result in results.values())
+
+
+@pytest.mark.asyncio
+async def test_polling_strategies_read_every_value():
+    """Test that every poll strategy reads all values of the terminal."""
+    # When
+    results = await async_run_benchmarks(sizes=[20], latency=0.0)
+
+    # Then
+    assert set(results) == {"sequential[20]", "parallel[20]", "bulk[20]"}
+    assert results["sequential[20]"]["requests"] == 20
+    assert results["bulk[20]"]["requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_replay_benchmark_discovers_and_polls_a_recording(tmp_path):
+    """Test that the replayed discovery and poll cycle use the recorded responses."""
+    # Given
+    archive = tmp_path / "simulator.json.gz"
+    await async_record_simulator(archive, cycles=1, endpoints_per_fub=10)
+
+    # When
+    results = await run_replay(archive, latency_scale=0, cycles=2)
+
+    # Then
+    # the discovery also asks for the API version and the menu
+    assert results["poll"]["requests"] == results["discovery"]["requests"] - 2
+
+
+@pytest.mark.asyncio
+async def test_entity_benchmark_sets_up_every_platform():
+    """Test that every platform creates entities and all of them get an update."""
+    # When
+    results = await run_entities(sizes=[50], repeat=1)
+
+    # Then
+    setups = [
+        results[f"setup[{name},50]"] for name in ("sensor", "switch", "number", "time")
+    ]
+    assert all(setup["entities"] > 0 for setup in setups)
+    assert results["fan_out[50]"]["entities"] == sum(s["entities"] for s in setups)
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="config flow needs 3.12")
+async def test_discovery_paths_find_the_same_endpoints_warm_and_cold():
+    """Test that a warm discovery finds the cold entities with less requests."""
+    # Given
+    from .benchmarks.bench_discovery import async_run_benchmarks as run_discovery
+
+    # When
+    results = await run_discovery(sizes=[20], latency=0.0)
+
+    # Then
+    for path in ("config_flow", "coordinator"):
+        cold, warm = results[f"{path}[20,cold]"], results[f"{path}[20,warm]"]
+        assert cold["entities"] == warm["entities"] > 0
+        assert warm["requests_varinfo"] < cold["requests_varinfo"]
+        assert cold["duplicate_uris"] == 0
@@ -0,0 +1,177 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from aiohttp import ClientConnectionError
+import pytest
+
+from custom_components.eta_webservices.api import EtaAPI
+from custom_components.eta_webservices.circuit_breaker import (
+    FAILURE_THRESHOLD,
+    CircuitState,
+    EtaCircuitBreaker,
+    EtaTerminalUnavailableError,
+)
+from custom_components.eta_webservices.scheduler import (
+    EtaRequestScheduler,
+    set_scheduler,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_opens_after_consecutive_failures():
+    """Test that the circuit opens after the threshold and rejects requests."""
+    # Given
+    breaker = EtaCircuitBreaker(failure_threshold=3, clock=FakeClock())
+
+    # When
+    for _ in range(3):
+        breaker.before_request()
+        breaker.record_failure()
+
+    # Then
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(EtaTerminalUnavailableError):
+        breaker.before_request()
+    assert breaker.rejected_requests == 1
+
+
+def test_success_resets_failure_count():
+    """Test that a success in between keeps the circuit closed."""
+    breaker = EtaCircuitBreaker(failure_threshold=3, clock=FakeClock())
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_single_probe_with_exponential_backoff():
+    """Test that only one probe is sent after the backoff, doubling it on failure."""
+    # Given
+    clock = FakeClock()
+    breaker = EtaCircuitBreaker(
+        failure_threshold=1, base_backoff=30, max_backoff=100, clock=clock
+    )
+    breaker.record_failure()
+
+    # When the backoff has not elapsed yet
+    clock.now += 29
+    with pytest.raises(EtaTerminalUnavailableError):
+        breaker.before_request()
+
+    # When the backoff has elapsed, one probe is allowed
+    clock.now += 1
+    breaker.before_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+    with pytest.raises(EtaTerminalUnavailableError):
+        breaker.before_request()
+
+    # When the probe fails, the backoff doubles up to the maximum
+    breaker.record_failure()
+    assert (breaker.state, breaker.backoff) == (CircuitState.OPEN, 60)
+    clock.now += 60
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.backoff == 100
+
+    # When the next probe succeeds, the circuit closes
+    clock.now += 100
+    breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.before_request()
+
+
+def test_aborted_probe_allows_next_probe():
+    """Test that a cancelled probe does not block the circuit forever."""
+    clock = FakeClock()
+    breaker = EtaCircuitBreaker(failure_threshold=1, base_backoff=30, clock=clock)
+    breaker.record_failure()
+    clock.now += 30
+
+    probe = breaker.before_request()
+    breaker.record_aborted(probe)
+
+    breaker.before_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+
+
+def test_aborted_request_which_is_no_probe_keeps_the_probe():
+    """Test that a cancelled ordinary request does not allow a second probe."""
+    # Given
+    clock = FakeClock()
+    breaker = EtaCircuitBreaker(failure_threshold=1, base_backoff=30, clock=clock)
+    request = breaker.before_request()
+    breaker.record_failure()
+    clock.now += 30
+    probe = breaker.before_request()
+
+    # When
+    breaker.record_aborted(request)
+
+    # Then
+    assert request is None and probe is not None
+    with pytest.raises(EtaTerminalUnavailableError):
+        breaker.before_request()
+
+
+@pytest.mark.asyncio
+async def test_api_fails_fast_while_open():
+    """Test that EtaAPI stops contacting an unreachable terminal."""
+    # Given
+    mock_session = MagicMock()
+    mock_session.get = AsyncMock(side_effect=ClientConnectionError())
+    api = EtaAPI(mock_session, "unreachablehost", "8080")
+
+    # When
+    for _ in range(5):
+        with pytest.raises(ClientConnectionError):
+            await api.does_endpoint_exists()
+
+    # Then
+    with pytest.raises(EtaTerminalUnavailableError):
+        await api.does_endpoint_exists()
+    assert mock_session.get.call_count == 5
+
+
+@pytest.mark.asyncio
+async def test_queued_requests_fail_fast_once_open():
+    """Test that gathered reads stop reaching a hanging terminal at the threshold."""
+
+    # Given
+    async def hang(url):
+        await asyncio.sleep(10)
+
+    mock_session = MagicMock()
+    mock_session.get = AsyncMock(side_effect=hang)
+    set_scheduler(
+        "hanginghost",
+        8080,
+        EtaRequestScheduler(max_concurrency=5, requests_per_second=None),
+    )
+    api = EtaAPI(mock_session, "hanginghost", "8080", request_timeout=0.1)
+
+    # When
+    results = await asyncio.gather(
+        *(api.get_data(f"/40/10021/0/0/{index}") for index in range(50)),
+        return_exceptions=True,
+    )
+
+    # Then
+    assert mock_session.get.call_count == FAILURE_THRESHOLD
+    assert (
+        sum(isinstance(result, TimeoutError) for result in results) == FAILURE_THRESHOLD
+    )
+    assert all(
+        isinstance(result, EtaTerminalUnavailableError)
+        for result in results[FAILURE_THRESHOLD:]
+    )
@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+import subprocess
+import sys
+
+from custom_components.eta_webservices.__main__ import main
+from custom_components.eta_webservices.transport import EtaReplayTransport
+
+from .benchmarks.harness import SimulatorThread
+from .simulator import FLOAT_SENSOR, TIME, WRITABLE_SENSOR, EtaTerminalSimulator
+
+REPOSITORY = Path(__file__).parent.parent
+
+
+def test_discover_runs_without_home_assistant():
+    """Test that the command line tool works if Home Assistant is not installed."""
+    # Given
+    terminal = EtaTerminalSimulator(fubs=2, endpoints_per_fub=10)
+    script = (
+        "import sys\n"
+        "sys.modules['homeassistant'] = None\n"
+        "from custom_components.eta_webservices.__main__ import main\n"
+        "sys.exit(main(sys.argv[1:]))\n"
+    )
+
+    # When
+    with SimulatorThread(terminal):
+        result = subprocess.run(
+            [sys.executable, "-c", script, "--port", str(terminal.port)]
+            + ["discover", terminal.host],
+            capture_output=True,
+            check=False,
+            cwd=REPOSITORY,
+            text=True,
+        )
+
+    # Then
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.splitlines() == [
+        "API version 1.2",
+        "Kessel: 11 endpoints",
+        "Puffer: 11 endpoints",
+    ]
+
+
+def test_dump_writes_the_catalog_and_records_the_requests(tmp_path):
+    """Test that dump classifies the endpoints and --record saves the traffic."""
+    # Given
+    terminal = EtaTerminalSimulator(fubs=1, endpoints_per_fub=10)
+    catalog_path = tmp_path / "catalog.json"
+    archive = tmp_path / "terminal.json.gz"
+
+    # When
+    with SimulatorThread(terminal):
+        exit_code = main(
+            ["--port", str(terminal.port), "--record", str(archive)]
+            + ["dump", terminal.host, "--output", str(catalog_path)]
+        )
+
+    # Then
+    assert exit_code == 0
+    catalog = json.loads(catalog_path.read_text())["Kessel"]
+    assert set(catalog["FLOAT_DICT"]) == set(terminal.uris_of_kind(FLOAT_SENSOR))
+    assert set(catalog["WRITABLE_DICT"]) == set(
+        terminal.uris_of_kind(WRITABLE_SENSOR) + terminal.uris_of_kind(TIME)
+    )
+    # the API version, the menu and every endpoint of the device
+    assert len(EtaReplayTransport.load(archive).paths) == 2 + 11
+
+
+def test_probe_finds_the_concurrency_of_the_terminal(capsys):
+    """Test that probe stops doubling the concurrency once the terminal queues."""
+    # Given
+    terminal = EtaTerminalSimulator(
+        fubs=1, endpoints_per_fub=50, latency=0.02, max_concurrency=4
+    )
+
+    # When
+    with SimulatorThread(terminal):
+        exit_code = main(["--port", str(terminal.port), "probe", terminal.host])
+
+    # Then
+    assert exit_code == 0
+    assert capsys.readouterr().out.splitlines()[-1] == "Maximum safe concurrency: 4"
@@ -0,0 +1,195 @@
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+if sys.version_info < (3, 12):
+    pytest.skip("config flow needs 3.12", allow_module_level=True)
+
+from homeassistant.const import CONF_HOST, CONF_PORT
+
+from custom_components.eta_webservices.config_flow import (
+    EtaFlowHandler,
+    EtaOptionsFlowHandler,
+)
+from custom_components.eta_webservices.const import (
+    CHOSEN_DEVICES,
+    DOMAIN,
+    ENABLE_DEBUG_LOGGING,
+    FORCE_LEGACY_MODE,
+    POLL_PROFILE_ACTIVE_INTERVAL,
+    POLL_PROFILE_IDLE_INTERVAL,
+    POLL_PROFILE_IDLE_STATES,
+    POLL_PROFILE_STATUS_SENSOR,
+    POLL_PROFILES,
+    REQUESTS_PER_SECOND,
+    TEXT_DICT,
+)
+
+from .benchmarks.harness import add_config_entry, async_create_hass
+from .simulator import EtaTerminalSimulator
+
+DEVICE = "Kessel"
+STATUS_KEY = "eta_192_168_0_10__kessel_status"
+PROFILE = {
+    POLL_PROFILE_STATUS_SENSOR: STATUS_KEY,
+    POLL_PROFILE_IDLE_STATES: ["Bereit"],
+    POLL_PROFILE_IDLE_INTERVAL: 600,
+    POLL_PROFILE_ACTIVE_INTERVAL: 15,
+}
+
+
+async def _options_flow(options: dict):
+    hass = await async_create_hass()
+    entry = add_config_entry(hass, {}, options)
+    text_sensors = {
+        STATUS_KEY: {
+            "friendly_name": "Kessel > Status",
+            "valid_values": {"Aus": 2000, "Bereit": 2001, "Heizen": 2002},
+        }
+    }
+    hass.data[DOMAIN] = {
+        entry.entry_id: {DEVICE: SimpleNamespace(data={TEXT_DICT: text_sensors})}
+    }
+    flow = EtaOptionsFlowHandler(entry)
+    flow.hass = hass
+    flow.handler = entry.entry_id
+    flow.device_name = DEVICE
+    return hass, flow
+
+
+@pytest.mark.asyncio
+async def test_poll_profile_step_offers_the_states_and_saves_the_profile():
+    """Test that the poll profile of a device is saved with whole seconds."""
+    # Given
+    hass, flow = await _options_flow({})
+
+    # When
+    form = await flow.async_step_poll_profile()
+    result = await flow.async_step_poll_profile(
+        {
+            POLL_PROFILE_STATUS_SENSOR: STATUS_KEY,
+            POLL_PROFILE_IDLE_STATES: ["Bereit"],
+            POLL_PROFILE_IDLE_INTERVAL: 600.0,
+            POLL_PROFILE_ACTIVE_INTERVAL: 15.0,
+        }
+    )
+    await hass.async_stop(force=True)
+
+    # Then
+    assert form["step_id"] == "poll_profile"
+    states = form["data_schema"].schema[POLL_PROFILE_IDLE_STATES].config["options"]
+    assert states == ["Aus", "Bereit", "Heizen"]
+    assert result["data"][POLL_PROFILES] == {DEVICE: PROFILE}
+
+
+@pytest.mark.asyncio
+async def test_poll_profile_without_status_sensor_is_removed():
+    """Test that clearing the status sensor polls the device as usual again."""
+    # Given
+    hass, flow = await _options_flow({POLL_PROFILES: {DEVICE: PROFILE}})
+
+    # When
+    form = await flow.async_step_poll_profile()
+    result = await flow.async_step_poll_profile(
+        {POLL_PROFILE_IDLE_INTERVAL: 600, POLL_PROFILE_ACTIVE_INTERVAL: 15}
+    )
+    await hass.async_stop(force=True)
+
+    # Then
+    status_default = next(
+        key for key in form["data_schema"].schema if key == POLL_PROFILE_STATUS_SENSOR
+    ).default()
+    assert status_default == STATUS_KEY
+    assert result["data"][POLL_PROFILES] == {}
+
+
+@pytest.mark.asyncio
+async def test_request_rate_step_saves_the_limit_and_zero_removes_it():
+    """Test that a request rate is stored and 0 stores no limit."""
+    # Given
+    hass, flow = await _options_flow({})
+
+    # When
+    form = await flow.async_step_request_rate()
+    limited = await flow.async_step_request_rate({REQUESTS_PER_SECOND: 2.5})
+    unlimited = await flow.async_step_request_rate({REQUESTS_PER_SECOND: 0})
+    await hass.async_stop(force=True)
+
+    # Then
+    assert form["step_id"] == "request_rate"
+    assert limited["data"][REQUESTS_PER_SECOND] == 2.5
+    assert unlimited["data"][REQUESTS_PER_SECOND] is None
+
+
+@pytest.mark.asyncio
+async def test_flow_fetches_the_api_version_and_the_menu_once():
+    """Test that the device list and every scan reuse the session of the flow."""
+    # Given
+    hass = await async_create_hass()
+    flow = EtaFlowHandler()
+    flow.hass = hass
+    flow.handler = DOMAIN
+    flow.context = {"source": "user"}
+
+    # When
+    async with EtaTerminalSimulator(fubs=3, endpoints_per_fub=10) as terminal:
+        result = await flow.async_step_user(
+            {
+                CONF_HOST: terminal.host,
+                CONF_PORT: str(terminal.port),
+                FORCE_LEGACY_MODE: False,
+                ENABLE_DEBUG_LOGGING: False,
+            }
+        )
+        result = await flow.async_step_select_subtrees({})
+        result = await flow.async_step_confirm_scan({})
+        while result["step_id"] == "scan_device":
+            result = await flow.async_step_scan_device({})
+    await hass.async_stop(force=True)
+
+    # Then
+    assert result["step_id"] == "select_device"
+    assert flow.data[CHOSEN_DEVICES] == ["Kessel", "Puffer", "Lager"]
+    assert terminal.requests["/user/api"] == 1
+    assert terminal.requests["/user/menu"] == 1
+
+
+@pytest.mark.asyncio
+async def test_scan_estimate_is_computed_once():
+    """Test that confirming the scan reuses the estimate shown in the form."""
+    # Given
+    hass = await async_create_hass()
+    flow = EtaFlowHandler()
+    flow.hass = hass
+    flow.handler = DOMAIN
+    flow.context = {"source": "user"}
+    estimates = []
+    estimate_scan = flow._estimate_scan
+
+    async def counting_estimate_scan():
+        estimates.append(await estimate_scan())
+        return estimates[-1]
+
+    flow._estimate_scan = counting_estimate_scan
+
+    # When
+    async with EtaTerminalSimulator(fubs=3, endpoints_per_fub=10) as terminal:
+        await flow.async_step_user(
+            {
+                CONF_HOST: terminal.host,
+                CONF_PORT: str(terminal.port),
+                FORCE_LEGACY_MODE: False,
+                ENABLE_DEBUG_LOGGING: False,
+            }
+        )
+        form = await flow.async_step_select_subtrees({})
+        result = await flow.async_step_confirm_scan({})
+    await hass.async_stop(force=True)
+
+    # Then
+    assert form["step_id"] == "confirm_scan"
+    assert form["description_placeholders"]["devices"] == "Kessel, Puffer, Lager"
+    assert result["step_id"] == "scan_device"
+    assert len(estimates) == 1
+    assert flow.data["devices_to_scan"] == ["Kessel", "Puffer", "Lager"]
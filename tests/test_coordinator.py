@@ -0,0 +1,526 @@
+from contextlib import asynccontextmanager
+from functools import partial
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.update_coordinator import UpdateFailed
+import pytest
+
+from custom_components.eta_webservices import circuit_breaker
+from custom_components.eta_webservices.circuit_breaker import EtaCircuitBreaker
+
+from custom_components.eta_webservices.const import (
+    DOMAIN,
+    ERROR_UPDATE_COORDINATOR,
+    POLL_PROFILE_ACTIVE_INTERVAL,
+    POLL_PROFILE_IDLE_INTERVAL,
+    POLL_PROFILE_IDLE_STATES,
+    POLL_PROFILE_STATUS_SENSOR,
+)
+from custom_components.eta_webservices.coordinator import (
+    ETAErrorUpdateCoordinator,
+    EtaDataUpdateCoordinator,
+    EtaStaggeredCoordinator,
+    assign_refresh_phases,
+    next_refresh_delay,
+)
+from custom_components.eta_webservices.error_history import EtaErrorHistory
+from custom_components.eta_webservices.quarantine import (
+    FAILURE_THRESHOLD,
+    EtaEndpointQuarantine,
+)
+from custom_components.eta_webservices.stats import EtaRequestStats
+
+from .benchmarks.catalog import entity_catalog
+from .benchmarks.harness import add_config_entry, async_create_hass
+from .simulator import STATES, TEXT_SENSOR, EtaTerminalSimulator
+
+DEVICE = "Kessel"
+IDLE_INTERVAL = 600
+
+
+def test_refresh_delay_aligns_to_phase():
+    """Test that refreshes are moved to the phase slot of the coordinator."""
+    # Given
+    interval = 60
+    phase = 0.25
+
+    # When
+    delays = [next_refresh_delay(now, interval, phase) for now in (0, 10, 44, 1000)]
+
+    # Then
+    # slots are at 15 + k * 60 seconds, at least half an interval away
+    assert delays == [75, 65, 31, 35]
+
+
+def test_refresh_delay_keeps_interval_once_aligned():
+    """Test that an aligned coordinator keeps its regular interval."""
+    # Given
+    now = 135.0
+
+    # When
+    delay = next_refresh_delay(now, 60, 0.25, jitter=1.5)
+
+    # Then
+    assert delay == pytest.approx(61.5)
+
+
+def test_phases_are_spread_evenly_and_deterministically():
+    """Test that the coordinators of an entry get evenly spaced phases."""
+    # Given
+    coordinators = [SimpleNamespace(phase=0.0) for _ in range(4)]
+    again = [SimpleNamespace(phase=0.0) for _ in range(4)]
+
+    # When
+    assign_refresh_phases(coordinators, "entry_1")
+    assign_refresh_phases(again, "entry_1")
+
+    # Then
+    phases = sorted(c.phase for c in coordinators)
+    gaps = [b - a for a, b in zip(phases, phases[1:])]
+    assert gaps == pytest.approx([0.25, 0.25, 0.25])
+    assert [c.phase for c in again] == [c.phase for c in coordinators]
+
+
+def _error(msg: str) -> dict:
+    return {
+        "msg": msg,
+        "priority": "Error",
+        "time": "2024-01-01 10:00:00",
+        "text": "",
+        "fub": "Kessel",
+        "host": "192.168.0.10",
+        "port": 8080,
+    }
+
+
+def test_error_events_are_diffed_by_key():
+    """Test that only changed errors fire events."""
+    # Given
+    coordinator = SimpleNamespace(
+        data=[_error("a"), _error("b")],
+        hass=MagicMock(),
+        per_error_events=True,
+        aggregated_events=False,
+    )
+
+    # When
+    ETAErrorUpdateCoordinator._handle_error_events(
+        coordinator, [_error("b"), _error("c")]
+    )
+
+    # Then
+    fired = [
+        (call.args[0], call.kwargs["event_data"]["msg"])
+        for call in coordinator.hass.bus.async_fire.call_args_list
+    ]
+    assert fired == [
+        ("eta_webservices_error_cleared", "a"),
+        ("eta_webservices_error_detected", "c"),
+    ]
+
+
+def test_aggregated_error_event_replaces_per_error_events():
+    """Test that a change set fires a single event if per-error events are off."""
+    # Given
+    coordinator = SimpleNamespace(
+        data=[_error("a"), _error("b")],
+        hass=MagicMock(),
+        host="192.168.0.10",
+        port=8080,
+        per_error_events=False,
+        aggregated_events=True,
+    )
+
+    # When
+    ETAErrorUpdateCoordinator._handle_error_events(
+        coordinator, [_error("b"), _error("c"), _error("d")]
+    )
+
+    # Then
+    coordinator.hass.bus.async_fire.assert_called_once()
+    call = coordinator.hass.bus.async_fire.call_args
+    assert call.args[0] == "eta_webservices_errors_changed"
+    assert [error["msg"] for error in call.kwargs["event_data"]["added"]] == [
+        "c",
+        "d",
+    ]
+    assert [error["msg"] for error in call.kwargs["event_data"]["cleared"]] == ["a"]
+    assert call.kwargs["event_data"]["active"] == 3
+
+
+def test_latest_error_is_tracked_incrementally():
+    """Test that the latest error follows detected and cleared errors."""
+    # Given
+    coordinator = SimpleNamespace(latest_error=None)
+    old, new = _error("old"), _error("new")
+    new["time"] = "2024-01-01 11:00:00"
+
+    # When
+    ETAErrorUpdateCoordinator._update_latest_error(
+        coordinator, [old, new], [old, new], []
+    )
+    latest_after_detection = coordinator.latest_error["msg"]
+    ETAErrorUpdateCoordinator._update_latest_error(coordinator, [old], [], [new])
+
+    # Then
+    assert latest_after_detection == "new"
+    assert coordinator.latest_error["msg"] == "old"
+
+
+def _staggered_coordinator(stats: EtaRequestStats, run_cycle) -> SimpleNamespace:
+    coordinator = SimpleNamespace(
+        hass=MagicMock(),
+        request_stats=stats,
+        last_cycle=None,
+        last_successful_refresh=None,
+        last_update_success=True,
+        _failed_cycle_listeners=[],
+        _async_run_cycle=run_cycle,
+    )
+    coordinator._record_cycle = partial(
+        EtaStaggeredCoordinator._record_cycle, coordinator
+    )
+    return coordinator
+
+
+@pytest.mark.asyncio
+async def test_cycle_records_its_requests_for_the_performance_sensors():
+    """Test that a cycle reports only its own requests, failures and bytes."""
+    # Given
+    stats = EtaRequestStats()
+    stats.record_request(0.1, success=True)
+
+    async def run_cycle():
+        stats.record_request(0.2, success=True)
+        stats.record_request(0.4, success=False)
+        stats.record_bytes(300)
+        return {"values": {}}
+
+    coordinator = _staggered_coordinator(stats, run_cycle)
+    coordinator.hass.loop.time.side_effect = [10.0, 12.5]
+
+    # When
+    await EtaStaggeredCoordinator._async_update_data(coordinator)
+    performance = EtaStaggeredCoordinator.performance_as_dict(coordinator)
+
+    # Then
+    assert performance["cycle_duration"] == 2.5
+    assert performance["requests_per_cycle"] == 2
+    assert performance["failed_requests"] == 1
+    assert performance["bytes_received"] == 300
+    assert performance["p95_latency"] == 0.4
+    assert performance["last_successful_refresh"] is not None
+
+
+def _entity_key(terminal: EtaTerminalSimulator, uri: str) -> str:
+    return f"eta_{terminal.host.replace('.', '_')}_{uri.strip('/').replace('/', '_')}"
+
+
+def _var_requests(terminal: EtaTerminalSimulator) -> int:
+    return sum(
+        count
+        for path, count in terminal.requests.items()
+        if path.startswith("/user/var/")
+    )
+
+
+@asynccontextmanager
+async def _data_coordinator(config: dict | None = None):
+    """Yield a coordinator of a simulated device whose entities are scanned."""
+    hass = await async_create_hass()
+    async with EtaTerminalSimulator(fubs=1, endpoints_per_fub=10) as terminal:
+        entry = add_config_entry(
+            hass,
+            {"scanned_devices_data": {DEVICE: entity_catalog(terminal, terminal.host)}},
+        )
+        coordinator = EtaDataUpdateCoordinator(
+            hass,
+            {CONF_HOST: terminal.host, CONF_PORT: terminal.port, **(config or {})},
+            DEVICE,
+            entry.entry_id,
+        )
+        try:
+            yield hass, terminal, coordinator
+        finally:
+            await coordinator.async_shutdown()
+            await hass.async_stop(force=True)
+
+
+async def _async_cycle(coordinator: EtaDataUpdateCoordinator) -> dict:
+    coordinator.data = await coordinator._async_update_data()
+    return coordinator.data["values"]
+
+
+def _listen_to_all(terminal: EtaTerminalSimulator, coordinator) -> None:
+    for uri in terminal.endpoints:
+        coordinator.async_add_listener(lambda: None, _entity_key(terminal, uri))
+
+
+@asynccontextmanager
+async def _profiled_coordinator():
+    """Yield a coordinator with a poll profile whose status shows an idle state."""
+    async with _data_coordinator() as (hass, terminal, coordinator):
+        status_uri = terminal.uris_of_kind(TEXT_SENSOR)[0]
+        terminal.endpoints[status_uri].raw_value = STATES["Bereit"]
+        coordinator._poll_profile = {
+            POLL_PROFILE_STATUS_SENSOR: _entity_key(terminal, status_uri),
+            POLL_PROFILE_IDLE_STATES: ["Bereit"],
+            POLL_PROFILE_IDLE_INTERVAL: IDLE_INTERVAL,
+            POLL_PROFILE_ACTIVE_INTERVAL: 15,
+        }
+        _listen_to_all(terminal, coordinator)
+        yield hass, terminal, coordinator, terminal.endpoints[status_uri]
+
+
+@pytest.mark.asyncio
+async def test_poll_profile_reads_only_the_status_while_idle():
+    """Test that an idle device reuses the previous values of the other sensors."""
+    async with _profiled_coordinator() as (hass, terminal, coordinator, status):
+        # Given
+        first_values = await _async_cycle(coordinator)
+        requests_before = _var_requests(terminal)
+        for endpoint in terminal.endpoints.values():
+            if endpoint is not status:
+                endpoint.raw_value += 1
+
+        # When
+        values = await _async_cycle(coordinator)
+
+        # Then
+        assert len(first_values) == len(terminal.endpoints)
+        assert _var_requests(terminal) - requests_before == 1
+        assert values == first_values
+
+
+@pytest.mark.asyncio
+async def test_poll_profile_reads_everything_after_the_idle_interval():
+    """Test that an idle device is still fully polled every idle interval."""
+    async with _profiled_coordinator() as (hass, terminal, coordinator, status):
+        # Given
+        await _async_cycle(coordinator)
+        coordinator._last_full_poll -= IDLE_INTERVAL
+        requests_before = _var_requests(terminal)
+
+        # When
+        await _async_cycle(coordinator)
+
+        # Then
+        assert _var_requests(terminal) - requests_before == len(terminal.endpoints)
+
+
+@pytest.mark.asyncio
+async def test_status_change_polls_everything_and_refreshes_the_errors():
+    """Test that leaving the idle state reads all values and the errors at once."""
+    async with _profiled_coordinator() as (hass, terminal, coordinator, status):
+        # Given
+        error_coordinator = MagicMock()
+        error_coordinator.async_request_refresh = AsyncMock()
+        hass.data[DOMAIN] = {
+            coordinator.entry_id: {ERROR_UPDATE_COORDINATOR: error_coordinator}
+        }
+        await _async_cycle(coordinator)
+        requests_before = _var_requests(terminal)
+
+        # When
+        status.raw_value = STATES["Heizen"]
+        values = await _async_cycle(coordinator)
+
+        # Then
+        assert _var_requests(terminal) - requests_before == len(terminal.endpoints)
+        assert values[coordinator._poll_profile[POLL_PROFILE_STATUS_SENSOR]] == "Heizen"
+        error_coordinator.async_request_refresh.assert_called_once()
+
+
+def test_failed_status_read_is_never_idle():
+    """Test that the device is fully polled if the status cannot be read."""
+    # Given
+    coordinator = SimpleNamespace(
+        hass=MagicMock(),
+        _last_full_poll=100.0,
+        _poll_profile={
+            POLL_PROFILE_IDLE_STATES: ["Bereit"],
+            POLL_PROFILE_IDLE_INTERVAL: IDLE_INTERVAL,
+        },
+    )
+    coordinator.hass.loop.time.return_value = 200.0
+
+    # When
+    idle = EtaDataUpdateCoordinator._is_idle(coordinator, "Bereit")
+    failed = EtaDataUpdateCoordinator._is_idle(coordinator, TimeoutError())
+    active = EtaDataUpdateCoordinator._is_idle(coordinator, "Heizen")
+
+    # Then
+    assert (idle, failed, active) == (True, False, False)
+
+
+@pytest.mark.asyncio
+async def test_only_values_of_listening_entities_are_polled():
+    """Test that the contexts of the listeners decide which values are read."""
+    async with _data_coordinator() as (hass, terminal, coordinator):
+        # Given
+        listening = [_entity_key(terminal, uri) for uri in list(terminal.endpoints)[:2]]
+        for key in listening:
+            coordinator.async_add_listener(lambda: None, key)
+
+        # When
+        values = await _async_cycle(coordinator)
+
+        # Then
+        assert sorted(values) == sorted(listening)
+        assert _var_requests(terminal) == 2
+
+
+@pytest.mark.asyncio
+async def test_registry_decides_before_entities_are_added():
+    """Test that the first cycle polls the enabled entities of the registry."""
+    async with _data_coordinator() as (hass, terminal, coordinator):
+        # Given
+        enabled, disabled = [
+            _entity_key(terminal, uri) for uri in list(terminal.endpoints)[:2]
+        ]
+        registry = er.async_get(hass)
+        entry = hass.config_entries.async_get_entry(coordinator.entry_id)
+        registry.async_get_or_create("sensor", DOMAIN, enabled, config_entry=entry)
+        registry.async_get_or_create(
+            "sensor",
+            DOMAIN,
+            disabled,
+            config_entry=entry,
+            disabled_by=er.RegistryEntryDisabler.USER,
+        )
+
+        # When
+        values = await _async_cycle(coordinator)
+
+        # Then
+        assert list(values) == [enabled]
+
+
+@pytest.mark.asyncio
+async def test_new_listener_requests_a_refresh_once():
+    """Test that an entity enabled later is polled without waiting a cycle."""
+    async with _data_coordinator() as (hass, terminal, coordinator):
+        # Given
+        polled, added = [
+            _entity_key(terminal, uri) for uri in list(terminal.endpoints)[:2]
+        ]
+        coordinator.async_add_listener(lambda: None, polled)
+        await _async_cycle(coordinator)
+        coordinator.async_request_refresh = AsyncMock()
+
+        # When
+        coordinator.async_add_listener(lambda: None, polled)
+        refreshes_for_polled = coordinator.async_request_refresh.call_count
+        coordinator.async_add_listener(lambda: None, added)
+
+        # Then
+        assert refreshes_for_polled == 0
+        coordinator.async_request_refresh.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_cycles_in_a_row_are_reported():
+    """Test that every failed cycle is recorded and reported to its listeners."""
+    # Given
+    stats = EtaRequestStats()
+
+    async def run_cycle():
+        stats.record_request(10.0, success=False)
+        raise UpdateFailed("terminal unreachable")
+
+    coordinator = _staggered_coordinator(stats, run_cycle)
+    coordinator.hass.loop.time.side_effect = [0.0, 10.0]
+    coordinator.last_update_success = False
+    listener = MagicMock()
+    coordinator._failed_cycle_listeners.append(listener)
+
+    # When
+    with pytest.raises(UpdateFailed):
+        await EtaStaggeredCoordinator._async_update_data(coordinator)
+
+    # Then
+    listener.assert_called_once()
+    assert coordinator.last_cycle["failed_requests"] == 1
+    assert coordinator.last_successful_refresh is None
+
+
+@asynccontextmanager
+async def _quarantined_coordinator():
+    """Yield a coordinator of a simulated device with an endpoint quarantine."""
+    async with _data_coordinator() as (hass, terminal, coordinator):
+        coordinator.quarantine = EtaEndpointQuarantine(MagicMock())
+        _listen_to_all(terminal, coordinator)
+        yield terminal, coordinator
+
+
+async def _async_failing_cycles(coordinator, cycles: int) -> None:
+    for _ in range(cycles):
+        try:
+            await _async_cycle(coordinator)
+        except UpdateFailed:
+            pass
+
+
+@pytest.mark.asyncio
+async def test_failing_endpoint_is_quarantined_and_saved_once_per_cycle():
+    """Test that an endpoint failing on a working terminal is quarantined."""
+    async with _quarantined_coordinator() as (terminal, coordinator):
+        # Given
+        failing_uri = next(iter(terminal.endpoints))
+        terminal.failing_uris.add(failing_uri)
+
+        # When
+        await _async_failing_cycles(coordinator, FAILURE_THRESHOLD)
+
+        # Then
+        assert coordinator.quarantine.quarantined_uris == [failing_uri]
+        store = coordinator.quarantine.store
+        assert store.async_delay_save.call_count == FAILURE_THRESHOLD
+
+
+@pytest.mark.asyncio
+async def test_terminal_outage_does_not_quarantine_the_probed_endpoint():
+    """Test that failed probes of an unreachable terminal are not held against an endpoint."""
+    async with _quarantined_coordinator() as (terminal, coordinator):
+        # Given
+        # without a backoff, every cycle lets one half-open probe through
+        circuit_breaker._CIRCUIT_BREAKERS[(terminal.host, terminal.port)] = (
+            EtaCircuitBreaker(base_backoff=0)
+        )
+        terminal.failure_rate = 1.0
+
+        # When
+        await _async_failing_cycles(coordinator, FAILURE_THRESHOLD + 2)
+
+        # Then
+        assert coordinator.quarantine.quarantined_uris == []
+
+
+@pytest.mark.asyncio
+async def test_errors_cleared_during_a_restart_are_cleared_in_the_history():
+    """Test that restored active errors the terminal no longer reports get cleared."""
+    # Given
+    hass = await async_create_hass()
+    async with EtaTerminalSimulator(fubs=1, endpoints_per_fub=1) as terminal:
+        config = {CONF_HOST: terminal.host, CONF_PORT: terminal.port}
+        terminal.add_error("Kessel", "Still active", text="Check the boiler")
+        terminal.add_error(
+            "Kessel", "Gone", time="2024-01-01 13:00:00", text="Check the flue"
+        )
+        history = EtaErrorHistory()
+        await ETAErrorUpdateCoordinator(hass, config, history)._async_run_cycle()
+
+        # When
+        terminal.errors.pop()
+        restored = EtaErrorHistory()
+        restored.load_dict(history.as_dict())
+        await ETAErrorUpdateCoordinator(hass, config, restored)._async_run_cycle()
+    await hass.async_stop(force=True)
+
+    # Then
+    cleared = {error["msg"]: error["cleared"] for error in restored.query()}
+    assert cleared["Still active"] is None
+    assert cleared["Gone"] is not None
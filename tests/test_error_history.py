@@ -0,0 +1,70 @@
+from datetime import datetime
+
+from custom_components.eta_webservices.error_history import EtaErrorHistory
+
+
+def _error(msg: str, hour: int, fub="Kessel", priority="Error") -> dict:
+    return {
+        "msg": msg,
+        "priority": priority,
+        "time": datetime(2024, 1, 1, hour),
+        "text": f"{msg} text",
+        "fub": fub,
+        "host": "0.0.0.0",
+        "port": 8080,
+    }
+
+
+def test_query_by_time_range_fub_and_priority():
+    """Test that queries only return the matching occurrences."""
+    # Given
+    history = EtaErrorHistory()
+    history.add(_error("a", 1))
+    history.add(_error("b", 2, fub="Puffer"))
+    history.add(_error("c", 3, priority="Warning"))
+    history.add(_error("d", 4))
+
+    # When
+    in_range = history.query(datetime(2024, 1, 1, 2), datetime(2024, 1, 1, 3))
+    by_fub = history.query(fub="Puffer")
+    by_priority = history.query(start=datetime(2024, 1, 1, 2), priority="Error")
+
+    # Then
+    assert [error["msg"] for error in in_range] == ["b", "c"]
+    assert [error["msg"] for error in by_fub] == ["b"]
+    assert [error["msg"] for error in by_priority] == ["b", "d"]
+
+
+def test_cleared_errors_are_kept_and_oldest_are_evicted():
+    """Test that cleared errors stay in the history until the buffer is full."""
+    # Given
+    history = EtaErrorHistory(max_entries=2)
+    history.add(_error("a", 1))
+
+    # When
+    history.clear(_error("a", 1))
+    history.add(_error("b", 2))
+    cleared = history.query()
+    history.add(_error("c", 3))
+
+    # Then
+    assert [error["cleared"] is not None for error in cleared] == [True, False]
+    assert [error["msg"] for error in history.query()] == ["b", "c"]
+    assert len(history) == 2
+
+
+def test_active_errors_are_not_recorded_twice_after_restore():
+    """Test that errors which are still active after a restart are not added again."""
+    # Given
+    history = EtaErrorHistory()
+    history.add(_error("a", 1))
+    restored = EtaErrorHistory()
+    restored.load_dict(history.as_dict())
+
+    # When
+    restored.add(_error("a", 1))
+    restored.clear(_error("a", 1))
+
+    # Then
+    assert len(restored) == 1
+    assert restored.query()[0]["cleared"] is not None
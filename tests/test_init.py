@@ -0,0 +1,36 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components import eta_webservices
+from custom_components.eta_webservices.scheduler import RequestPriority, get_scheduler
+
+
+@pytest.mark.asyncio
+async def test_learned_concurrency_limit_is_restored_and_saved(monkeypatch):
+    """Test that the limit is restored at setup and saved whenever it changes."""
+    # Given
+    store = MagicMock()
+    store.async_load = AsyncMock(return_value={"persisthost:8080": 6})
+    monkeypatch.setattr(
+        eta_webservices, "_get_concurrency_limits_store", lambda hass: store
+    )
+    hass = MagicMock()
+    hass.data = {}
+
+    async def failing_request():
+        raise TimeoutError
+
+    # When
+    await eta_webservices._async_track_concurrency_limit(hass, "persisthost", "8080")
+    restored = get_scheduler("persisthost", 8080).max_concurrency
+    with pytest.raises(TimeoutError):
+        await get_scheduler("persisthost", 8080).run(
+            RequestPriority.POLL, failing_request
+        )
+
+    # Then
+    assert restored == 6
+    store.async_delay_save.assert_called_once()
+    data_to_save = store.async_delay_save.call_args.args[0]
+    assert data_to_save() == {"persisthost:8080": 3}
@@ -0,0 +1,148 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.eta_webservices.api import EtaAPI
+from custom_components.eta_webservices.limiter import AdaptiveConcurrencyLimiter
+from custom_components.eta_webservices.scheduler import (
+    EtaRequestScheduler,
+    RequestPriority,
+    set_scheduler,
+)
+
+
+def test_increases_while_latency_is_flat():
+    """Test the additive increase of about one per window of requests."""
+    limiter = AdaptiveConcurrencyLimiter(limit=4, max_limit=6)
+
+    for _ in range(5):
+        limiter.record(0.1, True)
+    assert limiter.concurrency == 5
+
+    for _ in range(100):
+        limiter.record(0.1, True)
+    assert limiter.concurrency == 6
+
+
+def test_halves_once_per_window_on_failures():
+    """Test that a burst of failures only counts as one congestion signal."""
+    limiter = AdaptiveConcurrencyLimiter(limit=8)
+
+    limiter.record(0.1, False)
+    limiter.record(0.1, False)
+    limiter.record(0.1, False)
+    assert limiter.concurrency == 4
+
+    # the next decrease is allowed once a window of 4 requests has finished
+    limiter.record(0.1, False)
+    assert limiter.concurrency == 4
+    limiter.record(0.1, False)
+    assert limiter.concurrency == 2
+
+
+def test_decreases_when_latency_rises():
+    """Test that a rising latency reduces the limit down to the minimum."""
+    limiter = AdaptiveConcurrencyLimiter(limit=8, min_limit=2)
+    for _ in range(5):
+        limiter.record(0.1, True)
+
+    for _ in range(50):
+        limiter.record(1.0, True)
+
+    assert limiter.concurrency == 2
+
+
+def test_slow_request_class_does_not_reduce_the_limit():
+    """Test that large menu requests are not compared with small value reads."""
+    # Given
+    limiter = AdaptiveConcurrencyLimiter(limit=8)
+    for _ in range(5):
+        limiter.record(0.1, True, "var")
+
+    # When
+    for _ in range(3):
+        limiter.record(2.0, True, "menu")
+        limiter.record(0.1, True, "var")
+
+    # Then
+    assert limiter.concurrency >= 8
+    assert limiter.baseline_latency == {"var": 0.1, "menu": 2.0}
+
+
+def test_request_class_of_a_path():
+    """Test that requests are grouped by the endpoint type of their path."""
+    assert EtaAPI._request_class("/user/var//40/10021/0/0/12000") == "var"
+    assert EtaAPI._request_class("/user/varinfo/40/10021/0/0/12000") == "varinfo"
+    assert EtaAPI._request_class("/user/menu") == "menu"
+
+
+def test_restore_is_bounded():
+    """Test that restored limits are clamped to the configured range."""
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=20)
+
+    limiter.restore(100)
+    assert limiter.concurrency == 20
+    limiter.restore(0)
+    assert limiter.concurrency == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_follows_limiter():
+    """Test that failing requests reduce the scheduler's concurrency."""
+    # Given
+    scheduler = EtaRequestScheduler(
+        requests_per_second=0, limiter=AdaptiveConcurrencyLimiter(limit=8)
+    )
+
+    async def failing_request():
+        await asyncio.sleep(0)
+        raise TimeoutError
+
+    # When
+    with pytest.raises(TimeoutError):
+        await scheduler.run(RequestPriority.POLL, failing_request)
+
+    # Then
+    assert scheduler.max_concurrency == 4
+    assert scheduler.as_dict()["limiter"]["limit"] == 4
+
+
+@pytest.mark.asyncio
+async def test_error_status_reduces_the_concurrency():
+    """Test that answers with an error status count as failures for the limiter."""
+    # Given
+    mock_response = MagicMock()
+    mock_response.status = 503
+    mock_response.text = AsyncMock(return_value="")
+    mock_session = MagicMock()
+    mock_session.get = AsyncMock(return_value=mock_response)
+    limiter = AdaptiveConcurrencyLimiter(limit=8)
+    set_scheduler(
+        "overloadedhost",
+        8080,
+        EtaRequestScheduler(requests_per_second=None, limiter=limiter),
+    )
+    eta_client = EtaAPI(mock_session, "overloadedhost", "8080")
+
+    # When
+    await eta_client.does_endpoint_exists()
+
+    # Then
+    assert limiter.concurrency == 4
+
+
+def test_concurrency_changes_are_reported():
+    """Test that on_change is only called when the concurrency changes."""
+    # Given
+    limiter = AdaptiveConcurrencyLimiter(limit=4)
+    limiter.on_change = MagicMock()
+
+    # When
+    limiter.record(0.1, True)
+    calls_without_change = limiter.on_change.call_count
+    limiter.record(0.1, False)
+
+    # Then
+    assert calls_without_change == 0
+    limiter.on_change.assert_called_once()
@@ -0,0 +1,143 @@
+import pytest
+
+from custom_components.eta_webservices.api import EtaAPI
+from custom_components.eta_webservices.metadata_cache import EtaMetadataCache
+
+from .test_api import VARINFO_XML, _mock_session_for
+
+URI = "40/10021/0/11109/0"
+TERMINAL = "0123456789abcdef"
+MENU_XML = '<eta><menu><fub name="Kessel" uri="/40/10021"/></menu></eta>'
+
+
+def test_get_returns_copy():
+    """Test that callers cannot modify the cached metadata."""
+    # Given
+    cache = EtaMetadataCache()
+    cache.put(
+        "1.2", TERMINAL, URI, {"unit": "kW", "valid_values": {"Ein": 1, "Aus": 0}}
+    )
+
+    # When
+    endpoint_info = cache.get("1.2", TERMINAL, URI)
+    endpoint_info["valid_values"]["Ein"] = 5
+
+    # Then
+    assert cache.get("1.2", TERMINAL, URI)["valid_values"]["Ein"] == 1
+    assert cache.get("1.1", TERMINAL, URI) is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    # Given
+    cache = EtaMetadataCache(max_entries=2)
+    cache.put("1.2", TERMINAL, "a", {})
+    cache.put("1.2", TERMINAL, "b", {})
+
+    # When
+    cache.get("1.2", TERMINAL, "a")
+    cache.put("1.2", TERMINAL, "c", {})
+
+    # Then
+    assert len(cache) == 2
+    assert cache.get("1.2", TERMINAL, "b") is None
+    assert cache.get("1.2", TERMINAL, "a") == {}
+
+
+def test_purge_and_restore():
+    """Test purging a single API version and restoring from storage."""
+    # Given
+    cache = EtaMetadataCache()
+    cache.put("1.1", TERMINAL, "a", {"unit": ""})
+    cache.put("1.2", TERMINAL, "a", {"unit": "°C"})
+    cache.put("1.2", TERMINAL, "b", {"unit": "kW"})
+
+    # When
+    removed = cache.purge("1.2")
+    restored = EtaMetadataCache()
+    restored.load_dict(cache.as_dict())
+
+    # Then
+    assert removed == 2
+    assert len(restored) == 1
+    assert restored.get("1.1", TERMINAL, "a") == {"unit": ""}
+
+
+def test_restore_drops_entries_without_terminal():
+    """Test that entries stored without a terminal fingerprint are not restored."""
+    # Given
+    cache = EtaMetadataCache()
+
+    # When
+    cache.load_dict({"entries": [["1.2", URI, {"unit": "kW"}]]})
+
+    # Then
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_varinfo_uses_cache():
+    """Test that a second client on the same firmware skips the varinfo request."""
+    # Given
+    cache = EtaMetadataCache()
+    responses = {
+        "/user/api": '<eta><api version="1.2" /></eta>',
+        "/user/menu": MENU_XML,
+        f"/user/varinfo/{URI}": VARINFO_XML,
+    }
+    first_session = _mock_session_for(responses)
+    second_session = _mock_session_for(responses)
+
+    # When
+    first = await EtaAPI(first_session, "host1", "8080", cache)._get_varinfo(
+        "Kessel", URI
+    )
+    second = await EtaAPI(second_session, "host2", "8080", cache)._get_varinfo(
+        "Kessel", URI
+    )
+
+    # Then
+    assert first == second
+    assert second["friendly_name"] == "Kessel > Kessel > Leistung"
+    second_requests = [call.args[0] for call in second_session.get.call_args_list]
+    assert second_requests == [
+        "http://host2:8080/user/api",
+        "http://host2:8080/user/menu",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_varinfo_does_not_share_names_between_terminals():
+    """Test that a terminal with another menu language gets its own names."""
+    # Given
+    cache = EtaMetadataCache()
+    german_session = _mock_session_for(
+        {
+            "/user/api": '<eta><api version="1.2" /></eta>',
+            "/user/menu": MENU_XML,
+            f"/user/varinfo/{URI}": VARINFO_XML,
+        }
+    )
+    english_session = _mock_session_for(
+        {
+            "/user/api": '<eta><api version="1.2" /></eta>',
+            "/user/menu": MENU_XML.replace("Kessel", "Boiler"),
+            f"/user/varinfo/{URI}": VARINFO_XML.replace(
+                "Kessel > Leistung", "Boiler > Output"
+            ),
+        }
+    )
+
+    # When
+    german = await EtaAPI(german_session, "host1", "8080", cache)._get_varinfo(
+        "Kessel", URI
+    )
+    english = await EtaAPI(english_session, "host2", "8080", cache)._get_varinfo(
+        "Boiler", URI
+    )
+
+    # Then
+    assert german["friendly_name"] == "Kessel > Kessel > Leistung"
+    assert english["friendly_name"] == "Boiler > Boiler > Output"
+    assert len(cache) == 2
@@ -0,0 +1,96 @@
+import pytest
+
+from custom_components.eta_webservices.api import EtaAPI
+from custom_components.eta_webservices.quarantine import EtaEndpointQuarantine
+
+from .test_api import _mock_session_for
+
+URI = "/120/10101/0/0/12197"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_failing_endpoint_is_quarantined_and_polled_less_often():
+    """Test that consecutive failures move an endpoint to the slow tier."""
+    # Given
+    clock = FakeClock()
+    quarantine = EtaEndpointQuarantine(quarantine_interval=600, clock=clock)
+
+    # When
+    for _ in range(3):
+        quarantine.record(URI, 0.1, False)
+
+    # Then
+    assert quarantine.quarantined_uris == [URI]
+    assert quarantine.claim_due([URI]) == []
+    clock.now = 600
+    assert quarantine.claim_due([URI]) == [URI]
+    assert quarantine.claim_due([URI]) == []
+
+
+def test_slow_endpoint_recovers():
+    """Test that a slow endpoint is released after enough fast polls."""
+    # Given
+    quarantine = EtaEndpointQuarantine(clock=FakeClock())
+    for _ in range(3):
+        quarantine.record(URI, 5.0, True)
+    assert quarantine.is_quarantined(URI)
+
+    # When
+    quarantine.record(URI, 0.2, True)
+    quarantine.record(URI, 0.2, True)
+    still_quarantined = quarantine.is_quarantined(URI)
+    quarantine.record(URI, 0.2, True)
+
+    # Then
+    assert still_quarantined
+    assert not quarantine.is_quarantined(URI)
+    assert quarantine.claim_due([URI]) == []
+
+
+def test_statistics_survive_a_restart():
+    """Test that restored endpoints stay quarantined and are polled right away."""
+    # Given
+    quarantine = EtaEndpointQuarantine(clock=FakeClock())
+    for _ in range(3):
+        quarantine.record(URI, None, False)
+
+    # When
+    restored = EtaEndpointQuarantine(clock=FakeClock())
+    restored.load_dict(quarantine.as_dict())
+
+    # Then
+    assert restored.as_dict() == quarantine.as_dict()
+    assert restored.claim_due([URI]) == [URI]
+
+
+@pytest.mark.asyncio
+async def test_request_observer_reports_latency():
+    """Test that the client reports the path of every request it sent."""
+    # Given
+    observed = []
+    mock_session = _mock_session_for(
+        {
+            URI: '<eta><value uri="/user/var/1" strValue="5" unit="" decPlaces="0" '
+            'scaleFactor="1" advTextOffset="0">5</value></eta>'
+        }
+    )
+    eta_client = EtaAPI(
+        mock_session,
+        "observerhost",
+        "8080",
+        request_observer=lambda suffix, latency: observed.append((suffix, latency)),
+    )
+
+    # When
+    await eta_client.get_data(URI)
+
+    # Then
+    assert [suffix for suffix, _ in observed] == ["/user/var/" + URI]
+    assert observed[0][1] >= 0
@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+from custom_components.eta_webservices.scheduler import (
+    EtaRequestScheduler,
+    RequestPriority,
+)
+
+
+@pytest.mark.asyncio
+async def test_priority_order():
+    """Test that queued requests are served by priority, then FIFO."""
+    # Given
+    scheduler = EtaRequestScheduler(max_concurrency=1, requests_per_second=0)
+    blocker = asyncio.Event()
+    served = []
+
+    async def request(name):
+        served.append(name)
+        if name == "blocking":
+            await blocker.wait()
+
+    first = asyncio.create_task(
+        scheduler.run(RequestPriority.POLL, lambda: request("blocking"))
+    )
+    await asyncio.sleep(0)
+    queued = [
+        asyncio.create_task(scheduler.run(priority, lambda n=name: request(n)))
+        for priority, name in (
+            (RequestPriority.DISCOVERY, "discovery"),
+            (RequestPriority.POLL, "poll_1"),
+            (RequestPriority.POLL, "poll_2"),
+            (RequestPriority.WRITE, "write"),
+        )
+    ]
+    await asyncio.sleep(0)
+
+    # When
+    assert scheduler.queue_depth == 4
+    blocker.set()
+    await asyncio.gather(first, *queued)
+
+    # Then
+    assert served == ["blocking", "write", "poll_1", "poll_2", "discovery"]
+    assert scheduler.queue_depth == 0
+    assert scheduler.active_requests == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit():
+    """Test that no more than max_concurrency requests run at once."""
+    # Given
+    scheduler = EtaRequestScheduler(max_concurrency=3, requests_per_second=0)
+    running = 0
+    peak = 0
+
+    async def request():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    # When
+    await asyncio.gather(
+        *(scheduler.run(RequestPriority.POLL, request) for _ in range(10))
+    )
+
+    # Then
+    assert peak == 3
+    assert scheduler.as_dict()["priorities"]["poll"]["requests"] == 10
+
+
+@pytest.mark.asyncio
+async def test_rate_limit():
+    """Test that request starts are spaced out by the rate limit."""
+    # Given
+    scheduler = EtaRequestScheduler(max_concurrency=10, requests_per_second=100)
+    loop = asyncio.get_running_loop()
+    starts = []
+
+    async def request():
+        starts.append(loop.time())
+
+    # When
+    await asyncio.gather(
+        *(scheduler.run(RequestPriority.POLL, request) for _ in range(5))
+    )
+
+    # Then
+    assert starts[-1] - starts[0] >= 0.04 * 0.9
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_can_be_changed():
+    """Test that the rate limit of the options can be set and removed again."""
+    # Given
+    scheduler = EtaRequestScheduler(max_concurrency=10)
+    loop = asyncio.get_running_loop()
+    starts = []
+
+    async def request():
+        starts.append(loop.time())
+
+    # When
+    scheduler.set_requests_per_second(100)
+    await asyncio.gather(
+        *(scheduler.run(RequestPriority.POLL, request) for _ in range(5))
+    )
+    limited = scheduler.as_dict()["requests_per_second"]
+    scheduler.set_requests_per_second(None)
+
+    # Then
+    assert starts[-1] - starts[0] >= 0.04 * 0.9
+    assert limited == 100
+    assert scheduler.as_dict()["requests_per_second"] is None
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_is_skipped():
+    """Test that a request cancelled while queued does not leak a slot."""
+    # Given
+    scheduler = EtaRequestScheduler(max_concurrency=1, requests_per_second=0)
+    blocker = asyncio.Event()
+
+    first = asyncio.create_task(scheduler.run(RequestPriority.POLL, blocker.wait))
+    await asyncio.sleep(0)
+    cancelled = asyncio.create_task(
+        scheduler.run(RequestPriority.WRITE, lambda: asyncio.sleep(0))
+    )
+    await asyncio.sleep(0)
+
+    # When
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    blocker.set()
+    await first
+
+    # Then
+    assert scheduler.queue_depth == 0
+    assert scheduler.active_requests == 0
+    assert await scheduler.run(RequestPriority.POLL, lambda: asyncio.sleep(0, "ok"))
@@ -0,0 +1,31 @@
+from homeassistant.const import CONF_HOST, CONF_PORT
+import pytest
+
+from custom_components.eta_webservices.coordinator import EtaDataUpdateCoordinator
+from custom_components.eta_webservices.sensor import EtaPerformanceSensor
+
+from .benchmarks.harness import async_create_hass
+
+CONFIG = {CONF_HOST: "192.168.0.10", CONF_PORT: 8080}
+
+
+@pytest.mark.asyncio
+async def test_performance_sensor_stays_available_when_cycles_fail():
+    """Test that the numbers of a failed cycle are shown instead of unavailable."""
+    # Given
+    hass = await async_create_hass()
+    coordinator = EtaDataUpdateCoordinator(hass, CONFIG, "Kessel", "entry_1")
+    sensor = EtaPerformanceSensor(
+        CONFIG, hass, coordinator, "failed_requests", "Kessel"
+    )
+    coordinator.last_update_success = False
+
+    # When
+    available_before_first_cycle = sensor.available
+    coordinator.last_cycle = {"failed_requests": 5}
+
+    # Then
+    assert sensor.unique_id == "eta_192_168_0_10_8080_kessel_failed_requests"
+    assert available_before_first_cycle is False
+    assert sensor.available is True
+    await hass.async_stop(force=True)
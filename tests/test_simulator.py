@@ -0,0 +1,101 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from custom_components.eta_webservices.api import EtaAPI
+
+from .simulator import (
+    FLOAT_SENSOR,
+    TEXT_SENSOR,
+    TIME,
+    WRITABLE_SENSOR,
+    EtaTerminalSimulator,
+)
+
+
+@pytest.mark.asyncio
+async def test_discovery_against_simulated_terminal():
+    """Test that EtaAPI reads the menu, metadata and values of the simulator."""
+    # Given
+    async with EtaTerminalSimulator(
+        fubs=3, endpoints_per_fub=40
+    ) as terminal, aiohttp.ClientSession() as session:
+        eta_client = EtaAPI(session, terminal.host, terminal.port)
+
+        # When
+        structures = await eta_client.get_entity_structures()
+        uris = [
+            uri
+            for structure in structures.values()
+            for uri in eta_client.get_endpoint_uris(structure)
+        ]
+        types = {}
+        for kind in (FLOAT_SENSOR, TEXT_SENSOR, WRITABLE_SENSOR, TIME):
+            metadata = await eta_client.async_get_entity_metadata(
+                terminal.uris_of_kind(kind)[0]
+            )
+            types[kind] = eta_client.classify_entity(metadata)
+
+    # Then
+    assert list(structures) == ["Kessel", "Puffer", "Lager"]
+    # the fub itself is part of the structure
+    assert len(uris) == 3 * (40 + 1)
+    assert types == {
+        FLOAT_SENSOR: "sensor",
+        TEXT_SENSOR: "sensor",
+        WRITABLE_SENSOR: "number",
+        TIME: "time",
+    }
+
+
+@pytest.mark.asyncio
+async def test_errors_writes_and_v11_mode():
+    """Test the error list, writes and the missing varinfo of API v1.1."""
+    # Given
+    async with EtaTerminalSimulator(
+        fubs=1, endpoints_per_fub=10, api_version="1.1"
+    ) as terminal, aiohttp.ClientSession() as session:
+        eta_client = EtaAPI(session, terminal.host, terminal.port)
+        terminal.add_error("Kessel", "Wasserdruck zu gering", text="Wasser nachfüllen")
+        uri = terminal.uris_of_kind(WRITABLE_SENSOR)[0]
+
+        # When
+        api_version = await eta_client.get_api_version()
+        errors = await eta_client.get_errors()
+        written = await eta_client.write_endpoint(uri, 555)
+        value, unit = await eta_client.get_data(uri)
+        varinfo = await session.get(f"{terminal.base_url}/user/varinfo{uri}")
+
+    # Then
+    assert str(api_version) == "1.1"
+    assert [(error["fub"], error["msg"]) for error in errors] == [
+        ("Kessel", "Wasserdruck zu gering")
+    ]
+    assert written
+    assert (value, unit) == (55.5, "°C")
+    assert varinfo.status == 404
+
+
+@pytest.mark.asyncio
+async def test_latency_concurrency_limit_and_failures():
+    """Test that requests queue up at the limit and that failures are injected."""
+    # Given
+    async with EtaTerminalSimulator(
+        fubs=1, endpoints_per_fub=20, latency=0.01, max_concurrency=2
+    ) as terminal, aiohttp.ClientSession() as session:
+        uris = list(terminal.endpoints)
+        terminal.failing_uris.add(uris[0])
+
+        async def get(uri):
+            response = await session.get(f"{terminal.base_url}/user/var{uri}")
+            return response.status
+
+        # When
+        statuses = await asyncio.gather(*(get(uri) for uri in uris))
+
+    # Then
+    assert statuses[0] == 500
+    assert set(statuses[1:]) == {200}
+    assert terminal.max_in_flight == 2
+    assert sum(terminal.requests.values()) == 20
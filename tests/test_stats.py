@@ -0,0 +1,31 @@
+from custom_components.eta_webservices.stats import EtaRequestStats, percentile
+
+
+def test_percentile_uses_the_nearest_rank():
+    """Test that percentiles pick a measured value."""
+    # Given
+    values = [0.4, 0.1, 0.3, 0.2]
+
+    # When
+    median = percentile(values, 0.5)
+    p95 = percentile(values, 0.95)
+
+    # Then
+    assert median == 0.2
+    assert p95 == 0.4
+    assert percentile([], 0.95) is None
+
+
+def test_request_stats_keep_the_latest_latencies():
+    """Test that failed requests are counted and old latencies are dropped."""
+    # Given
+    stats = EtaRequestStats(latency_window=3)
+
+    # When
+    for latency in (5.0, 0.1, 0.2, 0.3):
+        stats.record_request(latency, success=latency < 0.3)
+    stats.record_bytes(120)
+
+    # Then
+    assert stats.snapshot() == (4, 2, 120)
+    assert stats.latency_percentile(1.0) == 0.3
@@ -0,0 +1,95 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from custom_components.eta_webservices.api import EtaAPI
+from custom_components.eta_webservices.transport import (
+    EtaRecordingTransport,
+    EtaReplayMissError,
+    EtaReplayTransport,
+)
+
+from .simulator import FLOAT_SENSOR, WRITABLE_SENSOR, EtaTerminalSimulator
+
+
+async def _read_terminal(eta_client: EtaAPI, uris: list[str]) -> tuple:
+    structures = await eta_client.get_entity_structures()
+    metadata = [await eta_client.async_get_entity_metadata(uri) for uri in uris]
+    values = [await eta_client.get_data(uri) for uri in uris]
+    return list(structures), metadata, values
+
+
+@pytest.mark.asyncio
+async def test_replay_reproduces_a_recorded_session(tmp_path):
+    """Test that a replayed archive gives the same results as the terminal."""
+    # Given
+    async with EtaTerminalSimulator(
+        fubs=2, endpoints_per_fub=20
+    ) as terminal, aiohttp.ClientSession() as session:
+        uris = [
+            terminal.uris_of_kind(kind)[0] for kind in (FLOAT_SENSOR, WRITABLE_SENSOR)
+        ]
+        recorder = EtaRecordingTransport(session)
+        recorded = await _read_terminal(
+            EtaAPI(recorder, terminal.host, terminal.port), uris
+        )
+        recorder.save(tmp_path / "terminal.json.gz")
+
+    # When
+    replay = EtaReplayTransport.load(tmp_path / "terminal.json.gz", latency_scale=0)
+    # another port, so the caches of the recording are not used
+    replayed = await _read_terminal(EtaAPI(replay, "192.0.2.1", 8080), uris)
+
+    # Then
+    assert replayed == recorded
+    assert replay.requests == len(recorder.exchanges)
+
+
+@pytest.mark.asyncio
+async def test_replay_order_latency_and_misses():
+    """Test that responses replay in order with the scaled recorded latency."""
+    # Given
+    archive = {
+        "version": 1,
+        "bodies": ["<eta>1</eta>", "<eta>2</eta>"],
+        "exchanges": [
+            {
+                "method": "GET",
+                "path": "/user/var/1",
+                "latency": 0.2,
+                "status": 200,
+                "body": 0,
+            },
+            {
+                "method": "GET",
+                "path": "/user/var/1",
+                "latency": 0.2,
+                "status": 200,
+                "body": 1,
+            },
+            {
+                "method": "GET",
+                "path": "/user/var/2",
+                "latency": 0.2,
+                "error": "timeout",
+            },
+        ],
+    }
+    replay = EtaReplayTransport(archive, latency_scale=0.1)
+    loop = asyncio.get_running_loop()
+
+    # When
+    started_at = loop.time()
+    bodies = [
+        await (await replay.get("http://host:8080/user/var/1")).text() for _ in range(3)
+    ]
+    elapsed = loop.time() - started_at
+
+    # Then
+    assert bodies == ["<eta>1</eta>", "<eta>2</eta>", "<eta>2</eta>"]
+    assert 0.06 <= elapsed < 0.2
+    with pytest.raises(aiohttp.ClientConnectionError):
+        await replay.get("http://host:8080/user/var/2")
+    with pytest.raises(EtaReplayMissError):
+        await replay.get("http://host:8080/user/var/3")
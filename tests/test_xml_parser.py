@@ -0,0 +1,116 @@
+import asyncio
+import gc
+import os
+
+import pytest
+
+from custom_components.eta_webservices.xml_parser import EtaXmlParser
+
+# Longest time a single parse step may block the event loop, in seconds
+LOOP_STALL_BUDGET = float(os.environ.get("ETA_LOOP_STALL_BUDGET", "0.05"))
+
+VARINFO_XML = (
+    '<eta version="1.0" xmlns="http://www.eta.co.at/rest/v1"><varInfo uri="/120/10101/0/0/12197">'
+    '<variable uri="/120/10101/0/0/12197" name="Außentemperatur" fullName="Kessel > Außentemperatur"'
+    ' unit="°C" decPlaces="1" scaleFactor="10" advTextOffset="0"><type>DEFAULT</type>'
+    "</variable></varInfo></eta>"
+)
+
+
+def _large_menu(objects: int) -> str:
+    children = "".join(
+        f'<object uri="/120/10101/0/0/{i}" name="Variable {i}"/>'
+        for i in range(objects)
+    )
+    return (
+        f'<eta><menu><fub uri="/120/10101" name="Kessel">{children}</fub></menu></eta>'
+    )
+
+
+@pytest.mark.asyncio
+async def test_large_response_is_parsed_in_executor():
+    """Responses above the threshold do not run on the event loop."""
+    # Given
+    parser = EtaXmlParser(executor_threshold=1024)
+
+    # When
+    menu = await parser.parse(_large_menu(100))
+    varinfo = await parser.parse(VARINFO_XML)
+
+    # Then
+    assert len(menu["eta"]["menu"]["fub"]["object"]) == 100
+    assert varinfo["eta"]["varInfo"]["variable"]["@unit"] == "°C"
+    assert parser.executor_parses == 1
+    assert parser.loop_parses == 1
+
+
+@pytest.mark.asyncio
+async def test_small_parses_yield_after_budget():
+    """Small parses yield to the loop once the budget is used up."""
+    # Given
+    ticks = iter(range(100))
+    parser = EtaXmlParser(yield_budget=3, clock=lambda: next(ticks))
+    other_task_runs = 0
+
+    async def other_task():
+        nonlocal other_task_runs
+        while True:
+            other_task_runs += 1
+            await asyncio.sleep(0)
+
+    task = asyncio.create_task(other_task())
+    await asyncio.sleep(0)
+    runs_before = other_task_runs
+
+    # When
+    for _ in range(5):
+        await parser.parse(VARINFO_XML)
+
+    # Then
+    # every parse takes one tick, so the parser yielded after the third one
+    assert other_task_runs == runs_before + 1
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_discovery_parsing_does_not_stall_loop():
+    """No parse step of a big discovery blocks the loop longer than the budget."""
+    # Given
+    parser = EtaXmlParser()
+    menu_xml = _large_menu(20000)
+    loop = asyncio.get_running_loop()
+    max_gap = 0.0
+    running = True
+
+    async def heartbeat():
+        nonlocal max_gap
+        last = loop.time()
+        while running:
+            await asyncio.sleep(0)
+            now = loop.time()
+            max_gap = max(max_gap, now - last)
+            last = now
+
+    heartbeat_task = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+
+    # When
+    # a full garbage collection blocks every thread, which says nothing
+    # about the parser
+    gc.disable()
+    try:
+        menu = await parser.parse(menu_xml)
+        menu_objects = len(menu["eta"]["menu"]["fub"]["object"])
+        # the scheduler hands varinfo responses over one by one
+        for _ in range(2000):
+            await parser.parse(VARINFO_XML)
+    finally:
+        gc.enable()
+    running = False
+    await heartbeat_task
+
+    # Then
+    assert menu_objects == 20000
+    assert parser.loop_parses == 2000
+    assert parser.executor_parses == 1
+    assert max_gap < LOOP_STALL_BUDGET